@@ -0,0 +1,93 @@
+"""Benchmark of answering ``request-containers`` with many configured containers.
+
+Configures ``--containers`` containers, each available to one to three of ``--groups`` groups, and ``--users`` users
+that are each in ``--user-groups`` random groups. For every user the list of containers is then built
+
+* by walking all configured containers, as ``request-containers`` did before the container index was added,
+* from the :class:`~container_launcher.server.containers.ContainerIndex`, the first time for the user's groups,
+* from the index again, once the containers for the user's groups are cached, and
+* as the complete ``containers`` message from the index, including each container's state.
+
+Run ``python benchmarks/container_watch.py --help`` for the available settings.
+"""
+import json
+import os
+import random
+import sys
+import time
+
+import click
+
+from typing import Callable
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from container_launcher.server.containers import ContainerIndex  # noqa: E402
+
+
+def walk_containers(containers: list[dict], group_ids: frozenset[str]) -> str:
+    """Build the ``containers`` message by walking all containers, as before the container index was added.
+
+    :return: The serialised message
+    :rtype: str
+    """
+    result = []
+    for container in containers:
+        if len(group_ids.intersection(container['groups'])) > 0:
+            result.append({
+                'name': container['name'],
+                'title': container['title'],
+                'description': container['description'],
+                'state': 'paused',
+            })
+    return json.dumps({'type': 'containers', 'containers': result})
+
+
+def time_per_user(function: Callable, users: list[frozenset[str]]) -> float:
+    """Call the function once for each user's groups.
+
+    :return: The mean time per call in microseconds
+    :rtype: float
+    """
+    start = time.perf_counter()
+    for group_ids in users:
+        function(group_ids)
+    return (time.perf_counter() - start) / len(users) * 1000000
+
+
+@click.command()
+@click.option('--containers', default=1000, help='The number of configured containers.')
+@click.option('--groups', default=500, help='The number of distinct groups.')
+@click.option('--users', default=200, help='The number of users.')
+@click.option('--user-groups', default=20, help='The number of groups each user is in.')
+@click.option('--seed', default=1, help='The seed for assigning containers and users to groups.')
+def main(containers: int, groups: int, users: int, user_groups: int, seed: int) -> None:
+    """Time building the list of containers for each user."""
+    rng = random.Random(seed)
+    group_ids = [f'group-{idx}' for idx in range(groups)]
+    configured = [{'name': f'container-{idx}', 'title': f'Container {idx}', 'description': f'Container number {idx}',
+                   'groups': rng.sample(group_ids, rng.randint(1, 3))} for idx in range(containers)]
+    user_group_ids = [frozenset(rng.sample(group_ids, user_groups)) for _ in range(users)]
+    states = {container['name']: {'state': 'paused'} for container in configured}
+
+    start = time.perf_counter()
+    index = ContainerIndex(configured)
+    build = (time.perf_counter() - start) * 1000
+    results = [
+        ('walk all containers', time_per_user(lambda ids: walk_containers(configured, ids), user_group_ids)),
+        ('index, first request', time_per_user(index.containers, user_group_ids)),
+        ('index, cached', time_per_user(index.containers, user_group_ids)),
+        ('index, full message', time_per_user(lambda ids: index.containers_message(ids, states), user_group_ids)),
+    ]
+    matched = sum(len(index.containers(ids)) for ids in user_group_ids) / users
+    click.echo(f'{containers} containers in {groups} groups, {users} users in {user_groups} groups each, '
+               f'{matched:.0f} containers per user')
+    click.echo(f'{"building the index":<24}{build:>10.2f} ms')
+    for name, duration in results:
+        click.echo(f'{name:<24}{duration:>10.2f} us/request')
+
+
+if __name__ == '__main__':
+    main()
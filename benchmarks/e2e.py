@@ -0,0 +1,505 @@
+"""End-to-end benchmark of the login, launch, and startup flow.
+
+Starts the server through the command-line interface in a temporary directory, together with a fake LTI platform that
+signs launches with ``dev/private.pem`` and a stub JupyterHub. A number of distinct users are then driven through
+each stage of the flow, one stage at a time, so that the throughput and latency of each stage are measured under the
+same concurrency:
+
+* login - ``POST /lti/login``
+* launch - ``POST /lti``
+* app - ``GET /app``
+* connect - opening the WebSocket connection to ``/api``
+* request-user - the ``request-user`` API request
+* request-containers - the ``request-containers`` API request
+
+While the launches run, a separate connection repeatedly sends ``request-config``, which is answered without any I/O.
+Its latency is reported as ``launch-lag`` and shows how long the event loop is blocked by the launches.
+
+The results are appended to a JSON lines file together with the current commit and compared with the last earlier
+result that used the same settings.
+
+Run ``python benchmarks/e2e.py run --help`` for the available settings.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+
+import click
+import jwt
+import yaml
+
+from datetime import datetime, timezone
+from jwcrypto.jwk import JWK
+from statistics import quantiles
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest
+from tornado.web import Application, RequestHandler
+from tornado.websocket import websocket_connect
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRIVATE_KEY = os.path.join(ROOT, 'dev', 'private.pem')
+PUBLIC_KEY = os.path.join(ROOT, 'dev', 'public.pem')
+ISSUER = 'http://platform.benchmark'
+CLIENT_ID = 'benchmark'
+KEY_ID = 'benchmark'
+CONTEXT_ID = 'benchmark-course'
+STAGES = ('login', 'launch', 'app', 'connect', 'request-user', 'request-containers')
+# Number of seconds between two requests sent by the event loop lag probe
+PROBE_INTERVAL = 0.01
+
+
+class KeySetHandler(RequestHandler):
+    """Serve the fake platform's key set."""
+
+    def initialize(self: 'KeySetHandler', key_set: dict) -> None:
+        """Set the key set to serve."""
+        self._key_set = key_set
+
+    def get(self: 'KeySetHandler') -> None:
+        """Send the key set."""
+        self.write(self._key_set)
+
+
+class HubUserHandler(RequestHandler):
+    """Answer the JupyterHub API requests for a user, after a configurable delay."""
+
+    def initialize(self: 'HubUserHandler', latency: float) -> None:
+        """Set the delay in seconds."""
+        self._latency = latency
+
+    async def get(self: 'HubUserHandler', user_name: str) -> None:
+        """Send a user without any running servers."""
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        self.write({'name': user_name, 'servers': {}})
+
+    async def post(self: 'HubUserHandler', user_name: str) -> None:
+        """Accept creating a user."""
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        self.set_status(201)
+        self.write({'name': user_name, 'servers': {}})
+
+
+def key_set() -> dict:
+    """Get the fake platform's public key set.
+
+    :return: The JWKS containing ``dev/public.pem``
+    :rtype: dict
+    """
+    with open(PUBLIC_KEY, 'rb') as in_f:
+        key = json.loads(JWK.from_pem(in_f.read()).export_public())
+    key.update({'kid': KEY_ID, 'alg': 'RS256', 'use': 'sig'})
+    return {'keys': [key]}
+
+
+def server_config(directory: str, port: int, dsn: str, verify_workers: int) -> dict:
+    """Get the server configuration for the benchmark.
+
+    :param directory: The directory the server runs in
+    :type directory: str
+    :param port: The port the server listens on. The platform and hub stubs listen on the next two ports.
+    :type port: int
+    :param dsn: The database to use
+    :type dsn: str
+    :param verify_workers: The number of processes that verify launch signatures
+    :type verify_workers: int
+    :return: The configuration
+    :rtype: dict
+    """
+    return {
+        'app': {
+            'containers': [{
+                'name': f'benchmark-{idx}',
+                'title': f'Benchmark {idx}',
+                'host': f'http://127.0.0.1:{port + 2}/',
+                'groups': [CONTEXT_ID],
+            } for idx in range(3)],
+        },
+        'server': {
+            'host': '127.0.0.1',
+            'port': port,
+            'base': f'http://127.0.0.1:{port}',
+            'cookie_secret': 'benchmark',
+            'shutdown_timeout': 0,
+            'session': {'backend': 'sql'},
+            'metrics': {'enabled': False},
+            'websocket': {'max_per_user': 10},
+            'launch_verification': {'workers': verify_workers},
+        },
+        'database': {
+            'dsn': dsn or f'sqlite+aiosqlite:///{os.path.join(directory, "benchmark.db")}',
+        },
+        'jupyterhub': {
+            'api_token': 'benchmark',
+            'max_connections': 50,
+        },
+        'lti': [{
+            'iss': ISSUER,
+            'client_id': CLIENT_ID,
+            'auth_login_url': f'{ISSUER}/auth',
+            'auth_token_url': f'{ISSUER}/token',
+            'key_set_url': f'http://127.0.0.1:{port + 1}/jwks',
+            'private_key_file': PRIVATE_KEY,
+            'public_key_file': PUBLIC_KEY,
+            'deployment_ids': ['1'],
+        }],
+        'logging': {
+            'version': 1,
+            'disable_existing_loggers': False,
+            'handlers': {'console': {'class': 'logging.StreamHandler', 'level': 'ERROR'}},
+            'root': {'level': 'ERROR', 'handlers': ['console']},
+        },
+    }
+
+
+def git_commit() -> str:
+    """Get the current commit, marked as ``-dirty`` if there are uncommitted changes.
+
+    :return: The abbreviated commit hash or ``unknown``
+    :rtype: str
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        return f'{commit}-dirty' if status else commit
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Recorder(object):
+    """Records the latencies and errors of each stage."""
+
+    def __init__(self: 'Recorder') -> None:
+        """Create a new :class:`Recorder`."""
+        self.latencies = {stage: [] for stage in STAGES + ('launch-lag',)}
+        self.errors = {stage: 0 for stage in STAGES + ('launch-lag',)}
+        self.durations = {}
+
+    def summary(self: 'Recorder') -> dict:
+        """Get the throughput and latency percentiles of each stage.
+
+        :return: The count, errors, requests per second, and p50 and p99 latency in milliseconds of each stage
+        :rtype: dict
+        """
+        result = {}
+        for stage in STAGES + ('launch-lag',):
+            latencies = sorted(self.latencies[stage])
+            if len(latencies) > 1:
+                cuts = quantiles(latencies, n=100, method='inclusive')
+                p50, p99 = cuts[49], cuts[98]
+            elif latencies:
+                p50 = p99 = latencies[0]
+            else:
+                p50 = p99 = None
+            duration = self.durations.get(stage)
+            result[stage] = {
+                'count': len(latencies),
+                'errors': self.errors[stage],
+                'rps': round(len(latencies) / duration, 1) if duration else None,
+                'p50_ms': round(p50 * 1000, 2) if p50 is not None else None,
+                'p99_ms': round(p99 * 1000, 2) if p99 is not None else None,
+            }
+        return result
+
+
+class VirtualUser(object):
+    """A single user going through the flow, keeping its cookies between the stages."""
+
+    def __init__(self: 'VirtualUser', base: str, idx: int) -> None:
+        """Create a new :class:`VirtualUser`."""
+        self._base = base
+        self.sub = f'benchmark-user-{idx}'
+        self.cookies = {}
+        self.nonce = None
+        self.state = None
+        self.token = None
+        self.connection = None
+
+    def _store_cookies(self: 'VirtualUser', response: object) -> None:
+        for cookie in response.headers.get_list('Set-Cookie'):
+            name, value = cookie.split(';')[0].split('=', 1)
+            self.cookies[name] = value
+
+    @property
+    def cookie_header(self: 'VirtualUser') -> str:
+        """Return the ``Cookie`` header for the user's cookies."""
+        return '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+
+    async def login(self: 'VirtualUser', client: AsyncHTTPClient) -> None:
+        """Start the LTI login, recording the state and nonce that the platform has to return."""
+        body = urllib.parse.urlencode({'iss': ISSUER, 'login_hint': self.sub, 'client_id': CLIENT_ID,
+                                       'target_link_uri': f'{self._base}/lti', 'lti_message_hint': 'benchmark'})
+        response = await client.fetch(f'{self._base}/lti/login', method='POST', body=body, follow_redirects=False,
+                                      raise_error=False)
+        if response.code != 302:
+            raise Exception(f'Login failed with {response.code}')
+        self._store_cookies(response)
+        query = dict(urllib.parse.parse_qsl(urllib.parse.urlparse(response.headers['Location']).query))
+        self.nonce = query['nonce']
+        self.state = query['state']
+
+    def sign(self: 'VirtualUser', private_key: str) -> None:
+        """Create the signed launch, as the platform would."""
+        now = int(time.time())
+        self.token = jwt.encode({
+            'iss': ISSUER, 'aud': CLIENT_ID, 'sub': self.sub, 'name': f'Benchmark user {self.sub}',
+            'nonce': self.nonce, 'iat': now, 'exp': now + 3600,
+            'https://purl.imsglobal.org/spec/lti/claim/deployment_id': '1',
+            'https://purl.imsglobal.org/spec/lti/claim/message_type': 'LtiResourceLinkRequest',
+            'https://purl.imsglobal.org/spec/lti/claim/version': '1.3.0',
+            'https://purl.imsglobal.org/spec/lti/claim/resource_link': {'id': 'benchmark'},
+            'https://purl.imsglobal.org/spec/lti/claim/roles': [],
+            'https://purl.imsglobal.org/spec/lti/claim/context': {'id': CONTEXT_ID, 'title': 'Benchmark'},
+        }, private_key, algorithm='RS256', headers={'kid': KEY_ID})
+
+    async def launch(self: 'VirtualUser', client: AsyncHTTPClient) -> None:
+        """Complete the LTI launch."""
+        body = urllib.parse.urlencode({'id_token': self.token, 'state': self.state})
+        response = await client.fetch(f'{self._base}/lti', method='POST', body=body, follow_redirects=False,
+                                      raise_error=False, headers={'Cookie': self.cookie_header})
+        if response.code != 302:
+            raise Exception(f'Launch failed with {response.code}')
+        self._store_cookies(response)
+
+    async def app(self: 'VirtualUser', client: AsyncHTTPClient) -> None:
+        """Load the application page."""
+        await client.fetch(f'{self._base}/app', headers={'Cookie': self.cookie_header,
+                                                         'Accept-Encoding': 'br, gzip'})
+
+    async def connect(self: 'VirtualUser', client: AsyncHTTPClient) -> None:
+        """Open the API connection."""
+        url = self._base.replace('http://', 'ws://')
+        self.connection = await websocket_connect(HTTPRequest(f'{url}/api', headers={'Cookie': self.cookie_header}))
+
+    async def request(self: 'VirtualUser', message_type: str, expected: str) -> None:
+        """Send an API request and wait for its reply."""
+        self.connection.write_message(json.dumps({'type': message_type, 'id': message_type}))
+        while True:
+            reply = await self.connection.read_message()
+            if reply is None:
+                raise Exception('Connection closed')
+            reply = json.loads(reply)
+            if reply.get('id') == message_type:
+                if reply['type'] != expected:
+                    raise Exception(f'Unexpected reply {reply["type"]}')
+                return
+
+    async def request_user(self: 'VirtualUser', client: AsyncHTTPClient) -> None:
+        """Request the user."""
+        await self.request('request-user', 'user')
+
+    async def request_containers(self: 'VirtualUser', client: AsyncHTTPClient) -> None:
+        """Request the containers."""
+        await self.request('request-containers', 'containers')
+
+
+async def run_stage(stage: str, users: list[VirtualUser], concurrency: int, client: AsyncHTTPClient,
+                    recorder: Recorder) -> list[VirtualUser]:
+    """Run one stage for all users that completed the previous stages.
+
+    :return: The users that completed the stage
+    :rtype: list[VirtualUser]
+    """
+    slots = asyncio.Semaphore(concurrency)
+    completed = []
+
+    async def one(user: VirtualUser) -> None:
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await getattr(user, stage.replace('-', '_'))(client)
+                recorder.latencies[stage].append(time.perf_counter() - start)
+                completed.append(user)
+            except Exception as e:
+                recorder.errors[stage] = recorder.errors[stage] + 1
+                if recorder.errors[stage] == 1:
+                    click.echo(f'{stage} failed: {e}', err=True)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(user) for user in users])
+    recorder.durations[stage] = time.perf_counter() - start
+    return completed
+
+
+async def probe(base: str, recorder: Recorder, stop: asyncio.Event) -> None:
+    """Measure the latency of ``request-config`` until ``stop`` is set."""
+    connection = await websocket_connect(f'{base.replace("http://", "ws://")}/api')
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            connection.write_message(json.dumps({'type': 'request-config', 'id': 'probe'}))
+            if await connection.read_message() is None:
+                recorder.errors['launch-lag'] = recorder.errors['launch-lag'] + 1
+                return
+            recorder.latencies['launch-lag'].append(time.perf_counter() - start)
+            await asyncio.sleep(PROBE_INTERVAL)
+    finally:
+        connection.close()
+
+
+async def drive(base: str, users: int, concurrency: int) -> dict:
+    """Drive all users through the flow.
+
+    :return: The summary of each stage
+    :rtype: dict
+    """
+    client = AsyncHTTPClient(force_instance=True, max_clients=concurrency)
+    recorder = Recorder()
+    with open(PRIVATE_KEY) as in_f:
+        private_key = in_f.read()
+    active = [VirtualUser(base, idx) for idx in range(users)]
+    for stage in STAGES:
+        if stage == 'launch':
+            for user in active:
+                user.sign(private_key)
+        if stage == 'launch':
+            stop = asyncio.Event()
+            probe_task = asyncio.ensure_future(probe(base, recorder, stop))
+            active = await run_stage(stage, active, concurrency, client, recorder)
+            stop.set()
+            await probe_task
+        else:
+            active = await run_stage(stage, active, concurrency, client, recorder)
+    for user in active:
+        user.connection.close()
+    client.close()
+    return recorder.summary()
+
+
+async def wait_for_server(base: str, timeout: float) -> None:
+    """Wait until the server answers requests."""
+    client = AsyncHTTPClient(force_instance=True)
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            try:
+                await client.fetch(f'{base}/app', request_timeout=1)
+                return
+            except (OSError, HTTPClientError):
+                if time.monotonic() > deadline:
+                    raise click.ClickException('The server did not start')
+                await asyncio.sleep(0.2)
+    finally:
+        client.close()
+
+
+def report(result: dict, previous: dict | None, max_regression: float | None) -> bool:
+    """Print the result, compared with the previous result if available.
+
+    :return: Whether any stage regressed by more than ``max_regression`` percent
+    :rtype: bool
+    """
+    regressed = False
+    click.echo(f'{"stage":<20}{"count":>7}{"errors":>8}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}')
+    for stage, values in result['stages'].items():
+        line = (f'{stage:<20}{values["count"]:>7}{values["errors"]:>8}{values["rps"] or 0:>10}'
+                f'{values["p50_ms"] or 0:>10}{values["p99_ms"] or 0:>10}')
+        if previous is not None and stage in previous['stages']:
+            changes = []
+            for key in ('p50_ms', 'p99_ms'):
+                old = previous['stages'][stage][key]
+                if old and values[key] is not None:
+                    change = (values[key] - old) / old * 100
+                    changes.append(f'{key[:3]} {change:+.0f}%')
+                    if max_regression is not None and change > max_regression:
+                        regressed = True
+                        changes[-1] = changes[-1] + ' REGRESSION'
+            line = f'{line}   {", ".join(changes)}'
+        click.echo(line)
+    if previous is not None:
+        click.echo(f'Compared with {previous["commit"]} from {previous["time"]}')
+    return regressed
+
+
+@click.group()
+def main() -> None:
+    """Benchmark the Compute Home server end to end."""
+    pass
+
+
+@click.command()
+@click.option('--port', default=8950, help='The port to serve the stubs on.')
+@click.option('--hub-latency', default=0.0, help='The delay of each stub JupyterHub response in seconds.')
+def stubs(port: int, hub_latency: float) -> None:
+    """Run the fake LTI platform and the stub JupyterHub."""
+    async def serve() -> None:
+        Application([('/jwks', KeySetHandler, {'key_set': key_set()})]).listen(port, '127.0.0.1')
+        Application([('/hub/api/users/([^/]+)', HubUserHandler, {'latency': hub_latency})]).listen(port + 1,
+                                                                                                     '127.0.0.1')
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+main.add_command(stubs)
+
+
+@click.command()
+@click.option('--users', default=500, help='The number of distinct users to drive through the flow.')
+@click.option('--concurrency', default=50, help='The number of users in the same stage at the same time.')
+@click.option('--workers', default=1, help='The number of server worker processes.')
+@click.option('--dsn', default=None, help='The database to use, defaults to SQLite in a temporary directory. An '
+              'existing database is set up and reused.')
+@click.option('--hub-latency', default=0.0, help='The delay of each stub JupyterHub response in seconds.')
+@click.option('--verify-workers', default=0, help='The number of processes that verify launch signatures.')
+@click.option('--port', default=8950, help='The port for the server, the next two ports are used for the stubs.')
+@click.option('--results', default=os.path.join(ROOT, 'benchmarks', 'results.jsonl'),
+              help='The file to append the results to.')
+@click.option('--max-regression', type=float, default=None,
+              help='Exit with an error if any p50 or p99 latency is this many percent above the previous result.')
+def run(users: int, concurrency: int, workers: int, dsn: str | None, hub_latency: float, verify_workers: int,
+        port: int, results: str, max_regression: float | None) -> None:
+    """Run the benchmark."""
+    settings = {'users': users, 'concurrency': concurrency, 'workers': workers,
+                'database': 'sqlite' if dsn is None else dsn.split(':')[0], 'hub_latency': hub_latency}
+    if verify_workers:
+        settings['verify_workers'] = verify_workers
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'config.yml'), 'w') as out_f:
+            yaml.dump(server_config(directory, port, dsn, verify_workers), out_f)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+        subprocess.run([sys.executable, '-m', 'container_launcher', 'setup'], cwd=directory, env=env, check=True)
+        processes = [
+            subprocess.Popen([sys.executable, __file__, 'stubs', '--port', str(port + 1), '--hub-latency',
+                              str(hub_latency)]),
+            subprocess.Popen([sys.executable, '-m', 'container_launcher', 'server', '--workers', str(workers)],
+                             cwd=directory, env=env),
+        ]
+        try:
+            base = f'http://127.0.0.1:{port}'
+            asyncio.run(wait_for_server(base, 30))
+            stages = asyncio.run(drive(base, users, concurrency))
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+    result = {'commit': git_commit(), 'time': datetime.now(tz=timezone.utc).isoformat(timespec='seconds'),
+              'settings': settings, 'stages': stages}
+    previous = None
+    if os.path.exists(results):
+        with open(results) as in_f:
+            for line in in_f:
+                if line.strip():
+                    entry = json.loads(line)
+                    if entry['settings'] == settings:
+                        previous = entry
+    with open(results, 'a') as out_f:
+        out_f.write(json.dumps(result) + '\n')
+    if report(result, previous, max_regression):
+        raise click.ClickException(f'Latency regressed by more than {max_regression}%')
+
+
+main.add_command(run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,217 @@
+"""Load test of the container job queue against stub JupyterHubs.
+
+Starts a number of stub hubs in-process, on which each spawn is pending for ``--spawn-time`` seconds before the server
+is ready or, for ``--failure-rate`` of the spawns, stopped again. Like JupyterHub's ``concurrent_spawn_limit``, a hub
+rejects spawns with ``429`` while ``--hub-spawn-limit`` spawns are pending. Every user then asks for one container to
+be started, twice as a repeated click would, with the containers spread evenly over the hubs. This is repeated for
+each number of hubs given by ``--hubs``.
+
+For each run the throughput of the completed and failed jobs, the queue latency (the time from submitting a job until
+it starts running), and the maximum number of concurrent spawns on a single hub are reported.
+
+Run ``python benchmarks/jobs.py --help`` for the available settings.
+"""
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+import click
+
+from statistics import quantiles
+from tornado.web import Application, RequestHandler
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from container_launcher.cli import validate_config  # noqa: E402
+from container_launcher.utils import set_config  # noqa: E402
+
+
+class StubHub(object):
+    """The users and servers of a single stub hub."""
+
+    def __init__(self: 'StubHub', spawn_time: float, failure_rate: float, spawn_limit: int) -> None:
+        """Create a new :class:`StubHub`.
+
+        :param spawn_time: The number of seconds a spawn is pending
+        :type spawn_time: float
+        :param failure_rate: The fraction of spawns that fail
+        :type failure_rate: float
+        :param spawn_limit: The maximum number of pending spawns
+        :type spawn_limit: int
+        """
+        self.spawn_time = spawn_time
+        self.failure_rate = failure_rate
+        self.spawn_limit = spawn_limit
+        self.users = {}
+        self.pending = 0
+        self.max_pending = 0
+        self.requests = 0
+        self.rejected = 0
+
+    async def spawn(self: 'StubHub', user_name: str, server_name: str) -> None:
+        """Complete a spawn after the spawn time."""
+        self.pending = self.pending + 1
+        self.max_pending = max(self.max_pending, self.pending)
+        await asyncio.sleep(self.spawn_time)
+        self.pending = self.pending - 1
+        if random.random() < self.failure_rate:
+            del self.users[user_name][server_name]
+        else:
+            self.users[user_name][server_name] = {'name': server_name, 'ready': True, 'pending': None,
+                                                  'url': f'/user/{user_name}/{server_name}/'}
+
+
+class HubUserHandler(RequestHandler):
+    """Get and create the users of a stub hub."""
+
+    def initialize(self: 'HubUserHandler', hub: StubHub) -> None:
+        """Set the stub hub."""
+        self._hub = hub
+        hub.requests = hub.requests + 1
+
+    def get(self: 'HubUserHandler', user_name: str) -> None:
+        """Send the user and their servers."""
+        if user_name not in self._hub.users:
+            self.send_error(404)
+        else:
+            self.write({'name': user_name, 'servers': self._hub.users[user_name]})
+
+    def post(self: 'HubUserHandler', user_name: str) -> None:
+        """Create the user."""
+        self._hub.users.setdefault(user_name, {})
+        self.set_status(201)
+
+
+class HubServerHandler(RequestHandler):
+    """Start the servers of a stub hub."""
+
+    def initialize(self: 'HubServerHandler', hub: StubHub) -> None:
+        """Set the stub hub."""
+        self._hub = hub
+        hub.requests = hub.requests + 1
+
+    def post(self: 'HubServerHandler', user_name: str, server_name: str) -> None:
+        """Start the server, unless too many spawns are pending."""
+        if self._hub.pending >= self._hub.spawn_limit:
+            self._hub.rejected = self._hub.rejected + 1
+            self.send_error(429)
+            return
+        self._hub.users[user_name][server_name] = {'name': server_name, 'ready': False, 'pending': 'spawn',
+                                                   'url': None}
+        asyncio.ensure_future(self._hub.spawn(user_name, server_name))
+        self.set_status(202)
+
+
+def percentile(values: list[float], percent: int) -> float:
+    """Get a percentile of the values.
+
+    :return: The percentile or ``0`` if there are no values
+    :rtype: float
+    """
+    if len(values) > 1:
+        return quantiles(values, n=100, method='inclusive')[percent - 1]
+    return values[0] if values else 0
+
+
+async def run_load(users: int, hubs: int, port: int, spawn_time: float, failure_rate: float,
+                   spawn_limit: int, max_concurrent: int, max_per_host: int) -> dict:
+    """Start one container for each user on the given number of stub hubs.
+
+    :return: The results of the run
+    :rtype: dict
+    """
+    from container_launcher.server.jobs import ContainerJobQueue
+
+    stubs = []
+    servers = []
+    for idx in range(hubs):
+        hub = StubHub(spawn_time, failure_rate, spawn_limit)
+        stubs.append(hub)
+        servers.append(Application([('/hub/api/users/([^/]+)', HubUserHandler, {'hub': hub}),
+                                    ('/hub/api/users/([^/]+)/servers/([^/]+)', HubServerHandler, {'hub': hub})])
+                       .listen(port + idx, '127.0.0.1'))
+    queue = ContainerJobQueue(max_concurrent, max_per_host, users * 2, int(spawn_time * users) + 60)
+    finished = []
+    done = asyncio.Event()
+
+    def listener(job: object) -> None:
+        if job.status in ('completed', 'failed'):
+            finished.append((job.status, job.started - job.queued))
+            if len(finished) == users:
+                done.set()
+
+    start = time.monotonic()
+    for idx in range(users):
+        container = {'name': 'benchmark', 'host': f'http://127.0.0.1:{port + idx % hubs}/'}
+        queue.submit(f'user-{hubs}-{idx}', container, 'start').add_listener(listener)
+        queue.submit(f'user-{hubs}-{idx}', container, 'start')
+    jobs = queue.length
+    await done.wait()
+    duration = time.monotonic() - start
+    for server in servers:
+        server.stop()
+    latencies = sorted(latency for _, latency in finished)
+    return {
+        'hubs': hubs,
+        'jobs': jobs,
+        'completed': len([status for status, _ in finished if status == 'completed']),
+        'failed': len([status for status, _ in finished if status == 'failed']),
+        'duration': duration,
+        'rate': users / duration,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'max': latencies[-1],
+        'max_spawns': max(hub.max_pending for hub in stubs),
+        'rejected': sum(hub.rejected for hub in stubs),
+        'requests': sum(hub.requests for hub in stubs),
+    }
+
+
+@click.command()
+@click.option('--users', default=500, help='The number of users that each start a container.')
+@click.option('--hubs', default=[1, 3], multiple=True, type=int, help='The number of stub hubs, may be repeated.')
+@click.option('--spawn-time', default=2.0, help='The number of seconds each spawn is pending.')
+@click.option('--failure-rate', default=0.0, help='The fraction of spawns that fail.')
+@click.option('--hub-spawn-limit', default=100, help='The number of pending spawns above which a hub returns 429.')
+@click.option('--max-concurrent', default=50, help='The jupyterhub.jobs.max_concurrent setting.')
+@click.option('--max-per-host', default=20, help='The jupyterhub.jobs.max_per_host setting.')
+@click.option('--port', default=8910, help='The first port for the stub hubs.')
+def main(users: int, hubs: list[int], spawn_time: float, failure_rate: float, hub_spawn_limit: int,
+         max_concurrent: int, max_per_host: int, port: int) -> None:
+    """Load test the container job queue against stub JupyterHubs."""
+    logging.basicConfig(level=logging.CRITICAL)
+    set_config(validate_config({
+        'app': {'containers': []},
+        'server': {'cookie_secret': 'benchmark', 'metrics': {'enabled': False}},
+        'database': {'dsn': 'sqlite+aiosqlite://'},
+        'jupyterhub': {'api_token': 'benchmark', 'max_connections': max_concurrent,
+                       'jobs': {'max_concurrent': max_concurrent, 'max_per_host': max_per_host}},
+        'lti': [{'iss': 'http://platform.benchmark', 'client_id': 'benchmark', 'auth_login_url': 'http://platform',
+                 'auth_token_url': 'http://platform', 'key_set_url': 'http://platform', 'private_key_file': 'unused',
+                 'public_key_file': 'unused', 'deployment_ids': ['1']}],
+    }))
+
+    async def run_all() -> list[dict]:
+        results = []
+        for idx, count in enumerate(hubs):
+            results.append(await run_load(users, count, port + sum(hubs[:idx]), spawn_time, failure_rate,
+                                          hub_spawn_limit, max_concurrent, max_per_host))
+        return results
+
+    click.echo(f'{users} users, spawns take {spawn_time}s, {failure_rate:.0%} fail, max_concurrent {max_concurrent}, '
+               f'max_per_host {max_per_host}')
+    click.echo(f'{"hubs":>5}{"jobs":>7}{"done":>7}{"failed":>8}{"secs":>8}{"jobs/s":>9}{"p50 s":>8}{"p95 s":>8}'
+               f'{"max s":>8}{"spawns":>8}{"429s":>7}{"hub reqs":>10}')
+    for result in asyncio.run(run_all()):
+        click.echo(f'{result["hubs"]:>5}{result["jobs"]:>7}{result["completed"]:>7}{result["failed"]:>8}'
+                   f'{result["duration"]:>8.1f}{result["rate"]:>9.1f}{result["p50"]:>8.2f}{result["p95"]:>8.2f}'
+                   f'{result["max"]:>8.2f}{result["max_spawns"]:>8}{result["rejected"]:>7}{result["requests"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
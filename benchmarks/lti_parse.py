@@ -0,0 +1,128 @@
+"""Micro-benchmark of the parsing and validation work done for each LTI launch.
+
+Runs the LTI login and launch handlers in-process, together with a fake platform that signs launches with
+``dev/private.pem`` and serves its key set. The launch handler is the real
+:class:`~container_launcher.server.handlers.lti.LtiLaunchHandler`, except that it stops once the launch has been
+validated, so that neither the database nor the hub are involved.
+
+For each launch the number of message launch objects that are created, the number of JWT parts that are base64 and
+JSON decoded, the number of times the JWT is parsed by PyJWT, and the number of signature verifications are counted.
+Together with the time taken to validate the launch, these are reported per launch.
+
+Run ``python benchmarks/lti_parse.py --help`` for the available settings.
+"""
+import asyncio
+import os
+import sys
+import time
+import urllib.parse
+
+import click
+import jwt
+import jwt.api_jws
+
+from pylti1p3.message_launch import MessageLaunch
+from statistics import median
+from tornado.httpclient import AsyncHTTPClient
+from tornado.web import Application
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e import CLIENT_ID, ISSUER, PRIVATE_KEY, PUBLIC_KEY, KeySetHandler, VirtualUser, key_set  # noqa: E402
+from container_launcher.cli import validate_config  # noqa: E402
+from container_launcher.server.handlers.lti import LtiLaunchHandler, LtiLoginStartHandler  # noqa: E402
+from container_launcher.utils import set_config  # noqa: E402
+
+
+class Counter(object):
+    """Counts the calls of a method, while still calling it."""
+
+    def __init__(self: 'Counter', cls: type, name: str) -> None:
+        """Wrap the method ``name`` of the class ``cls``."""
+        self.calls = 0
+        method = getattr(cls, name)
+
+        def counted(*args: object, **kwargs: object) -> object:
+            self.calls = self.calls + 1
+            return method(*args, **kwargs)
+
+        setattr(cls, name, counted)
+
+
+class ValidateOnlyLaunchHandler(LtiLaunchHandler):
+    """Launch handler that only validates the launch and records how long that took."""
+
+    durations = []
+
+    async def post(self: 'ValidateOnlyLaunchHandler') -> None:
+        """Validate the launch."""
+        start = time.perf_counter()
+        await self.get_launch_data()
+        self.durations.append(time.perf_counter() - start)
+        self.write('validated')
+
+
+async def run_launches(launches: int, port: int) -> dict:
+    """Log in and launch the given number of users, one after the other.
+
+    :return: The counts per launch and the median validation time in milliseconds
+    :rtype: dict
+    """
+    Application([('/jwks', KeySetHandler, {'key_set': key_set()})]).listen(port + 1, '127.0.0.1')
+    Application([('/lti', ValidateOnlyLaunchHandler), ('/lti/login', LtiLoginStartHandler)],
+                cookie_secret='benchmark').listen(port, '127.0.0.1')
+    base = f'http://127.0.0.1:{port}'
+    client = AsyncHTTPClient(force_instance=True)
+    with open(PRIVATE_KEY) as in_f:
+        private_key = in_f.read()
+    counters = {
+        'launch objects': Counter(MessageLaunch, '__init__'),
+        'JWT part decodes': Counter(MessageLaunch, 'urlsafe_b64decode'),
+        'PyJWT parses': Counter(jwt.api_jws.PyJWS, '_load'),
+        'signature checks': Counter(jwt.api_jws.PyJWS, '_verify_signature'),
+    }
+    totals = dict.fromkeys(counters, 0)
+    for idx in range(launches):
+        user = VirtualUser(base, idx)
+        await user.login(client)
+        user.sign(private_key)
+        before = {name: counter.calls for name, counter in counters.items()}
+        body = urllib.parse.urlencode({'id_token': user.token, 'state': user.state})
+        response = await client.fetch(f'{base}/lti', method='POST', body=body, raise_error=False,
+                                      headers={'Cookie': user.cookie_header})
+        if response.code != 200:
+            raise click.ClickException(f'Launch failed with {response.code}')
+        for name, counter in counters.items():
+            totals[name] = totals[name] + counter.calls - before[name]
+    client.close()
+    # The first launch also fetches the key set
+    durations = ValidateOnlyLaunchHandler.durations[1:] or ValidateOnlyLaunchHandler.durations
+    return {'counts': {name: total / launches for name, total in totals.items()},
+            'validate_ms': median(durations) * 1000}
+
+
+@click.command()
+@click.option('--launches', default=200, help='The number of launches to validate.')
+@click.option('--port', default=8930, help='The port for the server, the next port is used for the key set.')
+def main(launches: int, port: int) -> None:
+    """Count the parsing and validation work done for each LTI launch."""
+    set_config(validate_config({
+        'app': {'containers': []},
+        'server': {'cookie_secret': 'benchmark', 'session': {'backend': 'memory'}, 'metrics': {'enabled': False}},
+        'database': {'dsn': 'sqlite+aiosqlite://'},
+        'jupyterhub': {'api_token': 'benchmark'},
+        'lti': [{'iss': ISSUER, 'client_id': CLIENT_ID, 'auth_login_url': f'{ISSUER}/auth',
+                 'auth_token_url': f'{ISSUER}/token', 'key_set_url': f'http://127.0.0.1:{port + 1}/jwks',
+                 'private_key_file': PRIVATE_KEY, 'public_key_file': PUBLIC_KEY, 'deployment_ids': ['1']}],
+    }))
+    result = asyncio.run(run_launches(launches, port))
+    click.echo(f'{launches} launches, per launch:')
+    for name, count in result['counts'].items():
+        click.echo(f'{name:<20}{count:>8.2f}')
+    click.echo(f'{"validate ms (p50)":<20}{result["validate_ms"]:>8.3f}')
+
+
+if __name__ == '__main__':
+    main()
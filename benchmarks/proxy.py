@@ -0,0 +1,149 @@
+"""Throughput benchmark of the reverse proxy to the container hosts.
+
+Runs the proxy handlers in-process in front of a local echo host that answers each request with ``--size`` bytes, and
+logs a user in whose group has access to the echo container. ``--connections`` keep-alive client connections then
+each send ``--requests`` requests, once directly to the echo host and once through the proxy, and the throughput and
+latency of both are reported. Clients, proxy and echo host share one event loop, so the difference between the two
+runs is the work that the proxy adds to each request.
+
+Run ``python benchmarks/proxy.py --help`` for the available settings.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import click
+
+from datetime import datetime, timedelta, timezone
+from tornado.http1connection import HTTP1Connection, HTTP1ConnectionParameters
+from tornado.httputil import HTTPHeaders, HTTPMessageDelegate, RequestStartLine, ResponseStartLine
+from tornado.tcpclient import TCPClient
+from tornado.web import Application, RequestHandler, create_signed_value
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e import CLIENT_ID, ISSUER, PRIVATE_KEY, PUBLIC_KEY  # noqa: E402
+from benchmarks.jobs import percentile  # noqa: E402
+from container_launcher.cli import validate_config  # noqa: E402
+from container_launcher.models import Base, Group, User, get_engine, get_sessionmaker  # noqa: E402
+from container_launcher.server.handlers.proxy import ContainerProxyHandler  # noqa: E402
+from container_launcher.server.session import get_session_backend  # noqa: E402
+from container_launcher.utils import set_config  # noqa: E402
+
+
+# Name of the session cookie, as set in the configuration
+SESSION_COOKIE = 'compute_home_session'
+
+
+class EchoHandler(RequestHandler):
+    """Container host that answers every request with the same body."""
+
+    def initialize(self: 'EchoHandler', body: bytes) -> None:
+        """Set the body to answer with."""
+        self.body = body
+
+    def get(self: 'EchoHandler', path: str) -> None:
+        """Send the body."""
+        self.write(self.body)
+
+
+class Response(HTTPMessageDelegate):
+    """Discards a response, only keeping its status code."""
+
+    def __init__(self: 'Response') -> None:
+        """Create an empty response."""
+        self.code = None
+
+    def headers_received(self: 'Response', start_line: ResponseStartLine, headers: HTTPHeaders) -> None:
+        """Store the status code."""
+        self.code = start_line.code
+
+
+async def send_requests(port: int, path: str, cookie: str, requests: int) -> list[float]:
+    """Send requests one after the other on a single keep-alive connection.
+
+    :return: The latency of each request in seconds
+    :rtype: list[float]
+    """
+    stream = await TCPClient().connect('127.0.0.1', port)
+    headers = HTTPHeaders({'Host': f'127.0.0.1:{port}', 'Cookie': cookie})
+    latencies = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            connection = HTTP1Connection(stream, True, HTTP1ConnectionParameters())
+            await connection.write_headers(RequestStartLine('GET', path, 'HTTP/1.1'), headers.copy())
+            connection.finish()
+            response = Response()
+            await connection.read_response(response)
+            if response.code != 200:
+                raise click.ClickException(f'Request to {path} failed with {response.code}')
+            latencies.append(time.perf_counter() - start)
+    finally:
+        stream.close()
+    return latencies
+
+
+async def run_load(port: int, connections: int, requests: int, size: int) -> dict:
+    """Send the requests directly to the echo host and through the proxy.
+
+    :return: The requests per second and the p50 and p99 latency in milliseconds of both runs
+    :rtype: dict
+    """
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with get_sessionmaker()() as dbsession:
+        user = User(external_id='benchmark-user', attributes={'name': 'Benchmark user'})
+        dbsession.add(Group(external_id='benchmark', attributes={}, users=[user]))
+        await dbsession.commit()
+        user_id = user.id
+    await get_session_backend().save('benchmark', {'user_id': user_id}, datetime.now(timezone.utc) + timedelta(days=1))
+    cookie = f'{SESSION_COOKIE}={create_signed_value("benchmark", SESSION_COOKIE, "benchmark").decode("utf-8")}'
+
+    Application([('/(.*)', EchoHandler, {'body': b'x' * size})]).listen(port + 1, '127.0.0.1')
+    Application([('/containers/([^/]+)/(.*)', ContainerProxyHandler)],
+                cookie_secret='benchmark').listen(port, '127.0.0.1')
+    result = {}
+    for name, target_port, path in (('direct', port + 1, '/echo'), ('proxy', port, '/containers/echo/echo')):
+        start = time.perf_counter()
+        latencies = [latency for connection in await asyncio.gather(*[
+            send_requests(target_port, path, cookie, requests) for _ in range(connections)]) for latency in connection]
+        duration = time.perf_counter() - start
+        result[name] = {'rps': len(latencies) / duration, 'p50_ms': percentile(latencies, 50) * 1000,
+                        'p99_ms': percentile(latencies, 99) * 1000}
+    await get_engine().dispose()
+    return result
+
+
+@click.command()
+@click.option('--connections', default=20, help='The number of concurrent keep-alive client connections.')
+@click.option('--requests', default=500, help='The number of requests sent on each connection.')
+@click.option('--size', default=1024, help='The size in bytes of each response body.')
+@click.option('--port', default=8940, help='The port for the proxy, the next port is used for the echo host.')
+def main(connections: int, requests: int, size: int, port: int) -> None:
+    """Measure the throughput of the proxy against a local echo host."""
+    with tempfile.TemporaryDirectory() as directory:
+        set_config(validate_config({
+            'app': {'containers': [{'name': 'echo', 'title': 'Echo', 'host': f'http://127.0.0.1:{port + 1}/',
+                                    'groups': ['benchmark']}]},
+            'server': {'cookie_secret': 'benchmark', 'session': {'backend': 'memory', 'name': SESSION_COOKIE},
+                       'metrics': {'enabled': False}, 'proxy': {'enabled': True}},
+            'database': {'dsn': f'sqlite+aiosqlite:///{os.path.join(directory, "benchmark.db")}'},
+            'jupyterhub': {'api_token': 'benchmark'},
+            'lti': [{'iss': ISSUER, 'client_id': CLIENT_ID, 'auth_login_url': f'{ISSUER}/auth',
+                     'auth_token_url': f'{ISSUER}/token', 'key_set_url': f'{ISSUER}/jwks',
+                     'private_key_file': PRIVATE_KEY, 'public_key_file': PUBLIC_KEY, 'deployment_ids': ['1']}],
+        }))
+        result = asyncio.run(run_load(port, connections, requests, size))
+    click.echo(f'{connections} connections x {requests} requests, {size} byte responses')
+    click.echo(f'{"":<8}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}')
+    for name, values in result.items():
+        click.echo(f'{name:<8}{values["rps"]:>10.0f}{values["p50_ms"]:>10.2f}{values["p99_ms"]:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
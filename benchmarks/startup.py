@@ -0,0 +1,67 @@
+"""Import-time budget for the command-line interface.
+
+Runs ``python -X importtime -c "import container_launcher.cli"`` a number of times and reports the median cumulative
+import time of :mod:`container_launcher.cli`. The check fails if the median exceeds the budget or if any of the
+``HEAVY_MODULES`` is imported, as these must only be imported by the commands that need them.
+
+Run ``python benchmarks/startup.py --help`` for the available settings.
+"""
+import os
+import subprocess
+import sys
+
+import click
+
+from statistics import median
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that must not be imported when the command-line interface is loaded
+HEAVY_MODULES = ('tornado', 'sqlalchemy', 'alembic', 'asyncpg', 'pylti1p3', 'jwt', 'cerberus', 'yaml')
+
+
+def measure() -> tuple[int, set[str]]:
+    """Import the command-line interface in a new interpreter.
+
+    :return: The cumulative import time of :mod:`container_launcher.cli` in microseconds and the top-level packages
+             that were imported
+    :rtype: tuple[int, set[str]]
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import container_launcher.cli'],
+                             env=env, capture_output=True, text=True, check=True)
+    cumulative = None
+    packages = set()
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, total, name = line.split('|')
+        name = name.strip()
+        packages.add(name.split('.')[0])
+        if name == 'container_launcher.cli':
+            cumulative = int(total)
+    return cumulative, packages
+
+
+@click.command()
+@click.option('--runs', default=5, help='The number of times to import the command-line interface.')
+@click.option('--budget', default=150.0, help='The maximum median import time in milliseconds.')
+def main(runs: int, budget: float) -> None:
+    """Check the import time of the command-line interface against the budget."""
+    times = []
+    packages = set()
+    for _ in range(runs):
+        cumulative, imported = measure()
+        times.append(cumulative / 1000)
+        packages.update(imported)
+    result = median(times)
+    click.echo(f'container_launcher.cli imports in {result:.1f} ms (median of {runs}, budget {budget:.0f} ms)')
+    heavy = sorted(packages.intersection(HEAVY_MODULES))
+    if heavy:
+        raise click.ClickException(f'The command-line interface imports {", ".join(heavy)}')
+    if result > budget:
+        raise click.ClickException(f'The import time exceeds the budget of {budget:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
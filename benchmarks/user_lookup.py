@@ -0,0 +1,99 @@
+"""Benchmark of looking up a launch user by external id in a large users table.
+
+Creates the schema in a new SQLite database in a temporary directory, or in the database given by ``--dsn``, fills
+the users table with ``--users`` users, and times looking up random users by their external id, the lookup every
+launch makes. The lookups are timed once with the unique ``external_id`` index and once after dropping it, which is
+how the table was indexed before the index was added.
+
+Run ``python benchmarks/user_lookup.py --help`` for the available settings.
+"""
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+import click
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.future import select
+from statistics import median
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from container_launcher.models import Base, User  # noqa: E402
+
+
+# Number of users inserted per statement
+BATCH_SIZE = 10000
+
+
+async def time_lookups(connection: object, external_ids: list[str]) -> float:
+    """Look up each of the users and return the median time per lookup.
+
+    :return: The median time per lookup in milliseconds
+    :rtype: float
+    """
+    users = User.__table__
+    durations = []
+    for external_id in external_ids:
+        start = time.perf_counter()
+        (await connection.execute(select(users.c.id).filter(users.c.external_id == external_id))).scalar_one()
+        durations.append(time.perf_counter() - start)
+    return median(durations) * 1000
+
+
+async def run_lookups(dsn: str, users: int, lookups: int) -> dict:
+    """Fill the users table and time the lookups with and without the index.
+
+    :return: The median lookup time in milliseconds with and without the index
+    :rtype: dict
+    """
+    engine = create_async_engine(dsn)
+    users_table = User.__table__
+    index = next(index for index in users_table.indexes if list(index.columns) == [users_table.c.external_id])
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+            for start in range(0, users, BATCH_SIZE):
+                await connection.execute(users_table.insert(), [
+                    {'external_id': f'benchmark-user-{idx}', 'attributes': {'name': f'Benchmark user {idx}'}}
+                    for idx in range(start, min(start + BATCH_SIZE, users))
+                ])
+        async with engine.connect() as connection:
+            if engine.dialect.name == 'postgresql':
+                await connection.execute(text('ANALYZE users'))
+            external_ids = [f'benchmark-user-{random.randrange(users)}' for _ in range(lookups)]
+            indexed = await time_lookups(connection, external_ids)
+            await connection.execute(text(f'DROP INDEX {index.name}'))
+            await connection.commit()
+            unindexed = await time_lookups(connection, external_ids[:max(1, lookups // 10)])
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+    finally:
+        await engine.dispose()
+    return {'indexed': indexed, 'unindexed': unindexed}
+
+
+@click.command()
+@click.option('--users', default=500000, help='The number of users in the users table.')
+@click.option('--lookups', default=1000, help='The number of lookups with the index, a tenth of that without.')
+@click.option('--dsn', default=None, help='The database to use, defaults to SQLite in a temporary directory. All '
+              'tables in the database are dropped.')
+def main(users: int, lookups: int, dsn: str | None) -> None:
+    """Time looking up launch users by external id with and without the unique index."""
+    with tempfile.TemporaryDirectory() as directory:
+        result = asyncio.run(run_lookups(dsn or f'sqlite+aiosqlite:///{os.path.join(directory, "benchmark.db")}',
+                                         users, lookups))
+    click.echo(f'{users} users, median time per lookup:')
+    click.echo(f'{"with the unique index":<26}{result["indexed"]:>10.3f} ms')
+    click.echo(f'{"without an index":<26}{result["unindexed"]:>10.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,25 @@
-"""ComputeHome command-line application."""
-import asyncio
+"""ComputeHome command-line application.
+
+The server, database and migration modules are only imported by the commands that use them, so that parsing the
+command line and loading the configuration stay fast.
+"""
 import click
+import hashlib
+import json
 import logging
-import logging.config
-import yaml
 import os
+import tempfile
 
-from cerberus import Validator
 from typing import Union
 
-from .setup import setup_database
-from ..server import run_application_server
-from ..utils import set_config
+from ..log import configure_logging
+from ..utils import config, set_config
 
 
 logger = logging.getLogger(__name__)
 
+# The configuration files that are used, in order of preference
+CONFIG_FILES = ('config.yml', '/etc/compute_home/config.yml')
 CONFIG_SCHEMA = {
     'app': {
         'type': 'dict',
@@ -69,6 +73,52 @@ CONFIG_SCHEMA = {
                             'schema': {
                                 'type': 'string'
                             }
+                        },
+                        'prewarm': {
+                            'type': 'dict',
+                            'schema': {
+                                'size': {
+                                    'type': 'integer',
+                                    'min': 0,
+                                    'default': 0
+                                },
+                                'schedule': {
+                                    'type': 'list',
+                                    'default': [],
+                                    'schema': {
+                                        'type': 'dict',
+                                        'schema': {
+                                            'days': {
+                                                'type': 'list',
+                                                'required': True,
+                                                'schema': {
+                                                    'type': 'string',
+                                                    'allowed': ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+                                                }
+                                            },
+                                            'start': {
+                                                'type': 'string',
+                                                'required': True,
+                                                'regex': '^([01][0-9]|2[0-3]):[0-5][0-9]$'
+                                            },
+                                            'end': {
+                                                'type': 'string',
+                                                'required': True,
+                                                'regex': '^([01][0-9]|2[0-3]):[0-5][0-9]$'
+                                            },
+                                            'size': {
+                                                'type': 'integer',
+                                                'required': True,
+                                                'min': 1
+                                            }
+                                        }
+                                    }
+                                }
+                            },
+                            'default': {
+                                'size': 0,
+                                'schedule': []
+                            }
                         }
                     }
                 }
@@ -96,6 +146,16 @@ CONFIG_SCHEMA = {
                 'required': True,
                 'empty': False,
             },
+            'workers': {
+                'type': 'integer',
+                'min': 1,
+                'default': 1
+            },
+            'shutdown_timeout': {
+                'type': 'integer',
+                'min': 0,
+                'default': 10
+            },
             'session': {
                 'type': 'dict',
                 'schema': {
@@ -107,15 +167,367 @@ CONFIG_SCHEMA = {
                     'validity_days': {
                         'type': 'integer',
                         'default': 14
+                    },
+                    'backend': {
+                        'type': 'string',
+                        'allowed': ['memory', 'sql'],
+                        'default': 'sql'
                     }
                 },
                 'default': {
                     'name': 'compute_home_session',
-                    'validity_days': 14
+                    'validity_days': 14,
+                    'backend': 'sql'
+                }
+            },
+            'user_cache': {
+                'type': 'dict',
+                'schema': {
+                    'size': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 10000
+                    },
+                    'ttl': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 300
+                    }
+                },
+                'default': {
+                    'size': 10000,
+                    'ttl': 300
+                }
+            },
+            'websocket': {
+                'type': 'dict',
+                'schema': {
+                    'compression': {
+                        'type': 'boolean',
+                        'default': True
+                    },
+                    'compression_level': {
+                        'type': 'integer',
+                        'min': 1,
+                        'max': 9,
+                        'default': 6
+                    },
+                    'ping_interval': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 30
+                    },
+                    'ping_timeout': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 30
+                    },
+                    'max_message_size': {
+                        'type': 'integer',
+                        'min': 1024,
+                        'default': 65536
+                    },
+                    'max_per_user': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 10
+                    },
+                    'max_buffer': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 1048576
+                    }
+                },
+                'default': {
+                    'compression': True,
+                    'compression_level': 6,
+                    'ping_interval': 30,
+                    'ping_timeout': 30,
+                    'max_message_size': 65536,
+                    'max_per_user': 10,
+                    'max_buffer': 1048576
+                }
+            },
+            'metrics': {
+                'type': 'dict',
+                'schema': {
+                    'enabled': {
+                        'type': 'boolean',
+                        'default': False
+                    },
+                    'token': {
+                        'type': 'string',
+                        'default': '',
+                        'empty': True
+                    }
+                },
+                'default': {
+                    'enabled': False,
+                    'token': ''
+                }
+            },
+            'reload': {
+                'type': 'dict',
+                'schema': {
+                    'watch': {
+                        'type': 'boolean',
+                        'default': False
+                    },
+                    'interval': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 5
+                    }
+                },
+                'default': {
+                    'watch': False,
+                    'interval': 5
+                }
+            },
+            'launch_verification': {
+                'type': 'dict',
+                'schema': {
+                    'workers': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 0
+                    }
+                },
+                'default': {
+                    'workers': 0
+                }
+            },
+            'proxy': {
+                'type': 'dict',
+                'schema': {
+                    'enabled': {
+                        'type': 'boolean',
+                        'default': False
+                    },
+                    'max_idle': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 10
+                    },
+                    'idle_timeout': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 30
+                    },
+                    'connect_timeout': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 10
+                    },
+                    'websocket_max_message_size': {
+                        'type': 'integer',
+                        'min': 1024,
+                        'default': 10485760
+                    }
+                },
+                'default': {
+                    'enabled': False,
+                    'max_idle': 10,
+                    'idle_timeout': 30,
+                    'connect_timeout': 10,
+                    'websocket_max_message_size': 10485760
+                }
+            },
+            'admission': {
+                'type': 'dict',
+                'schema': {
+                    'max_in_flight': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 0
+                    },
+                    'issuer_rate': {
+                        'type': 'number',
+                        'min': 0,
+                        'default': 0
+                    },
+                    'issuer_burst': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 50
+                    },
+                    'user_rate': {
+                        'type': 'number',
+                        'min': 0,
+                        'default': 0
+                    },
+                    'user_burst': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 5
+                    },
+                    'max_buckets': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 10000
+                    },
+                    'retry_after': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 5
+                    },
+                    'waiting_page': {
+                        'type': 'boolean',
+                        'default': True
+                    }
+                },
+                'default': {
+                    'max_in_flight': 0,
+                    'issuer_rate': 0,
+                    'issuer_burst': 50,
+                    'user_rate': 0,
+                    'user_burst': 5,
+                    'max_buckets': 10000,
+                    'retry_after': 5,
+                    'waiting_page': True
                 }
             }
         },
     },
+    'jupyterhub': {
+        'type': 'dict',
+        'schema': {
+            'api_token': {
+                'type': 'string',
+                'default': '',
+                'empty': True
+            },
+            'max_connections': {
+                'type': 'integer',
+                'min': 1,
+                'default': 10
+            },
+            'request_timeout': {
+                'type': 'integer',
+                'min': 1,
+                'default': 10
+            },
+            'state_ttl': {
+                'type': 'integer',
+                'min': 0,
+                'default': 5
+            },
+            'poll_interval': {
+                'type': 'integer',
+                'min': 1,
+                'default': 15
+            },
+            'pending_poll_interval': {
+                'type': 'integer',
+                'min': 1,
+                'default': 1
+            },
+            'jobs': {
+                'type': 'dict',
+                'schema': {
+                    'max_concurrent': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 50
+                    },
+                    'max_per_host': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 10
+                    },
+                    'max_queued': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 5000
+                    },
+                    'timeout': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 300
+                    }
+                },
+                'default': {
+                    'max_concurrent': 50,
+                    'max_per_host': 10,
+                    'max_queued': 5000,
+                    'timeout': 300
+                }
+            },
+            'cull': {
+                'type': 'dict',
+                'schema': {
+                    'enabled': {
+                        'type': 'boolean',
+                        'default': True
+                    },
+                    'idle_timeout': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 300
+                    },
+                    'interval': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 60
+                    },
+                    'batch_size': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 20
+                    }
+                },
+                'default': {
+                    'enabled': True,
+                    'idle_timeout': 300,
+                    'interval': 60,
+                    'batch_size': 20
+                }
+            },
+            'prewarm': {
+                'type': 'dict',
+                'schema': {
+                    'interval': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 60
+                    },
+                    'lead_time': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 900
+                    }
+                },
+                'default': {
+                    'interval': 60,
+                    'lead_time': 900
+                }
+            }
+        },
+        'default': {
+            'api_token': '',
+            'max_connections': 10,
+            'request_timeout': 10,
+            'state_ttl': 5,
+            'poll_interval': 15,
+            'pending_poll_interval': 1,
+            'jobs': {
+                'max_concurrent': 50,
+                'max_per_host': 10,
+                'max_queued': 5000,
+                'timeout': 300
+            },
+            'cull': {
+                'enabled': True,
+                'idle_timeout': 300,
+                'interval': 60,
+                'batch_size': 20
+            },
+            'prewarm': {
+                'interval': 60,
+                'lead_time': 900
+            }
+        }
+    },
     'database': {
         'type': 'dict',
         'required': True,
@@ -123,7 +535,49 @@ CONFIG_SCHEMA = {
             'dsn': {
                 'type': 'string',
                 'required': True,
+                'regex': r'^(postgresql|sqlite)(\+\w+)?://.*'
             },
+            'pool': {
+                'type': 'dict',
+                'schema': {
+                    'size': {
+                        'type': 'integer',
+                        'min': 1,
+                        'default': 5
+                    },
+                    'max_overflow': {
+                        'type': 'integer',
+                        'min': -1,
+                        'default': 10
+                    },
+                    'timeout': {
+                        'type': 'number',
+                        'min': 0,
+                        'default': 30
+                    },
+                    'pre_ping': {
+                        'type': 'boolean',
+                        'default': False
+                    },
+                    'recycle': {
+                        'type': 'integer',
+                        'default': -1
+                    },
+                    'statement_cache_size': {
+                        'type': 'integer',
+                        'min': 0,
+                        'default': 100
+                    }
+                },
+                'default': {
+                    'size': 5,
+                    'max_overflow': 10,
+                    'timeout': 30,
+                    'pre_ping': False,
+                    'recycle': -1,
+                    'statement_cache_size': 100
+                }
+            }
         }
     },
     'lti': {
@@ -175,6 +629,11 @@ CONFIG_SCHEMA = {
                     'schema': {
                         'type': 'string'
                     }
+                },
+                'key_set_ttl': {
+                    'type': 'integer',
+                    'min': 0,
+                    'default': 3600,
                 }
             }
         }
@@ -185,6 +644,24 @@ CONFIG_SCHEMA = {
     },
     'logging': {
         'type': 'dict'
+    },
+    'log_queue': {
+        'type': 'dict',
+        'default': {
+            'enabled': False,
+            'size': 10000,
+        },
+        'schema': {
+            'enabled': {
+                'type': 'boolean',
+                'default': False,
+            },
+            'size': {
+                'type': 'integer',
+                'min': 1,
+                'default': 10000,
+            }
+        }
     }
 }
 
@@ -197,6 +674,8 @@ def validate_config(config: dict) -> dict:
     :return: The validated and normalised configuration
     :rtype: dict
     """
+    from cerberus import Validator
+
     validator = Validator(CONFIG_SCHEMA)
     if validator.validate(config):
         return validator.normalized(config)
@@ -218,28 +697,133 @@ def validate_config(config: dict) -> dict:
         raise click.ClickException(f'Configuration errors:\n\n{error_str}')
 
 
+def find_config_file() -> str | None:
+    """Find the configuration file.
+
+    :return: The path of the first configuration file that exists or ``None`` if there is none
+    :rtype: str
+    """
+    for path in CONFIG_FILES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def config_cache_path(path: str) -> str:
+    """Get the path of the file in which the normalised configuration of a configuration file is cached.
+
+    The normalised configuration contains the same secrets as the configuration file, such as the cookie secret, the
+    database password and the hub's API token. The cache is therefore kept next to the configuration file, in the same
+    directory, rather than in a cache directory that may be shared or backed up differently.
+
+    :param path: The path of the configuration file
+    :type path: str
+    :return: The path of the cache file
+    :rtype: str
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f'.{name}.cache.json')
+
+
+def read_cached_config(path: str, digest: str) -> dict | None:
+    """Read the cached normalised configuration of a configuration file.
+
+    :param path: The path of the configuration file
+    :type path: str
+    :param digest: The digest of the configuration file's content and the configuration schema
+    :type digest: str
+    :return: The normalised configuration or ``None`` if it is not cached for the current content
+    :rtype: dict
+    """
+    try:
+        with open(config_cache_path(path)) as in_f:
+            cached = json.load(in_f)
+    except (OSError, ValueError):
+        return None
+    if isinstance(cached, dict) and cached.get('digest') == digest and isinstance(cached.get('config'), dict):
+        return cached['config']
+    return None
+
+
+def write_cached_config(path: str, digest: str, normalised: dict) -> None:
+    """Cache the normalised configuration of a configuration file.
+
+    The configuration is only cached if it survives the round-trip through JSON unchanged. The cache file is only
+    readable by its owner. Failing to write the cache, for example because the configuration file's directory is not
+    writable, is not an error.
+
+    :param path: The path of the configuration file
+    :type path: str
+    :param digest: The digest of the configuration file's content and the configuration schema
+    :type digest: str
+    :param normalised: The normalised configuration
+    :type normalised: dict
+    """
+    try:
+        data = json.dumps({'digest': digest, 'config': normalised})
+        if json.loads(data)['config'] != normalised:
+            return
+        cache_path = config_cache_path(path)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as out_f:
+                out_f.write(data)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug(f'Not caching the configuration: {e}')
+
+
+def load_config(path: str) -> dict:
+    """Load and validate the configuration file.
+
+    The normalised configuration is cached, keyed by the digest of the file's content and the configuration schema,
+    so that an unchanged file is neither parsed nor validated again.
+
+    :param path: The path of the configuration file
+    :type path: str
+    :return: The validated and normalised configuration
+    :rtype: dict
+    """
+    with open(path, 'rb') as in_f:
+        content = in_f.read()
+    digest = hashlib.sha256(repr(CONFIG_SCHEMA).encode('utf-8') + b'\0' + content).hexdigest()
+    normalised = read_cached_config(path, digest)
+    if normalised is not None:
+        return normalised
+    import yaml
+
+    config = yaml.load(content, Loader=yaml.FullLoader)
+    if not config:
+        raise click.ClickException(f'The configuration file {path} is empty')
+    normalised = validate_config(config)
+    write_cached_config(path, digest, normalised)
+    return normalised
+
+
 @click.group()
 def main() -> None:
     """Run the Compute Home applications."""
-    config = None
-    if os.path.exists('config.yml'):
-        with open('config.yml') as in_f:
-            config = yaml.load(in_f, Loader=yaml.FullLoader)
-    elif os.path.exists('/etc/compute_home/config.yml'):
-        with open('/etc/compute_home/config.yml') as in_f:
-            config = yaml.load(in_f, Loader=yaml.FullLoader)
-    if not config:
-        raise click.ClickException('No configuration found (./config.yml, /etc/compute_home/config.yml)')
-    normalised = validate_config(config)
+    path = find_config_file()
+    if path is None:
+        raise click.ClickException(f'No configuration found ({", ".join(CONFIG_FILES)})')
+    normalised = load_config(path)
     set_config(normalised)
-    if 'logging' in normalised:
-        logging.config.dictConfig(normalised['logging'])
+    configure_logging(normalised)
 
 
 @click.command()
-def server() -> None:
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='The number of worker processes (overrides the server.workers setting).')
+def server(workers: int | None) -> None:
     """Run the Compute Home server."""
-    run_application_server()
+    from ..server import run_application_server
+
+    if workers is None:
+        workers = config()['server']['workers']
+    run_application_server(workers)
 
 
 main.add_command(server)
@@ -248,7 +832,23 @@ main.add_command(server)
 @click.command()
 def setup() -> None:
     """Set up the Compute Home system."""
+    import asyncio
+    from .setup import setup_database
+
     asyncio.run(setup_database())
 
 
 main.add_command(setup)
+
+
+@click.command()
+@click.option('--revision', default='head', help='The schema revision to upgrade to.')
+def migrate(revision: str) -> None:
+    """Upgrade the Compute Home database in place."""
+    import asyncio
+    from .migrate import migrate_database
+
+    asyncio.run(migrate_database(revision))
+
+
+main.add_command(migrate)
@@ -0,0 +1,76 @@
+"""Database migration functionality."""
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from ..models import get_engine
+
+# The revision matching the schema created by ``setup`` before migrations were introduced
+INITIAL_REVISION = '8d6f0a3b1c2e'
+
+
+def alembic_config(connection: Connection) -> Config:
+    """Get the Alembic configuration for running the migrations.
+
+    :param connection: The database connection to run the migrations on
+    :type connection: :class:`~sqlalchemy.engine.Connection`
+    :return: The Alembic configuration
+    :rtype: :class:`~alembic.config.Config`
+    """
+    alembic_cfg = Config()
+    alembic_cfg.set_main_option('script_location', os.path.join(os.path.dirname(__file__), '..', 'migrations'))
+    alembic_cfg.attributes['connection'] = connection
+    return alembic_cfg
+
+
+def _upgrade(connection: Connection, revision: str) -> None:
+    """Upgrade the database schema to the given revision.
+
+    Databases created before migrations were introduced are first stamped with the initial revision.
+
+    :param connection: The database connection to run the migrations on
+    :type connection: :class:`~sqlalchemy.engine.Connection`
+    :param revision: The revision to upgrade to
+    :type revision: str
+    """
+    alembic_cfg = alembic_config(connection)
+    if MigrationContext.configure(connection).get_current_revision() is None and inspect(connection).has_table('users'):
+        command.stamp(alembic_cfg, INITIAL_REVISION)
+    command.upgrade(alembic_cfg, revision)
+
+
+def _stamp(connection: Connection, revision: str) -> None:
+    """Mark the database schema as being at the given revision.
+
+    :param connection: The database connection to stamp
+    :type connection: :class:`~sqlalchemy.engine.Connection`
+    :param revision: The revision to stamp
+    :type revision: str
+    """
+    command.stamp(alembic_config(connection), revision)
+
+
+async def migrate_database(revision: str = 'head') -> None:
+    """Upgrade the database schema in place.
+
+    :param revision: The revision to upgrade to
+    :type revision: str
+    """
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade, revision)
+
+
+async def stamp_database(revision: str = 'head') -> None:
+    """Mark the database schema as being at the given revision, without running any migrations.
+
+    :param revision: The revision to stamp
+    :type revision: str
+    """
+    engine = get_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(_stamp, revision)
@@ -1,10 +1,12 @@
 """Setup functionality."""
+from .migrate import stamp_database
 from ..models import get_engine, Base
 
 
 async def setup_database() -> None:
-    """Create the database tables."""
+    """Create the database tables and mark them as fully migrated."""
     engine = get_engine()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    await stamp_database()
@@ -0,0 +1,134 @@
+"""Verification of LTI launch JWT signatures, optionally in a pool of worker processes.
+
+This module is imported by the pool's worker processes, so apart from :mod:`container_launcher.utils`, which has no
+dependencies of its own, it must not import the rest of the application.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import jwt
+
+from .utils import config
+
+
+logger = logging.getLogger(__name__)
+verifier = None
+
+# Maximum number of parsed platform public keys that are kept per process
+KEY_CACHE_SIZE = 64
+
+
+def find_key(key_set: dict, kid: str | None, alg: str | None) -> dict | None:
+    """Find the key with the given key id and algorithm in a platform's key set.
+
+    Keys without an algorithm are treated as ``RS256`` keys, as is done by :mod:`pylti1p3`.
+
+    :param key_set: The platform's key set
+    :type key_set: dict
+    :param kid: The key id from the JWT header
+    :type kid: str
+    :param alg: The algorithm from the JWT header
+    :type alg: str
+    :return: The matching key or ``None`` if there is none
+    :rtype: dict
+    """
+    if not kid or not alg:
+        return None
+    for key in key_set.get('keys', []):
+        if key.get('kid') == kid and key.get('alg', 'RS256') == alg:
+            return key
+    return None
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def load_key(key_json: str) -> object:
+    """Parse a JSON Web Key into a key object that can be used to verify signatures.
+
+    Parsing the key takes about as long as verifying a signature, so the parsed keys are cached.
+
+    :param key_json: The key, serialised as JSON
+    :type key_json: str
+    :return: The public key
+    :rtype: object
+    """
+    return jwt.PyJWK(json.loads(key_json)).key
+
+
+def verify_id_token(id_token: str, key_json: str, alg: str, options: dict) -> dict:
+    """Verify the signature of a launch JWT and decode its claims.
+
+    :param id_token: The encoded JWT
+    :type id_token: str
+    :param key_json: The platform's public key, serialised as JSON
+    :type key_json: str
+    :param alg: The signature algorithm
+    :type alg: str
+    :param options: The PyJWT verification options
+    :type options: dict
+    :return: The verified claims
+    :rtype: dict
+    :raises jwt.InvalidTokenError: If the JWT is not valid
+    """
+    return jwt.decode(id_token, load_key(key_json), algorithms=[alg], options=options)
+
+
+class JwtVerifier(object):
+    """Pool of worker processes that verify launch JWT signatures, keeping the RSA operations off the event loop.
+
+    The worker processes are started with ``spawn``, as the server process runs an event loop and threads that must
+    not be copied into them.
+    """
+
+    def __init__(self: 'JwtVerifier', workers: int) -> None:
+        """Create a new :class:`~container_launcher.jwt_verifier.JwtVerifier`.
+
+        :param workers: The number of worker processes
+        :type workers: int
+        """
+        self._executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def start(self: 'JwtVerifier') -> None:
+        """Start the worker processes, so that the first launches do not wait for them to start."""
+        self._executor.submit(int)
+
+    async def verify(self: 'JwtVerifier', id_token: str, key: dict, alg: str, options: dict) -> dict:
+        """Verify the signature of a launch JWT in one of the worker processes.
+
+        :param id_token: The encoded JWT
+        :type id_token: str
+        :param key: The platform's public key
+        :type key: dict
+        :param alg: The signature algorithm
+        :type alg: str
+        :param options: The PyJWT verification options
+        :type options: dict
+        :return: The verified claims
+        :rtype: dict
+        :raises jwt.InvalidTokenError: If the JWT is not valid
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, verify_id_token, id_token,
+                                                                json.dumps(key, sort_keys=True), alg, options)
+
+    def shutdown(self: 'JwtVerifier') -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_jwt_verifier() -> JwtVerifier | None:
+    """Get the JWT verifier.
+
+    This returns a singleton instance, which must only be created in the process that uses it.
+
+    :return: The JWT verifier or ``None`` if signatures are verified on the event loop.
+    :rtype: :class:`~container_launcher.jwt_verifier.JwtVerifier`
+    """
+    global verifier
+    if verifier is None and config()['server']['launch_verification']['workers'] > 0:
+        logger.debug('Creating JWT verifier')
+        verifier = JwtVerifier(config()['server']['launch_verification']['workers'])
+    return verifier
@@ -0,0 +1,280 @@
+"""Structured log records and a background thread that formats and writes them.
+
+This module is imported by the command-line interface before any command runs, so it must not import the rest of the
+application.
+"""
+import json
+import logging
+import logging.config
+import os
+import queue
+import random
+import threading
+
+from datetime import datetime, timezone
+
+
+logger = logging.getLogger(__name__)
+writer = None
+
+# Attributes that every log record has, which are not structured fields
+RECORD_ATTRIBUTES = frozenset(logging.LogRecord('', logging.DEBUG, '', 0, '', (), None).__dict__).union(
+    ('message', 'asctime'))
+# Number of seconds to wait for the queued records to be written when logging is reconfigured or the process exits
+DRAIN_TIMEOUT = 2
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as JSON lines.
+
+    Besides the time, level, logger and message, any fields passed to the log call via ``extra`` are included. Use it
+    in the ``logging`` configuration with ``'()': container_launcher.log.JsonFormatter``.
+    """
+
+    def format(self: 'JsonFormatter', record: logging.LogRecord) -> str:
+        """Format a record as a single line of JSON.
+
+        :param record: The record to format
+        :type record: :class:`~logging.LogRecord`
+        :return: The JSON line
+        :rtype: str
+        """
+        data = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass only a fraction of the debug records, so that debug logging can stay enabled under load.
+
+    Records above the debug level always pass. Use it in the ``logging`` configuration with
+    ``'()': container_launcher.log.SamplingFilter`` and ``rate`` set to the fraction of debug records to keep.
+    """
+
+    def __init__(self: 'SamplingFilter', rate: float = 1.0, name: str = '') -> None:
+        """Create a new :class:`~container_launcher.log.SamplingFilter`.
+
+        :param rate: The fraction of debug records to pass, between 0 and 1
+        :type rate: float
+        :param name: The name of the logger below which records are filtered
+        :type name: str
+        """
+        super().__init__(name)
+        self.rate = rate
+
+    def filter(self: 'SamplingFilter', record: logging.LogRecord) -> bool:
+        """Check whether a record passes the filter.
+
+        :param record: The record to check
+        :type record: :class:`~logging.LogRecord`
+        :return: Whether the record passes
+        :rtype: bool
+        """
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return super().filter(record)
+        return random.random() < self.rate and super().filter(record)
+
+
+class LogWriter(object):
+    """Background thread that formats the queued log records and writes them to their handlers.
+
+    The queue is bounded. If the handlers cannot keep up, for example because stdout is a stalled pipe, further
+    records are dropped and counted instead of blocking the thread that logs them.
+    """
+
+    def __init__(self: 'LogWriter', size: int) -> None:
+        """Create a new :class:`~container_launcher.log.LogWriter`.
+
+        :param size: The maximum number of queued records
+        :type size: int
+        """
+        self._size = size
+        self._queue = queue.Queue(size)
+        self._thread = None
+        self.dropped = 0
+
+    def start(self: 'LogWriter') -> None:
+        """Start the background thread."""
+        self._thread = threading.Thread(target=self._run, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def restart(self: 'LogWriter') -> None:
+        """Start a new queue and background thread in a forked process, which does not inherit the thread."""
+        self._queue = queue.Queue(self._size)
+        self.start()
+
+    def put(self: 'LogWriter', record: logging.LogRecord, handler: logging.Handler) -> None:
+        """Queue a record to be written to a handler, without blocking.
+
+        The message is merged with its arguments and the exception is formatted before the record is queued, as the
+        arguments and the traceback may change once the log call has returned.
+
+        :param record: The record to write
+        :type record: :class:`~logging.LogRecord`
+        :param handler: The handler to write the record to
+        :type handler: :class:`~logging.Handler`
+        """
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        try:
+            self._queue.put_nowait((record, handler))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self: 'LogWriter') -> None:
+        """Write the queued records until the writer is stopped."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            record, handler = item
+            handler.handle(record)
+
+    def flush(self: 'LogWriter') -> None:
+        """Wait for the records queued so far to be written, for at most ``DRAIN_TIMEOUT`` seconds."""
+        if self._thread is None or not self._thread.is_alive() or threading.current_thread() is self._thread:
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=DRAIN_TIMEOUT)
+        except queue.Full:
+            return
+        done.wait(DRAIN_TIMEOUT)
+
+    def stop(self: 'LogWriter') -> None:
+        """Write the queued records and stop the background thread, waiting for at most ``DRAIN_TIMEOUT`` seconds."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=DRAIN_TIMEOUT)
+        except queue.Full:
+            return
+        self._thread.join(DRAIN_TIMEOUT)
+
+
+class QueuedHandler(logging.Handler):
+    """Stand-in for a configured handler, which passes the records to the :class:`~container_launcher.log.LogWriter`.
+
+    The handler's level and filters are applied before the record is queued, so that records that would be discarded
+    do not take up space in the queue.
+    """
+
+    def __init__(self: 'QueuedHandler', target: logging.Handler, log_writer: LogWriter) -> None:
+        """Create a new :class:`~container_launcher.log.QueuedHandler`.
+
+        :param target: The handler that writes the records
+        :type target: :class:`~logging.Handler`
+        :param log_writer: The writer that passes the records to the target
+        :type log_writer: :class:`~container_launcher.log.LogWriter`
+        """
+        super().__init__(target.level)
+        self.target = target
+        self.filters = target.filters
+        target.filters = []
+        self._writer = log_writer
+
+    def handle(self: 'QueuedHandler', record: logging.LogRecord) -> bool:
+        """Queue the record if it passes the filters.
+
+        Unlike :meth:`logging.Handler.handle` this does not take the handler's lock, as queueing is thread-safe.
+
+        :param record: The record to handle
+        :type record: :class:`~logging.LogRecord`
+        :return: Whether the record passed the filters
+        :rtype: bool
+        """
+        if self.filter(record):
+            self._writer.put(record, self.target)
+            return True
+        return False
+
+    def emit(self: 'QueuedHandler', record: logging.LogRecord) -> None:
+        """Queue the record."""
+        self._writer.put(record, self.target)
+
+    def flush(self: 'QueuedHandler') -> None:
+        """Wait for the queued records to be written."""
+        self._writer.flush()
+
+
+def configured_loggers() -> list[logging.Logger]:
+    """Get the root logger and all loggers that have been created.
+
+    :return: The loggers
+    :rtype: list[logging.Logger]
+    """
+    return [logging.getLogger()] + [item for item in logging.Logger.manager.loggerDict.values()
+                                    if isinstance(item, logging.Logger)]
+
+
+def configure_logging(settings: dict) -> None:
+    """Configure logging from the ``logging`` and ``log_queue`` settings.
+
+    The ``logging`` settings are passed to :func:`logging.config.dictConfig`. If the log queue is enabled, the
+    configured handlers are then moved behind a :class:`~container_launcher.log.LogWriter`, so that formatting and
+    writing the records happens in a background thread instead of the thread that logs them.
+
+    :param settings: The validated configuration
+    :type settings: dict
+    """
+    global writer
+    if writer is not None:
+        writer.stop()
+        writer = None
+        for item in configured_loggers():
+            for handler in item.handlers:
+                if isinstance(handler, QueuedHandler):
+                    handler.target.filters = handler.filters
+            item.handlers = [handler.target if isinstance(handler, QueuedHandler) else handler
+                             for handler in item.handlers]
+    if 'logging' in settings:
+        logging.config.dictConfig(settings['logging'])
+    if settings['log_queue']['enabled']:
+        writer = LogWriter(settings['log_queue']['size'])
+        queued = {}
+        for item in configured_loggers():
+            for idx, handler in enumerate(item.handlers):
+                if handler not in queued:
+                    queued[handler] = QueuedHandler(handler, writer)
+                item.handlers[idx] = queued[handler]
+        writer.start()
+        logger.debug(f'Writing log records from a queue of {settings["log_queue"]["size"]} records')
+
+
+def get_log_writer() -> LogWriter | None:
+    """Get the log writer.
+
+    :return: The log writer or ``None`` if the log queue is not enabled.
+    :rtype: :class:`~container_launcher.log.LogWriter`
+    """
+    return writer
+
+
+def _restart_after_fork() -> None:
+    """Restart the log writer in a forked worker process."""
+    if writer is not None:
+        writer.restart()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
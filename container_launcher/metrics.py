@@ -0,0 +1,235 @@
+"""Prometheus metrics for the hot paths of the application."""
+import logging
+import os
+
+from time import perf_counter
+from tornado.log import access_log
+from tornado.web import RequestHandler
+from tornado.websocket import WebSocketHandler
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+
+logger = logging.getLogger(__name__)
+metrics = None
+
+# Histogram buckets in seconds, from sub-millisecond cache hits to the slow end of hub requests
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Number of seconds between two updates of the gauges
+GAUGE_UPDATE_INTERVAL = 5
+
+
+class Metrics(object):
+    """All metrics exported by a process.
+
+    If the ``PROMETHEUS_MULTIPROC_DIR`` environment variable is set when the process starts, the metrics of all worker
+    processes are written to that directory and every worker exports the aggregated metrics of all workers.
+    """
+
+    def __init__(self: 'Metrics') -> None:
+        """Create a new :class:`~container_launcher.metrics.Metrics`."""
+        self.multiprocess = 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+        self.requests = prometheus_client.Histogram('compute_home_request_duration_seconds',
+                                                    'Time taken to handle HTTP requests', ['handler', 'method'],
+                                                    buckets=LATENCY_BUCKETS)
+        self.messages = prometheus_client.Histogram('compute_home_websocket_message_duration_seconds',
+                                                    'Time taken to handle WebSocket API requests', ['type'],
+                                                    buckets=LATENCY_BUCKETS)
+        self.queries = prometheus_client.Histogram('compute_home_db_query_duration_seconds',
+                                                   'Time taken to execute database queries',
+                                                   buckets=LATENCY_BUCKETS)
+        self.hub_requests = prometheus_client.Histogram('compute_home_jupyterhub_request_duration_seconds',
+                                                        'Time taken by requests to the JupyterHub API', ['method'],
+                                                        buckets=LATENCY_BUCKETS)
+        self.jobs = prometheus_client.Counter('compute_home_container_jobs', 'Finished container jobs',
+                                              ['action', 'status'])
+        self.admissions = prometheus_client.Counter('compute_home_lti_admissions',
+                                                    'LTI requests that were admitted or shed', ['handler', 'result'])
+        self.log_records_dropped = prometheus_client.Counter('compute_home_log_records_dropped',
+                                                             'Log records dropped because the log queue was full')
+        self._log_writer = None
+        self._log_records_counted = 0
+        self.gauges = {}
+        for name, documentation in (('websocket_connections', 'Open WebSocket connections'),
+                                    ('websocket_users', 'Users with open WebSocket connections'),
+                                    ('websocket_buffered_bytes', 'Bytes waiting to be sent on WebSocket connections'),
+                                    ('container_jobs_queued', 'Container jobs that are queued or running'),
+                                    ('db_pool_size', 'Size of the database connection pool'),
+                                    ('db_pool_checked_out', 'Database connections in use'),
+                                    ('db_pool_overflow', 'Database connections above the pool size'),
+                                    ('lti_requests_in_flight', 'Admitted LTI requests in progress')):
+            self.gauges[name] = prometheus_client.Gauge(f'compute_home_{name}', documentation,
+                                                        multiprocess_mode='livesum')
+
+    def update_gauges(self: 'Metrics') -> None:
+        """Update the gauges and the dropped log records counter from the current state of this process."""
+        from .log import get_log_writer
+        from .models import get_pool_stats
+        from .server.admission import get_admission_controller
+        from .server.connections import get_connection_registry
+        from .server.jobs import get_job_queue
+
+        stats = get_connection_registry().stats()
+        self.gauges['websocket_connections'].set(stats['connections'])
+        self.gauges['websocket_users'].set(stats['users'])
+        self.gauges['websocket_buffered_bytes'].set(stats['buffered_bytes'])
+        self.gauges['container_jobs_queued'].set(get_job_queue().length)
+        self.gauges['lti_requests_in_flight'].set(get_admission_controller().in_flight)
+        pool = get_pool_stats()
+        if pool:
+            self.gauges['db_pool_size'].set(pool['size'])
+            self.gauges['db_pool_checked_out'].set(pool['checked_out'])
+            self.gauges['db_pool_overflow'].set(pool['overflow'])
+        log_writer = get_log_writer()
+        if log_writer is not self._log_writer:
+            self._log_writer = log_writer
+            self._log_records_counted = 0
+        if log_writer is not None and log_writer.dropped > self._log_records_counted:
+            self.log_records_dropped.inc(log_writer.dropped - self._log_records_counted)
+            self._log_records_counted = log_writer.dropped
+
+    def generate(self: 'Metrics') -> bytes:
+        """Generate the metrics in the Prometheus text format.
+
+        :return: The metrics of this process, or of all processes in multiprocess mode
+        :rtype: bytes
+        """
+        if self.multiprocess:
+            registry = prometheus_client.CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return prometheus_client.generate_latest(registry)
+        return prometheus_client.generate_latest()
+
+
+def get_metrics() -> Metrics | None:
+    """Get the metrics.
+
+    This returns a singleton instance.
+
+    :return: The metrics or ``None`` if ``prometheus_client`` is not installed.
+    :rtype: :class:`~container_launcher.metrics.Metrics`
+    """
+    global metrics
+    if metrics is None and prometheus_client is not None:
+        logger.debug('Creating metrics')
+        metrics = Metrics()
+    return metrics
+
+
+def log_request(handler: RequestHandler) -> None:
+    """Record the duration of a finished HTTP request and write the access log entry.
+
+    This is used as the application's ``log_function``. WebSocket connections are not recorded, as their duration is
+    the lifetime of the connection. The access log entry is only formatted if the access log is enabled for its level
+    and carries the request's details as structured fields.
+
+    :param handler: The handler that handled the request
+    :type handler: :class:`~tornado.web.RequestHandler`
+    """
+    if get_metrics() is not None and not isinstance(handler, WebSocketHandler):
+        metrics.requests.labels(type(handler).__name__, handler.request.method).observe(
+            handler.request.request_time())
+    status = handler.get_status()
+    if status < 400:
+        level = logging.INFO
+    elif status < 500:
+        level = logging.WARNING
+    else:
+        level = logging.ERROR
+    if access_log.isEnabledFor(level):
+        duration = 1000.0 * handler.request.request_time()
+        access_log.log(level, f'{status} {handler._request_summary()} {duration:.2f}ms',
+                       extra={'status': status, 'method': handler.request.method, 'uri': handler.request.uri,
+                              'remote_ip': handler.request.remote_ip, 'duration_ms': round(duration, 2)})
+
+
+def observe_message(message_type: str, seconds: float) -> None:
+    """Record the time taken to handle a WebSocket API request.
+
+    :param message_type: The type of the request
+    :type message_type: str
+    :param seconds: The time taken in seconds
+    :type seconds: float
+    """
+    if get_metrics() is not None:
+        metrics.messages.labels(message_type).observe(seconds)
+
+
+def observe_hub_request(method: str, seconds: float) -> None:
+    """Record the time taken by a request to the JupyterHub API.
+
+    :param method: The HTTP method of the request
+    :type method: str
+    :param seconds: The time taken in seconds
+    :type seconds: float
+    """
+    if get_metrics() is not None:
+        metrics.hub_requests.labels(method).observe(seconds)
+
+
+def count_job(action: str, status: str) -> None:
+    """Count a finished container job.
+
+    :param action: Either ``start`` or ``stop``
+    :type action: str
+    :param status: Either ``completed`` or ``failed``
+    :type status: str
+    """
+    if get_metrics() is not None:
+        metrics.jobs.labels(action, status).inc()
+
+
+def count_admission(handler: str, result: str) -> None:
+    """Count an LTI request that was admitted or shed.
+
+    :param handler: The name of the handler
+    :type handler: str
+    :param result: Either ``admitted`` or the limit that shed the request, ``shed_in_flight``, ``shed_issuer`` or
+                   ``shed_user``
+    :type result: str
+    """
+    if get_metrics() is not None:
+        metrics.admissions.labels(handler, result).inc()
+
+
+def instrument_engine(engine: object) -> None:
+    """Record the execution time of all queries run through an engine.
+
+    :param engine: The engine to instrument
+    :type engine: :class:`~sqlalchemy.ext.asyncio.AsyncEngine`
+    """
+    if get_metrics() is None:
+        return
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn: object, *args: list) -> None:
+        conn.info.setdefault('query_start', []).append(perf_counter())
+
+    def after_cursor_execute(conn: object, *args: list) -> None:
+        metrics.queries.observe(perf_counter() - conn.info['query_start'].pop())
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def prepare_multiprocess() -> None:
+    """Remove the metrics left behind by a previous run from the multiprocess directory."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory and os.path.isdir(directory):
+        for filename in os.listdir(directory):
+            if filename.endswith('.db'):
+                os.remove(os.path.join(directory, filename))
+
+
+def mark_process_dead(pid: int) -> None:
+    """Remove the live gauges of a worker process that has exited.
+
+    :param pid: The process id of the worker
+    :type pid: int
+    """
+    if prometheus_client is not None and 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,30 @@
+"""Alembic migration environment.
+
+Migrations are run via the ``migrate`` command, which passes the database connection to use in the ``connection``
+attribute of the Alembic configuration.
+"""
+from alembic import context
+
+from container_launcher.models import Base
+
+
+def run_migrations_offline() -> None:
+    """Generate the migration SQL without connecting to the database."""
+    context.configure(url=context.config.get_main_option('sqlalchemy.url'),
+                      target_metadata=Base.metadata,
+                      literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations using the connection provided by the ``migrate`` command."""
+    context.configure(connection=context.config.attributes['connection'], target_metadata=Base.metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,44 @@
+"""Initial schema.
+
+Revision ID: 8d6f0a3b1c2e
+Revises:
+Create Date: 2022-05-24 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d6f0a3b1c2e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the users, groups, and users_groups tables."""
+    op.create_table('users',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('external_id', sa.Unicode(length=255), nullable=True),
+                    sa.Column('attributes', sa.JSON(), nullable=True),
+                    sa.PrimaryKeyConstraint('id', name=op.f('pk_users')))
+    op.create_table('groups',
+                    sa.Column('id', sa.Integer(), nullable=False),
+                    sa.Column('external_id', sa.Unicode(length=255), nullable=True),
+                    sa.Column('attributes', sa.JSON(), nullable=True),
+                    sa.PrimaryKeyConstraint('id', name=op.f('pk_groups')))
+    op.create_table('users_groups',
+                    sa.Column('user_id', sa.Integer(), nullable=False),
+                    sa.Column('group_id', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(['group_id'], ['groups.id'],
+                                            name=op.f('fk_users_groups_group_id_groups')),
+                    sa.ForeignKeyConstraint(['user_id'], ['users.id'],
+                                            name=op.f('fk_users_groups_user_id_users')),
+                    sa.PrimaryKeyConstraint('user_id', 'group_id', name=op.f('pk_users_groups')))
+
+
+def downgrade() -> None:
+    """Drop all tables."""
+    op.drop_table('users_groups')
+    op.drop_table('groups')
+    op.drop_table('users')
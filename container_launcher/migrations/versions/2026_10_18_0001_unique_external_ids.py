@@ -0,0 +1,53 @@
+"""Unique indexes on the external ids.
+
+Any users or groups that were duplicated by concurrent launches are merged into the row with the lowest id, keeping
+all of their group memberships.
+
+Revision ID: 3f2c9e7d4a51
+Revises: 8d6f0a3b1c2e
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2c9e7d4a51'
+down_revision = '8d6f0a3b1c2e'
+branch_labels = None
+depends_on = None
+
+
+def merge_duplicates(table: str, column: str) -> None:
+    """Merge all rows in ``table`` with the same external id into the row with the lowest id.
+
+    :param table: The table to merge duplicates in
+    :type table: str
+    :param column: The column in users_groups that references the table
+    :type column: str
+    """
+    other_column = 'group_id' if column == 'user_id' else 'user_id'
+    duplicates = f'''SELECT d.id AS old_id,
+                            (SELECT MIN(k.id) FROM {table} k WHERE k.external_id = d.external_id) AS new_id
+                     FROM {table} d
+                     WHERE d.id > (SELECT MIN(k.id) FROM {table} k WHERE k.external_id = d.external_id)'''
+    op.execute(f'''INSERT INTO users_groups ({column}, {other_column})
+                   SELECT DISTINCT m.new_id, ug.{other_column}
+                   FROM users_groups ug JOIN ({duplicates}) m ON ug.{column} = m.old_id
+                   WHERE NOT EXISTS (SELECT 1 FROM users_groups x
+                                     WHERE x.{column} = m.new_id AND x.{other_column} = ug.{other_column})''')
+    op.execute(f'DELETE FROM users_groups WHERE {column} IN (SELECT old_id FROM ({duplicates}) m)')
+    op.execute(f'DELETE FROM {table} WHERE id IN (SELECT old_id FROM ({duplicates}) m)')
+
+
+def upgrade() -> None:
+    """Merge duplicate users and groups and add the unique indexes."""
+    merge_duplicates('users', 'user_id')
+    merge_duplicates('groups', 'group_id')
+    op.create_index(op.f('ix_users_external_id'), 'users', ['external_id'], unique=True)
+    op.create_index(op.f('ix_groups_external_id'), 'groups', ['external_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Remove the unique indexes."""
+    op.drop_index(op.f('ix_groups_external_id'), table_name='groups')
+    op.drop_index(op.f('ix_users_external_id'), table_name='users')
@@ -0,0 +1,31 @@
+"""Server-side session storage.
+
+Revision ID: 9b41d7e2c6f0
+Revises: 3f2c9e7d4a51
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b41d7e2c6f0'
+down_revision = '3f2c9e7d4a51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the sessions table."""
+    op.create_table('sessions',
+                    sa.Column('id', sa.String(length=64), nullable=False),
+                    sa.Column('data', sa.JSON(), nullable=True),
+                    sa.Column('expires', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('id', name=op.f('pk_sessions')))
+    op.create_index(op.f('ix_sessions_expires'), 'sessions', ['expires'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the sessions table."""
+    op.drop_index(op.f('ix_sessions_expires'), table_name='sessions')
+    op.drop_table('sessions')
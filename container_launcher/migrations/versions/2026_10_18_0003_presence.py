@@ -0,0 +1,31 @@
+"""Users connected to each server process.
+
+Revision ID: 5c8e1a7f3d92
+Revises: 9b41d7e2c6f0
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c8e1a7f3d92'
+down_revision = '9b41d7e2c6f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create the presence table."""
+    op.create_table('presence',
+                    sa.Column('user_name', sa.String(length=255), nullable=False),
+                    sa.Column('process', sa.String(length=32), nullable=False),
+                    sa.Column('last_seen', sa.DateTime(), nullable=True),
+                    sa.PrimaryKeyConstraint('user_name', 'process', name=op.f('pk_presence')))
+    op.create_index(op.f('ix_presence_last_seen'), 'presence', ['last_seen'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the presence table."""
+    op.drop_index(op.f('ix_presence_last_seen'), table_name='presence')
+    op.drop_table('presence')
@@ -0,0 +1,29 @@
+"""Store the session expiry time with its time zone.
+
+Revision ID: 2f6d9c4b8a15
+Revises: 5c8e1a7f3d92
+Create Date: 2026-10-18 00:00:00
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6d9c4b8a15'
+down_revision = '5c8e1a7f3d92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Change the expiry time of the sessions, which was stored in UTC, to a time with time zone."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('sessions', 'expires', type_=sa.DateTime(timezone=True),
+                        postgresql_using="expires AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    """Change the expiry time of the sessions back to a time in UTC without time zone."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('sessions', 'expires', type_=sa.DateTime(),
+                        postgresql_using="expires AT TIME ZONE 'UTC'")
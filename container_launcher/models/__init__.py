@@ -1,34 +1,74 @@
 """Functionality for database access."""
 import logging
+import os
+
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from typing import Callable
 
 from .meta import MetaData, Base  # noqa
+from .pool import InstrumentedQueuePool
 from .user import User # noqa
 from .group import Group  # noqa
+from .session import SessionData  # noqa
+from .presence import Presence  # noqa
+from .upsert import dialect_insert, upsert_launch_user  # noqa
+from ..metrics import instrument_engine
 from ..utils import config
 
 logger = logging.getLogger(__name__)
 engine = None
+engine_pid = None
 session_factory = None
 
 
 def get_engine() -> AsyncEngine:
     """Get the database engine.
 
-    This returns a singleton instance.
+    This returns a singleton instance per process. An engine inherited from a parent process is never used, as its
+    connections are shared with the parent.
 
     :return: The database engine as configured by the settings.
     :rtype: :class:`~sqlalchemy.ext.asyncio.AsyncEngine`
     """
-    global engine
-    if engine is None:
+    global engine, engine_pid, session_factory
+    if engine is None or engine_pid != os.getpid():
         logger.debug('Creating engine')
-        engine = create_async_engine(config()['database']['dsn'])
+        engine_pid = os.getpid()
+        session_factory = None
+        dsn = config()['database']['dsn']
+        url = make_url(dsn)
+        if url.get_backend_name() == 'sqlite':
+            engine = create_async_engine(dsn)
+        else:
+            pool = config()['database']['pool']
+            connect_args = {}
+            if url.get_driver_name() == 'asyncpg':
+                connect_args['prepared_statement_cache_size'] = pool['statement_cache_size']
+            engine = create_async_engine(dsn,
+                                         poolclass=InstrumentedQueuePool,
+                                         pool_size=pool['size'],
+                                         max_overflow=pool['max_overflow'],
+                                         pool_timeout=pool['timeout'],
+                                         pool_pre_ping=pool['pre_ping'],
+                                         pool_recycle=pool['recycle'],
+                                         connect_args=connect_args)
+        instrument_engine(engine)
     return engine
 
 
+def get_pool_stats() -> dict:
+    """Get the database connection pool statistics.
+
+    :return: The pool size, current occupancy, and checkout wait statistics. Empty if the pool is not instrumented.
+    :rtype: dict
+    """
+    if engine is not None and isinstance(engine.pool, InstrumentedQueuePool):
+        return engine.pool.stats()
+    return {}
+
+
 def get_sessionmaker() -> Callable[[], AsyncSession]:
     """Get the sessionmaker.
 
@@ -38,7 +78,7 @@ def get_sessionmaker() -> Callable[[], AsyncSession]:
     :rtype: Callable
     """
     global session_factory
-    if session_factory is None:
+    if session_factory is None or engine_pid != os.getpid():
         logger.debug('Creating sessionmaker')
         session_factory = sessionmaker(bind=get_engine(), expire_on_commit=False, class_=AsyncSession)
     return session_factory
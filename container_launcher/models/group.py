@@ -18,7 +18,7 @@ class Group(Base):
     __tablename__ = 'groups'
 
     id = Column(Integer, primary_key=True)
-    external_id = Column(Unicode(255))
+    external_id = Column(Unicode(255), index=True, unique=True)
     attributes = Column(NestedMutableJson)
 
     users = relationship('User', secondary=users_groups, back_populates='groups')
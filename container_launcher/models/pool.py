@@ -0,0 +1,55 @@
+"""Connection pool with checkout statistics."""
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from time import perf_counter
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Asynchronous queue pool that records how long checkouts wait for a connection.
+
+    * checkouts - The total number of checkouts
+    * wait_total - The total number of seconds spent waiting for a connection
+    * wait_max - The longest wait for a connection in seconds
+    """
+
+    def __init__(self: 'InstrumentedQueuePool', *args: list, **kwargs: dict) -> None:
+        """Create a new :class:`~container_launcher.models.pool.InstrumentedQueuePool`."""
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self: 'InstrumentedQueuePool') -> object:
+        """Get a connection from the pool, recording the time spent waiting for it."""
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            wait = perf_counter() - start
+            self.checkouts = self.checkouts + 1
+            self.wait_total = self.wait_total + wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+
+    def recreate(self: 'InstrumentedQueuePool') -> 'InstrumentedQueuePool':
+        """Create a new pool with the same configuration, keeping the statistics."""
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.wait_total = self.wait_total
+        pool.wait_max = self.wait_max
+        return pool
+
+    def stats(self: 'InstrumentedQueuePool') -> dict:
+        """Get the current pool statistics.
+
+        :return: The pool size, current occupancy, and checkout wait statistics
+        :rtype: dict
+        """
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            'checkouts': self.checkouts,
+            'wait_total': self.wait_total,
+            'wait_max': self.wait_max,
+        }
@@ -0,0 +1,19 @@
+"""The Presence database model."""
+from sqlalchemy import Column, DateTime, String
+
+from .meta import Base
+
+
+class Presence(Base):
+    """Model representing the users connected to a single server process.
+
+    * user_name - The name of the user in the hub
+    * process - The random id of the server process the user is connected to
+    * last_seen - The time at which the process last saw the user connected
+    """
+
+    __tablename__ = 'presence'
+
+    user_name = Column(String(255), primary_key=True)
+    process = Column(String(32), primary_key=True)
+    last_seen = Column(DateTime, index=True)
@@ -0,0 +1,19 @@
+"""The SessionData database model."""
+from sqlalchemy import Column, DateTime, JSON, String
+
+from .meta import Base
+
+
+class SessionData(Base):
+    """Model representing the data of a single server-side session.
+
+    * id - The opaque session id stored in the session cookie
+    * data - JSON dictionary containing the session values
+    * expires - The time at which the session expires
+    """
+
+    __tablename__ = 'sessions'
+
+    id = Column(String(64), primary_key=True)
+    data = Column(JSON)
+    expires = Column(DateTime(timezone=True), index=True)
@@ -0,0 +1,100 @@
+"""Concurrency-safe creation and update of users and groups."""
+from sqlalchemy import JSON, cast, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import Callable
+
+from .group import Group
+from .user import User
+from .users_groups import users_groups
+
+
+def dialect_insert(dbsession: AsyncSession) -> Callable:
+    """Get the dialect-specific ``insert`` construct that supports ``ON CONFLICT``.
+
+    Only PostgreSQL and SQLite are supported, which is enforced when the ``database.dsn`` setting is validated.
+
+    :param dbsession: The database session to get the dialect for.
+    :type dbsession: :class:`~sqlalchemy.ext.asyncio.AsyncSession`
+    :return: The ``insert`` function for the session's dialect.
+    :rtype: Callable
+    :raises ValueError: If the session uses any other database
+    """
+    if dbsession.bind.dialect.name == 'postgresql':
+        return postgresql.insert
+    elif dbsession.bind.dialect.name == 'sqlite':
+        return sqlite.insert
+    raise ValueError(f'The {dbsession.bind.dialect.name} database is not supported')
+
+
+async def upsert_launch_user(dbsession: AsyncSession, user_external_id: str, user_attributes: dict,
+                             group_external_id: str, group_attributes: dict) -> int:
+    """Create or update the user and group for an LTI launch and ensure the user belongs to the group.
+
+    The existing user attributes are merged with ``user_attributes``, the group attributes are replaced by
+    ``group_attributes``. All changes are performed with ``INSERT ... ON CONFLICT``, so that concurrent launches for the
+    same user or group cannot create duplicate rows. The group row is only rewritten if its attributes have changed.
+    On PostgreSQL this is usually a single statement. The changes are not committed.
+
+    :param dbsession: The database session to use.
+    :type dbsession: :class:`~sqlalchemy.ext.asyncio.AsyncSession`
+    :param user_external_id: The external id of the user.
+    :type user_external_id: str
+    :param user_attributes: The attributes to set for the user.
+    :type user_attributes: dict
+    :param group_external_id: The external id of the group.
+    :type group_external_id: str
+    :param group_attributes: The attributes to set for the group.
+    :type group_attributes: dict
+    :return: The database id of the user.
+    :rtype: int
+    """
+    insert = dialect_insert(dbsession)
+    users = User.__table__
+    groups = Group.__table__
+    user_stmt = insert(users).values(external_id=user_external_id, attributes=user_attributes)
+    group_stmt = insert(groups).values(external_id=group_external_id, attributes=group_attributes)
+    if dbsession.bind.dialect.name == 'postgresql':
+        group_changed = cast(groups.c.attributes, postgresql.JSONB).is_distinct_from(
+            cast(group_stmt.excluded.attributes, postgresql.JSONB))
+    else:
+        group_changed = groups.c.attributes.is_distinct_from(group_stmt.excluded.attributes)
+    group_stmt = group_stmt.on_conflict_do_update(index_elements=[groups.c.external_id],
+                                                  set_={'attributes': group_stmt.excluded.attributes},
+                                                  where=group_changed)
+    if dbsession.bind.dialect.name == 'postgresql':
+        merged_attributes = cast(cast(users.c.attributes, postgresql.JSONB).op('||')(
+            cast(user_stmt.excluded.attributes, postgresql.JSONB)), JSON)
+        user_cte = user_stmt.on_conflict_do_update(index_elements=[users.c.external_id],
+                                                   set_={'attributes': merged_attributes})
+        user_cte = user_cte.returning(users.c.id).cte('launch_user')
+        group_cte = group_stmt.returning(groups.c.id).cte('launch_group')
+        existing_group_id = select(groups.c.id).filter(groups.c.external_id == group_external_id).scalar_subquery()
+        group_id = func.coalesce(select(group_cte.c.id).scalar_subquery(), existing_group_id)
+        link_cte = insert(users_groups).from_select(
+            ['user_id', 'group_id'],
+            select(user_cte.c.id, group_id).filter(group_id.isnot(None))).on_conflict_do_nothing().cte(
+                'launch_user_group')
+        user_id, group_id = (await dbsession.execute(
+            select(user_cte.c.id, group_id.label('group_id')).add_cte(link_cte))).one()
+        if group_id is None:
+            # The group was created by a concurrent launch after this statement's snapshot was taken and, as its
+            # attributes were unchanged, not updated by this statement, so it is only visible to a new statement
+            group_id = (await dbsession.execute(
+                select(groups.c.id).filter(groups.c.external_id == group_external_id))).scalar_one()
+            await dbsession.execute(insert(users_groups).values(user_id=user_id, group_id=group_id)
+                                    .on_conflict_do_nothing())
+        return user_id
+    else:
+        merged_attributes = func.json_patch(users.c.attributes, user_stmt.excluded.attributes)
+        await dbsession.execute(user_stmt.on_conflict_do_update(index_elements=[users.c.external_id],
+                                                                set_={'attributes': merged_attributes}))
+        await dbsession.execute(group_stmt)
+        user_id = (await dbsession.execute(
+            select(users.c.id).filter(users.c.external_id == user_external_id))).scalar_one()
+        group_id = (await dbsession.execute(
+            select(groups.c.id).filter(groups.c.external_id == group_external_id))).scalar_one()
+        await dbsession.execute(insert(users_groups).values(user_id=user_id, group_id=group_id)
+                                .on_conflict_do_nothing())
+        return user_id
@@ -22,7 +22,7 @@ class User(Base):
     __tablename__ = 'users'
 
     id = Column(Integer, primary_key=True)
-    external_id = Column(Unicode(255))
+    external_id = Column(Unicode(255), index=True, unique=True)
     attributes = Column(NestedMutableJson)
 
     groups = relationship('Group', secondary=users_groups, back_populates='users')
@@ -1,33 +1,154 @@
 """The ComputeHome Server application."""
 import logging
+import os
+import signal
 
+from functools import partial
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop, PeriodicCallback
+from tornado.netutil import bind_sockets
+from tornado.routing import Rule
 from tornado.web import Application, RedirectHandler
-from tornado.ioloop import IOLoop
 
 from .handlers import (FrontendHandler, LtiLoginStartHandler, LtiLaunchHandler, ApiHandler, LogoutHandler)
+from .handlers.frontend import build_asset_index
+from .connections import get_connection_registry
+from .culler import get_idle_culler
+from .prewarm import get_prewarm_scheduler
+from .snapshot import get_snapshot, reload_snapshot, reload_snapshot_async, ConfigFileWatcher
+from .workers import WorkerSupervisor, HEARTBEAT_INTERVAL
 
+from ..jwt_verifier import get_jwt_verifier
+from ..metrics import get_metrics, log_request, prepare_multiprocess, GAUGE_UPDATE_INTERVAL
 from ..utils import config
 
 
 logger = logging.getLogger(__name__)
 
 
-def run_application_server() -> None:
-    """Run the ComputeHome server."""
+def run_application_server(workers: int = 1) -> None:
+    """Run the ComputeHome server.
+
+    With more than one worker, the listening socket is bound once and shared by pre-forked worker processes. All
+    read-only state is built before forking, while anything that is process-local, such as the database engine, is
+    only created inside the workers.
+
+    :param workers: The number of worker processes to run
+    :type workers: int
+    """
     logger.debug('Application server starting up...')
+    get_snapshot()
+    if workers > 1 and config()['server']['session']['backend'] == 'memory':
+        logger.warning('The memory session backend is not shared between worker processes')
     routes = [
         ('/', RedirectHandler, {'permanent': False, 'url': '/app'}),
-        ('/app(.*)', FrontendHandler),
+        ('/app(.*)', FrontendHandler, {'assets': build_asset_index()}),
         ('/api', ApiHandler),
         ('/lti', LtiLaunchHandler),
         ('/lti/login', LtiLoginStartHandler),
         ('/logout', LogoutHandler),
     ]
+    if config()['server']['metrics']['enabled']:
+        if get_metrics() is not None:
+            from .handlers.metrics import MetricsHandler
+
+            routes.append(('/metrics', MetricsHandler))
+            if not config()['server']['metrics']['token']:
+                logger.warning('/metrics is enabled without a token, restrict access to it in front of the server')
+            if workers > 1:
+                if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+                    prepare_multiprocess()
+                else:
+                    logger.warning('PROMETHEUS_MULTIPROC_DIR is not set, /metrics only reports the worker serving it')
+        else:
+            logger.warning('prometheus_client is not installed, /metrics is not available')
+    if config()['server']['proxy']['enabled']:
+        from .handlers.proxy import ContainerProxyHandler, ContainerWebSocketProxyHandler, WebSocketUpgradeMatches
+
+        routes.extend([
+            Rule(WebSocketUpgradeMatches('/containers/([^/]+)/(.*)'), ContainerWebSocketProxyHandler),
+            ('/containers/([^/]+)/(.*)', ContainerProxyHandler),
+            ('/containers/([^/]+)', RedirectHandler, {'permanent': False, 'url': '/containers/{0}/'}),
+        ])
     app = Application(
         routes,
         debug=config()['debug'],
+        autoreload=config()['debug'] and workers == 1,
         xsrf_cookies=True,
-        cookie_secret=config()['server']['cookie_secret'])
+        cookie_secret=config()['server']['cookie_secret'],
+        log_function=log_request,
+        websocket_ping_interval=config()['server']['websocket']['ping_interval'],
+        websocket_ping_timeout=config()['server']['websocket']['ping_timeout'],
+        websocket_max_message_size=config()['server']['websocket']['max_message_size'])
+    sockets = bind_sockets(config()['server']['port'], config()['server']['host'])
     logger.debug(f'Application listening on {config()["server"]["host"]} port {config()["server"]["port"]}')
-    app.listen(config()['server']['port'], config()['server']['host'])
-    IOLoop.current().start()
+    if workers > 1:
+        supervisor = WorkerSupervisor(workers, partial(run_worker, app, sockets),
+                                      config()['server']['shutdown_timeout'],
+                                      reload=partial(reload_snapshot, keep_restart_sections=False))
+        supervisor.run()
+    else:
+        run_worker(app, sockets)
+
+
+def run_worker(app: Application, sockets: list, worker_id: int = 0, heartbeat_fd: int | None = None) -> None:
+    """Serve the application on the given sockets until the process receives ``SIGTERM``.
+
+    On ``SIGTERM`` the worker stops accepting new connections, closes its API connections so that the clients reconnect
+    to another worker, and stops after the configured shutdown timeout, giving requests that are in progress time to
+    complete. On ``SIGHUP`` the worker reloads the configuration without dropping any connections. Background tasks
+    that must only run once, such as prewarming containers, run in the first worker. Under a supervisor, the idle
+    culler shares the presence of the users with the other workers.
+
+    :param app: The application to serve
+    :type app: :class:`~tornado.web.Application`
+    :param sockets: The listening sockets
+    :type sockets: list[socket.socket]
+    :param worker_id: The id of the worker process
+    :type worker_id: int
+    :param heartbeat_fd: The file descriptor to write heartbeats to, if run under a supervisor
+    :type heartbeat_fd: int
+    """
+    server = HTTPServer(app)
+    server.add_sockets(sockets)
+    loop = IOLoop.current()
+    stopping = False
+
+    def shutdown() -> None:
+        nonlocal stopping
+        if not stopping:
+            stopping = True
+            logger.info(f'Worker {worker_id} shutting down')
+            server.stop()
+            get_connection_registry().close_all()
+            loop.call_later(config()['server']['shutdown_timeout'], loop.stop)
+
+    def heartbeat() -> None:
+        try:
+            os.write(heartbeat_fd, b'.')
+        except BlockingIOError:
+            pass
+        except BrokenPipeError:
+            logger.error(f'Worker {worker_id} lost its supervisor')
+            heartbeat_callback.stop()
+            shutdown()
+
+    if worker_id == 0:
+        loop.add_callback(get_prewarm_scheduler().start)
+    if heartbeat_fd is not None:
+        get_idle_culler().share_presence()
+    if get_jwt_verifier() is not None:
+        get_jwt_verifier().start()
+    if get_metrics() is not None:
+        PeriodicCallback(get_metrics().update_gauges, GAUGE_UPDATE_INTERVAL * 1000).start()
+    if config()['server']['reload']['watch']:
+        PeriodicCallback(ConfigFileWatcher().check, config()['server']['reload']['interval'] * 1000).start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: loop.add_callback_from_signal(shutdown))
+    signal.signal(signal.SIGHUP, lambda signum, frame: loop.add_callback_from_signal(reload_snapshot_async))
+    if heartbeat_fd is not None:
+        signal.signal(signal.SIGINT, lambda signum, frame: loop.add_callback_from_signal(shutdown))
+        heartbeat_callback = PeriodicCallback(heartbeat, HEARTBEAT_INTERVAL * 1000)
+        heartbeat_callback.start()
+    loop.start()
+    if get_jwt_verifier() is not None:
+        get_jwt_verifier().shutdown()
@@ -0,0 +1,217 @@
+"""Admission control for the LTI login and launch requests."""
+import logging
+
+from collections import OrderedDict
+from math import ceil
+from time import monotonic
+from tornado.escape import xhtml_escape
+from tornado.web import RequestHandler
+
+from ..metrics import count_admission
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+controller = None
+
+# Page sent instead of a shed request, which repeats the request once the Retry-After time has passed
+WAITING_PAGE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Please wait</title></head>
+<body>
+<form method="post" action="{action}">{inputs}
+<p>Many people are logging in right now. You will be logged in automatically in a few seconds.</p>
+<noscript><button type="submit">Try again</button></noscript>
+</form>
+<script>setTimeout(function() {{ document.forms[0].submit(); }}, {delay});</script>
+</body>
+</html>
+'''
+
+
+class TokenBuckets(object):
+    """Token buckets with the same rate and burst size, one for each key.
+
+    Buckets are refilled lazily when a token is taken. At most ``size`` buckets are kept, evicting the least recently
+    used bucket. An evicted bucket starts full again, which only ever admits more requests, never fewer.
+    """
+
+    def __init__(self: 'TokenBuckets', rate: float, burst: int, size: int) -> None:
+        """Create a new :class:`~container_launcher.server.admission.TokenBuckets`.
+
+        :param rate: The number of tokens added to each bucket per second, ``0`` to not limit the rate
+        :type rate: float
+        :param burst: The maximum number of tokens in each bucket
+        :type burst: int
+        :param size: The maximum number of buckets to keep
+        :type size: int
+        """
+        self._rate = rate
+        self._burst = burst
+        self._size = size
+        self._buckets = OrderedDict()
+
+    def take(self: 'TokenBuckets', key: object, now: float) -> float:
+        """Take a token from the bucket of a key.
+
+        :param key: The key of the bucket. If it is ``None``, no token is needed.
+        :type key: object
+        :param now: The current time from :func:`~time.monotonic`
+        :type now: float
+        :return: ``0`` if a token was taken, otherwise the number of seconds until a token is available
+        :rtype: float
+        """
+        if self._rate <= 0 or key is None:
+            return 0
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = self._burst
+            if len(self._buckets) >= self._size:
+                self._buckets.popitem(last=False)
+        else:
+            tokens = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+            self._buckets.move_to_end(key)
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            return 0
+        self._buckets[key] = (tokens, now)
+        return (1 - tokens) / self._rate
+
+
+class AdmissionController(object):
+    """Limits the LTI requests that a worker process handles at the same time and the rate per issuer and user.
+
+    A request is admitted if fewer than ``max_in_flight`` requests are in progress and a token is available in both
+    the bucket of its user and the bucket of its issuer. Requests that are not admitted are shed straight away, before
+    they load a session or touch the database.
+    """
+
+    def __init__(self: 'AdmissionController', max_in_flight: int, issuer_rate: float, issuer_burst: int,
+                 user_rate: float, user_burst: int, max_buckets: int, retry_after: int) -> None:
+        """Create a new :class:`~container_launcher.server.admission.AdmissionController`.
+
+        :param max_in_flight: The maximum number of requests in progress, ``0`` for no limit
+        :type max_in_flight: int
+        :param issuer_rate: The number of requests per second and issuer, ``0`` for no limit
+        :type issuer_rate: float
+        :param issuer_burst: The number of requests an issuer can make at once
+        :type issuer_burst: int
+        :param user_rate: The number of requests per second and user, ``0`` for no limit
+        :type user_rate: float
+        :param user_burst: The number of requests a user can make at once
+        :type user_burst: int
+        :param max_buckets: The maximum number of issuers and of users to track
+        :type max_buckets: int
+        :param retry_after: The number of seconds after which to retry a request shed by the ``max_in_flight`` limit
+        :type retry_after: int
+        """
+        self._max_in_flight = max_in_flight
+        self._issuers = TokenBuckets(issuer_rate, issuer_burst, max_buckets)
+        self._users = TokenBuckets(user_rate, user_burst, max_buckets)
+        self._retry_after = retry_after
+        self.in_flight = 0
+
+    def admit(self: 'AdmissionController', handler: str, issuer: str | None, user: str | None) -> int:
+        """Admit a request, if the limits allow it.
+
+        An admitted request must be released with
+        :meth:`~container_launcher.server.admission.AdmissionController.release` once it has finished.
+
+        :param handler: The name of the handler, used to label the metrics
+        :type handler: str
+        :param issuer: The issuer the request claims to come from, if known
+        :type issuer: str
+        :param user: The user the request claims to be for, if known
+        :type user: str
+        :return: ``0`` if the request was admitted, otherwise the number of seconds after which to retry it
+        :rtype: int
+        """
+        if self._max_in_flight and self.in_flight >= self._max_in_flight:
+            count_admission(handler, 'shed_in_flight')
+            return self._retry_after
+        now = monotonic()
+        wait = self._users.take((issuer, user) if user is not None else None, now)
+        if wait:
+            count_admission(handler, 'shed_user')
+            return ceil(wait)
+        wait = self._issuers.take(issuer, now)
+        if wait:
+            count_admission(handler, 'shed_issuer')
+            return ceil(wait)
+        self.in_flight += 1
+        count_admission(handler, 'admitted')
+        return 0
+
+    def release(self: 'AdmissionController') -> None:
+        """Release an admitted request that has finished."""
+        self.in_flight -= 1
+
+
+def get_admission_controller() -> AdmissionController:
+    """Get the admission controller.
+
+    This returns a singleton instance.
+
+    :return: The admission controller as configured by the settings.
+    :rtype: :class:`~container_launcher.server.admission.AdmissionController`
+    """
+    global controller
+    if controller is None:
+        logger.debug('Creating admission controller')
+        settings = config()['server']['admission']
+        controller = AdmissionController(settings['max_in_flight'], settings['issuer_rate'], settings['issuer_burst'],
+                                         settings['user_rate'], settings['user_burst'], settings['max_buckets'],
+                                         settings['retry_after'])
+    return controller
+
+
+class AdmissionMixin(object):
+    """The AdmissionMixin sheds the requests that the admission controller does not admit.
+
+    Must be listed before the :class:`~container_launcher.server.session.SessionMixin`, so that shed requests do not
+    load the session. Shed requests get a ``503`` response with a ``Retry-After`` header and, if enabled, a page that
+    repeats the request after that time. Handlers that override ``prepare`` must return if the request has been
+    finished.
+    """
+
+    _admitted = False
+
+    def admission_keys(self: RequestHandler) -> tuple[str | None, str | None]:
+        """Get the issuer and user that the request claims to be from, before it has been validated.
+
+        :return: The issuer and user, either of which may be ``None``
+        :rtype: tuple[str, str]
+        """
+        return None, None
+
+    async def prepare(self: RequestHandler) -> None:
+        """Shed the request if it is not admitted."""
+        retry_after = get_admission_controller().admit(type(self).__name__, *self.admission_keys())
+        if retry_after:
+            self.shed(retry_after)
+            return
+        self._admitted = True
+        await super().prepare()
+
+    def shed(self: RequestHandler, retry_after: int) -> None:
+        """Finish the request with a ``503`` response that asks the client to retry it later.
+
+        :param retry_after: The number of seconds after which to retry the request
+        :type retry_after: int
+        """
+        self.set_status(503)
+        self.set_header('Retry-After', str(retry_after))
+        if config()['server']['admission']['waiting_page'] and self.request.method == 'POST':
+            inputs = ''.join([f'\n<input type="hidden" name="{xhtml_escape(name)}" value="{xhtml_escape(value)}">'
+                              for name, values in self.request.body_arguments.items() for value in values])
+            self.finish(WAITING_PAGE.format(action=xhtml_escape(self.request.uri), inputs=inputs,
+                                            delay=retry_after * 1000))
+        else:
+            self.finish()
+
+    def on_finish(self: RequestHandler) -> None:
+        """Release the admitted request."""
+        if self._admitted:
+            self._admitted = False
+            get_admission_controller().release()
+        super().on_finish()
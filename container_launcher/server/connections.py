@@ -0,0 +1,110 @@
+"""Registry of the open API connections in this process."""
+import logging
+
+from tornado.websocket import WebSocketHandler
+
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+registry = None
+
+# Close code sent to connections that are closed because of a limit
+POLICY_VIOLATION = 1008
+# Close code sent to connections that are closed because the server shuts down
+GOING_AWAY = 1001
+
+
+class ConnectionRegistry(object):
+    """Registry of the open API connections, keyed by user.
+
+    Each user may have at most ``max_per_user`` connections. When a user opens another connection, their oldest
+    connection is closed. Connections that have more than ``max_buffer`` bytes waiting to be sent to a slow client do
+    not receive status pushes until the buffer has drained.
+    """
+
+    def __init__(self: 'ConnectionRegistry', max_per_user: int, max_buffer: int) -> None:
+        """Create a new :class:`~container_launcher.server.connections.ConnectionRegistry`.
+
+        :param max_per_user: The maximum number of connections per user
+        :type max_per_user: int
+        :param max_buffer: The maximum number of bytes waiting to be sent on a connection
+        :type max_buffer: int
+        """
+        self._max_per_user = max_per_user
+        self.max_buffer = max_buffer
+        self._connections = set()
+        self._users = {}
+
+    def add(self: 'ConnectionRegistry', connection: WebSocketHandler) -> None:
+        """Add a new connection, which does not yet belong to a user.
+
+        :param connection: The connection to add
+        :type connection: :class:`~tornado.websocket.WebSocketHandler`
+        """
+        self._connections.add(connection)
+
+    def assign(self: 'ConnectionRegistry', connection: WebSocketHandler, user_name: str) -> None:
+        """Assign a connection to a user, closing the user's oldest connections if they have too many.
+
+        :param connection: The connection to assign
+        :type connection: :class:`~tornado.websocket.WebSocketHandler`
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        """
+        connections = self._users.setdefault(user_name, [])
+        connections.append(connection)
+        while len(connections) > self._max_per_user:
+            oldest = connections.pop(0)
+            logger.debug(f'Closing the oldest connection of {user_name}')
+            oldest.close(POLICY_VIOLATION, 'Too many connections')
+
+    def remove(self: 'ConnectionRegistry', connection: WebSocketHandler, user_name: str | None = None) -> None:
+        """Remove a closed connection.
+
+        :param connection: The connection to remove
+        :type connection: :class:`~tornado.websocket.WebSocketHandler`
+        :param user_name: The name of the user in the hub, if the connection was assigned to a user
+        :type user_name: str
+        """
+        self._connections.discard(connection)
+        if user_name is not None and user_name in self._users:
+            connections = self._users[user_name]
+            if connection in connections:
+                connections.remove(connection)
+            if not connections:
+                del self._users[user_name]
+
+    def close_all(self: 'ConnectionRegistry') -> None:
+        """Close all connections, telling the clients that the server is going away."""
+        for connection in list(self._connections):
+            connection.close(GOING_AWAY, 'Server shutting down')
+
+    def stats(self: 'ConnectionRegistry') -> dict:
+        """Get the connection statistics.
+
+        :return: The number of open connections, the number of users with open connections, and the number of bytes
+                 waiting to be sent on all connections
+        :rtype: dict
+        """
+        return {
+            'connections': len(self._connections),
+            'users': len(self._users),
+            'buffered_bytes': sum(connection.buffered for connection in self._connections),
+        }
+
+
+def get_connection_registry() -> ConnectionRegistry:
+    """Get the connection registry.
+
+    This returns a singleton instance.
+
+    :return: The connection registry as configured by the settings.
+    :rtype: :class:`~container_launcher.server.connections.ConnectionRegistry`
+    """
+    global registry
+    if registry is None:
+        logger.debug('Creating connection registry')
+        settings = config()['server']['websocket']
+        registry = ConnectionRegistry(settings['max_per_user'], settings['max_buffer'])
+    return registry
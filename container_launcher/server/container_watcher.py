@@ -0,0 +1,182 @@
+"""Shared per-user watchers that push container state changes to all of the user's connections."""
+import asyncio
+import logging
+
+from typing import Callable
+
+from .jupyterhub import get_jupyterhub_client
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+registry = None
+
+# States in which a container is expected to change state soon
+PENDING_STATES = ('starting', 'stopping')
+
+
+class ContainerWatcher(object):
+    """Watcher that polls the state of one user's containers while at least one connection is subscribed.
+
+    All connections of a user share one watcher, so the load on JupyterHub does not depend on the number of open
+    connections. The watcher polls more frequently while any container is starting or stopping.
+    """
+
+    def __init__(self: 'ContainerWatcher', user_name: str, poll_interval: int, pending_poll_interval: int) -> None:
+        """Create a new :class:`~container_launcher.server.container_watcher.ContainerWatcher`.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param poll_interval: The number of seconds between two polls
+        :type poll_interval: int
+        :param pending_poll_interval: The number of seconds between two polls while a container is starting or stopping
+        :type pending_poll_interval: int
+        """
+        self._user_name = user_name
+        self._poll_interval = poll_interval
+        self._pending_poll_interval = pending_poll_interval
+        self._subscribers = {}
+        self._states = None
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    @property
+    def subscribed(self: 'ContainerWatcher') -> bool:
+        """Return whether any connection is subscribed to this watcher."""
+        return len(self._subscribers) > 0
+
+    def subscribe(self: 'ContainerWatcher', containers: list[dict],
+                  callback: Callable[[dict[str, dict]], None]) -> None:
+        """Subscribe to the state changes of the given containers.
+
+        The callback is called with the state of all watched containers, whenever any of the states change. If the
+        states are already known, the callback is called immediately.
+
+        :param containers: The containers to watch
+        :type containers: list[dict]
+        :param callback: The callback to call with the new states
+        :type callback: Callable[[dict[str, dict]], None]
+        """
+        self._subscribers[callback] = containers
+        if self._states is not None:
+            callback(self._states)
+            if any(container['name'] not in self._states for container in containers):
+                self.refresh()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def unsubscribe(self: 'ContainerWatcher', callback: Callable[[dict[str, dict]], None]) -> None:
+        """Remove a subscription, stopping the watcher when the last subscription is removed.
+
+        :param callback: The callback to unsubscribe
+        :type callback: Callable[[dict[str, dict]], None]
+        """
+        self._subscribers.pop(callback, None)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def refresh(self: 'ContainerWatcher') -> None:
+        """Poll the container states immediately."""
+        self._wakeup.set()
+
+    async def _run(self: 'ContainerWatcher') -> None:
+        """Poll the container states until the watcher is stopped."""
+        while True:
+            self._wakeup.clear()
+            try:
+                containers = list(dict([(container['name'], container)
+                                        for containers in self._subscribers.values()
+                                        for container in containers]).values())
+                states = await get_jupyterhub_client().container_states(self._user_name, containers,
+                                                                        max_age=self._pending_poll_interval)
+                if states != self._states:
+                    self._states = states
+                    for callback in list(self._subscribers.keys()):
+                        callback(states)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'Watching the containers of {self._user_name} failed: {e}')
+            if any(state['state'] in PENDING_STATES for state in (self._states or {}).values()):
+                interval = self._pending_poll_interval
+            else:
+                interval = self._poll_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+class ContainerWatcherRegistry(object):
+    """Registry of the active :class:`~container_launcher.server.container_watcher.ContainerWatcher` by user."""
+
+    def __init__(self: 'ContainerWatcherRegistry', poll_interval: int, pending_poll_interval: int) -> None:
+        """Create a new :class:`~container_launcher.server.container_watcher.ContainerWatcherRegistry`.
+
+        :param poll_interval: The number of seconds between two polls
+        :type poll_interval: int
+        :param pending_poll_interval: The number of seconds between two polls while a container is starting or stopping
+        :type pending_poll_interval: int
+        """
+        self._poll_interval = poll_interval
+        self._pending_poll_interval = pending_poll_interval
+        self._watchers = {}
+
+    def subscribe(self: 'ContainerWatcherRegistry', user_name: str, containers: list[dict],
+                  callback: Callable[[dict[str, dict]], None]) -> None:
+        """Subscribe to the state changes of a user's containers.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param containers: The containers to watch
+        :type containers: list[dict]
+        :param callback: The callback to call with the new states
+        :type callback: Callable[[dict[str, dict]], None]
+        """
+        watcher = self._watchers.get(user_name)
+        if watcher is None:
+            watcher = ContainerWatcher(user_name, self._poll_interval, self._pending_poll_interval)
+            self._watchers[user_name] = watcher
+        watcher.subscribe(containers, callback)
+
+    def unsubscribe(self: 'ContainerWatcherRegistry', user_name: str,
+                    callback: Callable[[dict[str, dict]], None]) -> None:
+        """Remove a subscription to the state changes of a user's containers.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param callback: The callback to unsubscribe
+        :type callback: Callable[[dict[str, dict]], None]
+        """
+        watcher = self._watchers.get(user_name)
+        if watcher is not None:
+            watcher.unsubscribe(callback)
+            if not watcher.subscribed:
+                del self._watchers[user_name]
+
+    def refresh(self: 'ContainerWatcherRegistry', user_name: str) -> None:
+        """Poll the state of a user's containers immediately, if the user's containers are being watched.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        """
+        watcher = self._watchers.get(user_name)
+        if watcher is not None:
+            watcher.refresh()
+
+
+def get_container_watchers() -> ContainerWatcherRegistry:
+    """Get the container watcher registry.
+
+    This returns a singleton instance.
+
+    :return: The registry of container watchers.
+    :rtype: :class:`~container_launcher.server.container_watcher.ContainerWatcherRegistry`
+    """
+    global registry
+    if registry is None:
+        logger.debug('Creating container watcher registry')
+        registry = ContainerWatcherRegistry(config()['jupyterhub']['poll_interval'],
+                                            config()['jupyterhub']['pending_poll_interval'])
+    return registry
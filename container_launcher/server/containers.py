@@ -0,0 +1,78 @@
+"""Index of the configured containers by group."""
+import json
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of distinct group combinations for which the list of containers is cached
+MESSAGE_CACHE_SIZE = 4096
+# State sent for containers for which no state is available
+UNKNOWN_STATE = {'state': 'unknown'}
+
+
+class ContainerIndex(object):
+    """Inverted index from group external ids to the containers available to that group.
+
+    The static part of the client representation of each container is serialised once, so that answering a request
+    only requires looking up the containers and joining the pre-serialised parts with each container's state.
+    """
+
+    def __init__(self: 'ContainerIndex', containers: list[dict]) -> None:
+        """Create a new :class:`~container_launcher.server.containers.ContainerIndex`.
+
+        :param containers: The configured containers
+        :type containers: list[dict]
+        """
+        self._by_group = {}
+        for position, container in enumerate(containers):
+            serialised = json.dumps({
+                'name': container['name'],
+                'title': container['title'],
+                'description': container['description'],
+            })[:-1]
+            for group in container['groups']:
+                entries = self._by_group.setdefault(group, [])
+                if not entries or entries[-1][0] != position:
+                    entries.append((position, (container, serialised)))
+        self._containers = {}
+        logger.debug(f'Indexed {len(containers)} containers for {len(self._by_group)} groups')
+
+    def containers(self: 'ContainerIndex', group_ids: frozenset[str]) -> list[tuple[dict, str]]:
+        """Get the containers available to a user in the given groups.
+
+        Containers are listed in configuration order and each container is listed only once.
+
+        :param group_ids: The external ids of the user's groups
+        :type group_ids: frozenset[str]
+        :return: The configured container and the serialised static part of its client representation
+        :rtype: list[tuple[dict, str]]
+        """
+        containers = self._containers.get(group_ids)
+        if containers is None:
+            if len(group_ids) == 1:
+                entries = self._by_group.get(next(iter(group_ids)), [])
+            else:
+                entries = sorted(dict(entry for group_id in group_ids
+                                      for entry in self._by_group.get(group_id, [])).items())
+            containers = [entry[1] for entry in entries]
+            if len(self._containers) >= MESSAGE_CACHE_SIZE:
+                self._containers.clear()
+            self._containers[group_ids] = containers
+        return containers
+
+    def containers_message(self: 'ContainerIndex', group_ids: frozenset[str], states: dict[str, dict]) -> str:
+        """Get the serialised ``containers`` message for a user in the given groups.
+
+        :param group_ids: The external ids of the user's groups
+        :type group_ids: frozenset[str]
+        :param states: The state of each container, keyed by container name
+        :type states: dict[str, dict]
+        :return: The serialised ``containers`` message
+        :rtype: str
+        """
+        parts = []
+        for container, serialised in self.containers(group_ids):
+            state = states.get(container['name'], UNKNOWN_STATE)
+            parts.append(f'{serialised}, {json.dumps(state)[1:]}')
+        return f'{{"type": "containers", "containers": [{", ".join(parts)}]}}'
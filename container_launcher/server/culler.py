@@ -0,0 +1,254 @@
+"""Scheduler that stops the containers of users that are no longer active."""
+import asyncio
+import logging
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.future import select
+from time import monotonic
+from uuid import uuid4
+
+from .jobs import get_job_queue
+from .jupyterhub import get_jupyterhub_client, server_state
+from ..models import dialect_insert, get_sessionmaker, Presence
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+culler = None
+
+
+def last_activity_age(server: dict) -> float | None:
+    """Get the number of seconds since the hub last saw activity on a server.
+
+    :param server: The server model
+    :type server: dict
+    :return: The number of seconds or ``None`` if the hub has no activity information
+    :rtype: float
+    """
+    if not server.get('last_activity'):
+        return None
+    try:
+        last_activity = datetime.fromisoformat(server['last_activity'].replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if last_activity.tzinfo is None:
+        last_activity = last_activity.replace(tzinfo=timezone.utc)
+    return (datetime.now(tz=timezone.utc) - last_activity).total_seconds()
+
+
+class IdleCuller(object):
+    """Tracks the users' API connections and stops the containers of users that have become idle.
+
+    A user is idle when they have had no open connection for ``idle_timeout`` seconds and the hub has not seen any
+    activity on the container for the same time. Every ``interval`` seconds at most ``batch_size`` idle users are
+    processed, and their containers are stopped through the container job queue.
+
+    The connections are tracked per process. When several processes serve the application, the presence of the users
+    must be shared via :meth:`~container_launcher.server.culler.IdleCuller.share_presence`, as a user who is idle in
+    one process may have reconnected to another.
+    """
+
+    def __init__(self: 'IdleCuller', enabled: bool, idle_timeout: int, interval: int, batch_size: int) -> None:
+        """Create a new :class:`~container_launcher.server.culler.IdleCuller`.
+
+        :param enabled: Whether idle users' containers are stopped. Containers are always stopped on logout.
+        :type enabled: bool
+        :param idle_timeout: The number of seconds after which a user is idle
+        :type idle_timeout: int
+        :param interval: The number of seconds between two culling runs
+        :type interval: int
+        :param batch_size: The maximum number of users to process in one run
+        :type batch_size: int
+        """
+        self._enabled = enabled
+        self._idle_timeout = idle_timeout
+        self._interval = interval
+        self._batch_size = batch_size
+        self._users = {}
+        self._task = None
+        self._process = None
+
+    def share_presence(self: 'IdleCuller') -> None:
+        """Share the presence of the users with the other server processes through the database.
+
+        On every run, the process records the users that are connected to it. Idle users that another process has
+        recorded within the last ``idle_timeout`` plus ``interval`` seconds are left to that process. If the presence
+        cannot be checked, no users are culled in that run.
+        """
+        self._process = uuid4().hex
+
+    def connected(self: 'IdleCuller', user_name: str, containers: list[dict]) -> None:
+        """Record that a user has opened a connection.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param containers: The containers available to the user
+        :type containers: list[dict]
+        """
+        if not self._enabled:
+            return
+        entry = self._users.get(user_name)
+        if entry is None:
+            self._users[user_name] = [1, monotonic(), containers]
+        else:
+            entry[0] = entry[0] + 1
+            entry[1] = monotonic()
+            entry[2] = containers
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def active(self: 'IdleCuller', user_name: str) -> None:
+        """Record activity by a user.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        """
+        entry = self._users.get(user_name)
+        if entry is not None:
+            entry[1] = monotonic()
+
+    def disconnected(self: 'IdleCuller', user_name: str) -> None:
+        """Record that a user has closed a connection.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        """
+        entry = self._users.get(user_name)
+        if entry is not None:
+            entry[0] = max(entry[0] - 1, 0)
+            entry[1] = monotonic()
+
+    def shutdown(self: 'IdleCuller', user_name: str, containers: list[dict]) -> None:
+        """Queue stopping all of a user's containers immediately, regardless of the user's activity.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param containers: The containers to stop
+        :type containers: list[dict]
+        """
+        def log_error(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning(f'Shutting down the containers of {user_name} failed: {task.exception()}')
+
+        self._users.pop(user_name, None)
+        asyncio.ensure_future(self._stop_containers(user_name, containers, None)).add_done_callback(log_error)
+
+    async def _run(self: 'IdleCuller') -> None:
+        """Periodically stop the containers of idle users."""
+        while True:
+            await asyncio.sleep(self._interval)
+            await self._cull()
+
+    async def _cull(self: 'IdleCuller') -> None:
+        """Stop the containers of the users that have been idle for longest."""
+        if self._process is not None:
+            try:
+                await self._record_presence()
+            except SQLAlchemyError as e:
+                logger.warning(f'Recording the presence of users failed: {e}')
+        now = monotonic()
+        idle = [(user_name, entry) for user_name, entry in self._users.items()
+                if entry[0] == 0 and now - entry[1] > self._idle_timeout]
+        idle.sort(key=lambda item: item[1][1])
+        idle = idle[:self._batch_size]
+        if idle and self._process is not None:
+            try:
+                present = await self._present_elsewhere([user_name for user_name, _ in idle])
+            except SQLAlchemyError as e:
+                logger.warning(f'Checking the presence of idle users failed, not culling: {e}')
+                return
+            for user_name in present:
+                del self._users[user_name]
+            idle = [(user_name, entry) for user_name, entry in idle if user_name not in present]
+        if idle:
+            logger.debug(f'Culling the containers of {len(idle)} idle users')
+        for user_name, _ in idle:
+            del self._users[user_name]
+        results = await asyncio.gather(*[self._stop_containers(user_name, entry[2], self._idle_timeout)
+                                         for user_name, entry in idle], return_exceptions=True)
+        for (user_name, _), result in zip(idle, results):
+            if isinstance(result, Exception):
+                logger.warning(f'Culling the containers of {user_name} failed: {result}')
+
+    async def _record_presence(self: 'IdleCuller') -> None:
+        """Record the users connected to this process and remove the records of users that are no longer connected."""
+        now = datetime.utcnow()
+        connected = [user_name for user_name, entry in self._users.items() if entry[0] > 0]
+        async with get_sessionmaker()() as dbsession:
+            if connected:
+                insert = dialect_insert(dbsession)
+                stmt = insert(Presence.__table__).values([{'user_name': user_name, 'process': self._process,
+                                                           'last_seen': now} for user_name in connected])
+                stmt = stmt.on_conflict_do_update(index_elements=[Presence.__table__.c.user_name,
+                                                                  Presence.__table__.c.process],
+                                                  set_={'last_seen': stmt.excluded.last_seen})
+                await dbsession.execute(stmt)
+            await dbsession.execute(delete(Presence).filter(Presence.process == self._process,
+                                                            Presence.last_seen < now))
+            await dbsession.execute(delete(Presence).filter(Presence.last_seen < now - self._presence_window))
+            await dbsession.commit()
+
+    async def _present_elsewhere(self: 'IdleCuller', user_names: list[str]) -> set[str]:
+        """Get those of the users that another process has recently recorded as connected.
+
+        :param user_names: The names of the users to check
+        :type user_names: list[str]
+        :return: The names of the users that are connected to another process
+        :rtype: set[str]
+        """
+        async with get_sessionmaker()() as dbsession:
+            stmt = select(Presence.user_name).filter(Presence.user_name.in_(user_names),
+                                                     Presence.process != self._process,
+                                                     Presence.last_seen >= datetime.utcnow() - self._presence_window)
+            result = await dbsession.execute(stmt)
+            return set(result.scalars())
+
+    @property
+    def _presence_window(self: 'IdleCuller') -> timedelta:
+        """Return the time for which a recorded presence counts, as other processes only record it every run."""
+        return timedelta(seconds=self._idle_timeout + self._interval)
+
+    async def _stop_containers(self: 'IdleCuller', user_name: str, containers: list[dict],
+                               min_idle: int | None) -> None:
+        """Stop those of a user's containers that are running or starting.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param containers: The containers to stop
+        :type containers: list[dict]
+        :param min_idle: If set, only stop containers on which the hub has seen no activity for this many seconds
+        :type min_idle: int
+        """
+        client = get_jupyterhub_client()
+        hosts = list(dict.fromkeys(container['host'] for container in containers))
+        servers = dict(zip(hosts, await asyncio.gather(*[client.user_servers(host, user_name, max_age=0)
+                                                         for host in hosts])))
+        for container in containers:
+            server = servers[container['host']].get(container['name'])
+            if server is None or server_state(container['host'], server)['state'] not in ('running', 'starting'):
+                continue
+            if min_idle is not None:
+                age = last_activity_age(server)
+                if age is not None and age < min_idle:
+                    continue
+            logger.debug(f'Stopping {container["name"]} for {user_name}')
+            get_job_queue().submit(user_name, container, 'stop')
+
+
+def get_idle_culler() -> IdleCuller:
+    """Get the idle culler.
+
+    This returns a singleton instance.
+
+    :return: The idle culler as configured by the settings.
+    :rtype: :class:`~container_launcher.server.culler.IdleCuller`
+    """
+    global culler
+    if culler is None:
+        logger.debug('Creating idle culler')
+        settings = config()['jupyterhub']['cull']
+        culler = IdleCuller(settings['enabled'], settings['idle_timeout'], settings['interval'],
+                            settings['batch_size'])
+    return culler
@@ -2,7 +2,9 @@
 
 type ApiMessage = ConnectedMessage | DisconnectedMessage | UnauthorisedMessage | LoggedOutMessage |
                   RequestConfigMessage | ConfigMessage | RequestContainersMessage | ContainersMessage |
-                  RequestUserMessage | UserMessage;
+                  ContainersUpdateMessage | RequestUserMessage | UserMessage | StartContainerMessage |
+                  StopContainerMessage | ContainerJobMessage | ErrorMessage;
+
 
 type ConnectedMessage = {
     type: 'connected',
@@ -42,7 +44,7 @@ type RequestContainersMessage = {
     type: 'request-containers',
 };
 
-type Container = PausedContainer;
+type Container = PausedContainer | RunningContainer | PendingContainer;
 
 type PausedContainer = {
     name: string,
@@ -51,6 +53,13 @@ type PausedContainer = {
     state: 'paused',
 };
 
+type PendingContainer = {
+    name: string,
+    title: string,
+    description: string,
+    state: 'starting' | 'stopping' | 'unknown',
+};
+
 type RunningContainer = {
     name: string,
     title: string,
@@ -64,6 +73,17 @@ type ContainersMessage = {
     containers: Container[],
 };
 
+type ContainerStateUpdate = {
+    name: string,
+    state: 'paused' | 'starting' | 'stopping' | 'unknown' | 'running',
+    url?: string,
+};
+
+type ContainersUpdateMessage = {
+    type: 'containers-update',
+    containers: ContainerStateUpdate[],
+};
+
 type RequestUserMessage = {
     type: 'request-user',
 };
@@ -77,3 +97,30 @@ type UserMessage = {
     type: 'user',
     user: User,
 };
+
+type StartContainerMessage = {
+    type: 'start-container',
+    id?: number | string,
+    container: string,
+};
+
+type StopContainerMessage = {
+    type: 'stop-container',
+    id?: number | string,
+    container: string,
+};
+
+type ContainerJobMessage = {
+    type: 'container-job',
+    id?: number | string,
+    container: string,
+    action: 'start' | 'stop',
+    status: 'queued' | 'running' | 'completed' | 'failed',
+    message?: string,
+};
+
+type ErrorMessage = {
+    type: 'error',
+    id?: number | string,
+    message: string,
+};
@@ -30,18 +30,27 @@ const unsubscribeMessage = message.subscribe((msg) => {
             message: 'Initialising...',
         });
         activity.start('config', 'Fetching configuration...');
-        sendMessage({type: 'request-config'});
+        sendMessage([{type: 'request-config'}, {type: 'request-user'}, {type: 'request-containers'}]);
     } else if (msg.type === 'config') {
         activity.complete('config', true);
         config.set(msg.config);
         document.title = msg.config.title;
     } else if (msg.type === 'user') {
         activity.start('container', 'Fetching available virtual computing environments...');
-        sendMessage({type: 'request-containers'});
     } else if (msg.type === 'containers') {
         containers.set(msg.containers);
         activity.complete('container', true);
         activity.close();
+    } else if (msg.type === 'containers-update') {
+        containers.update((current) => {
+            return current.map((container) => {
+                const update = msg.containers.find((candidate) => candidate.name === container.name);
+                if (update) {
+                    return {name: container.name, title: container.title, description: container.description, ...update} as Container;
+                }
+                return container;
+            });
+        });
     }
 });
 
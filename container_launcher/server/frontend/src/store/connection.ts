@@ -31,7 +31,14 @@ export function connect() {
         });
         connection.addEventListener('message', (msg) => {
             if (msg.data) {
-                message.set(JSON.parse(msg.data));
+                const data = JSON.parse(msg.data);
+                if (Array.isArray(data)) {
+                    for (const item of data) {
+                        message.set(item);
+                    }
+                } else {
+                    message.set(data);
+                }
             }
         });
     }
@@ -53,7 +60,7 @@ export const isShutDown = derived(connectionStatus, (status) => {
     return status === SHUTDOWN;
 });
 
-export function sendMessage(message: ApiMessage) {
+export function sendMessage(message: ApiMessage | ApiMessage[]) {
     if (connection && connection.readyState === 1) {
         connection.send(JSON.stringify(message));
     }
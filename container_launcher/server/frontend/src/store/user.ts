@@ -1,6 +1,6 @@
 import { writable } from 'svelte/store';
 
-import { message, sendMessage } from './connection';
+import { message } from './connection';
 import { activity } from './activity';
 
 
@@ -14,7 +14,6 @@ const unsubscribeMessage = message.subscribe((msg) => {
         isUnauthorised.set(false);
         isLoggedOut.set(false);
         activity.start('user', 'Fetching your details...');
-        sendMessage({type: 'request-user'});
     } else if (msg.type === 'user') {
         user.set(msg.user);
         activity.complete('user', true);
@@ -1,18 +1,183 @@
 """Handler for the application files."""
+import gzip
+import hashlib
 import logging
+import re
 
+from dataclasses import dataclass, field
 from importlib import resources
 from importlib.abc import Traversable
 from mimetypes import guess_type
 from tornado.web import RequestHandler
 
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
 
 logger = logging.getLogger(__name__)
 
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+@dataclass(frozen=True)
+class Asset(object):
+    """A single, fully pre-processed frontend file.
+
+    * path - The path of the file relative to the public directory
+    * mimetype - The Content-Type to send
+    * etag - The strong ETag of the uncompressed data
+    * variants - The data for each available Content-Encoding, ``identity`` is always present
+    """
+
+    path: str
+    mimetype: str
+    etag: str
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def version(self: 'Asset') -> str:
+        """Return the short version token used to cache-bust references to this asset."""
+        return self.etag[1:13]
+
+
+class AssetIndex(object):
+    """In-memory index of all frontend files with their pre-compressed variants.
+
+    The index is built once at start-up, after which serving a file requires neither disk access nor any
+    compression or hashing work.
+    """
+
+    def __init__(self: 'AssetIndex', root: Traversable) -> None:
+        """Build the index of all files found under ``root``.
+
+        :param root: The directory to index
+        :type root: importlib.Traversable
+        """
+        self._assets = {}
+        self._load(root, ())
+        self._version_index()
+        logger.debug(f'Indexed {len(self._assets)} frontend files')
+
+    def _load(self: 'AssetIndex', resource: Traversable, path: tuple[str]) -> None:
+        """Recursively load all files under ``resource``.
+
+        :param resource: The resource to load
+        :type resource: importlib.Traversable
+        :param path: The path of the resource relative to the index root
+        :type path: tuple[str]
+        """
+        if resource.is_dir():
+            for child in resource.iterdir():
+                self._load(child, path + (child.name, ))
+        elif resource.is_file():
+            self._add('/'.join(path), resource.read_bytes())
+
+    def _add(self: 'AssetIndex', path: str, data: bytes) -> None:
+        """Add a single file to the index, generating its compressed variants.
+
+        :param path: The path of the file relative to the index root
+        :type path: str
+        :param data: The file's content
+        :type data: bytes
+        """
+        mimetype = guess_type(path)[0] or 'application/octet-stream'
+        variants = {'identity': data}
+        if mimetype.startswith(COMPRESSIBLE_TYPES) and len(data) > 0:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(compressed) < len(data):
+                variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    variants['br'] = compressed
+        self._assets[path] = Asset(path=path,
+                                   mimetype=mimetype,
+                                   etag=f'"{hashlib.sha256(data).hexdigest()[:32]}"',
+                                   variants=variants)
+
+    def _version_index(self: 'AssetIndex') -> None:
+        """Add version tokens to all references to ``build/`` files in ``index.html``.
+
+        The build files have fixed names, so the version token is what allows them to be cached as immutable.
+        """
+        if 'index.html' not in self._assets:
+            return
+
+        def add_version(match: re.Match) -> str:
+            asset = self._assets.get(match.group(2))
+            if asset is None:
+                return match.group(0)
+            return f'{match.group(1)}{match.group(2)}?v={asset.version}{match.group(3)}'
+
+        html = self._assets['index.html'].variants['identity'].decode('utf-8')
+        html = re.sub(r'''(["']/app/)(build/[^"'?]+)(["'])''', add_version, html)
+        self._add('index.html', html.encode('utf-8'))
+
+    def get(self: 'AssetIndex', path: str) -> Asset | None:
+        """Get the :class:`~container_launcher.server.handlers.frontend.Asset` for the given path.
+
+        :param path: The path of the file relative to the index root
+        :type path: str
+        :return: The asset or ``None`` if no asset exists for the path
+        :rtype: :class:`~container_launcher.server.handlers.frontend.Asset`
+        """
+        return self._assets.get(path)
+
+    @property
+    def index(self: 'AssetIndex') -> Asset:
+        """Return the ``index.html`` asset that is sent for all unknown paths."""
+        return self._assets['index.html']
+
+
+def build_asset_index() -> AssetIndex:
+    """Build the :class:`~container_launcher.server.handlers.frontend.AssetIndex` for the frontend files.
+
+    :return: The new asset index
+    :rtype: :class:`~container_launcher.server.handlers.frontend.AssetIndex`
+    """
+    return AssetIndex(resources.files('container_launcher') / 'server' / 'frontend' / 'public')
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Parse an ``Accept-Encoding`` header into the set of acceptable encodings.
+
+    :param header: The header value
+    :type header: str
+    :return: The encodings that have a non-zero quality
+    :rtype: set[str]
+    """
+    encodings = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(name)
+    return encodings
+
 
 class FrontendHandler(RequestHandler):
     """Handler for the frontend application files."""
 
+    def initialize(self: 'FrontendHandler', assets: AssetIndex) -> None:
+        """Initialise the handler.
+
+        :param assets: The index of frontend files to serve
+        :type assets: :class:`~container_launcher.server.handlers.frontend.AssetIndex`
+        """
+        self._assets = assets
+
     def get(self: 'FrontendHandler', path: str) -> None:
         """Get the file at the given path.
 
@@ -20,34 +185,41 @@ class FrontendHandler(RequestHandler):
         :type: path: str
         """
         self.xsrf_token
-        if not path.strip():
-            path = '/'
-        base = resources.files('container_launcher')
-        public = base / 'server' / 'frontend' / 'public'
-        try:
-            logger.debug(f'Attempting to send {path}')
-            self._get_resource(public, path.split('/')[1:])
-        except FileNotFoundError:
-            logger.debug('Sending index.html')
-            self._get_resource(public, ('index.html', ))
-
-    def _get_resource(self: 'FrontendHandler', resource: Traversable, path: list[str]) -> None:
+        asset = self._assets.get(path.strip().lstrip('/'))
+        if asset is None:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'Sending index.html for {path}')
+            asset = self._assets.index
+        self._send_asset(asset)
+
+    def _send_asset(self: 'FrontendHandler', asset: Asset) -> None:
         """Send a file.
 
-        Performs mimetype guessing and sets the appropriate Content-Type header.
+        Selects the best available Content-Encoding and sets the caching headers. Versioned requests for files in
+        ``build/`` are cached as immutable, everything else must be revalidated via the ETag.
 
-        :param resource: The root resource to serve files from
-        :type resource: importlib.Traversable
-        :param path: The path to the file to send
-        :type path: list[str]
-        """
-        for part in path:
-            resource = resource / part
-        try:
-            data = resource.read_bytes()
-            mimetype = guess_type(path[-1])
-            if mimetype:
-                self.set_header('Content-Type', mimetype[0])
-            self.write(data)
-        except IsADirectoryError:
-            raise FileNotFoundError()
+        :param asset: The asset to send
+        :type asset: :class:`~container_launcher.server.handlers.frontend.Asset`
+        """
+        encoding = 'identity'
+        if len(asset.variants) > 1:
+            self.set_header('Vary', 'Accept-Encoding')
+            accepted = accepted_encodings(self.request.headers.get('Accept-Encoding', ''))
+            for candidate in ('br', 'gzip'):
+                if candidate in asset.variants and candidate in accepted:
+                    encoding = candidate
+                    break
+        if encoding == 'identity':
+            self.set_header('Etag', asset.etag)
+        else:
+            self.set_header('Etag', f'{asset.etag[:-1]}-{encoding}"')
+            self.set_header('Content-Encoding', encoding)
+        if asset.path.startswith('build/') and self.get_query_argument('v', None) == asset.version:
+            self.set_header('Cache-Control', IMMUTABLE_CACHE_CONTROL)
+        else:
+            self.set_header('Cache-Control', REVALIDATE_CACHE_CONTROL)
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+        self.set_header('Content-Type', asset.mimetype)
+        self.write(asset.variants[encoding])
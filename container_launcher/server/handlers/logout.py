@@ -3,21 +3,58 @@ import logging
 
 from tornado.web import RequestHandler
 
+from ..culler import get_idle_culler
 from ..session import SessionMixin
-from ...utils import config
+from ..snapshot import get_snapshot
+from ..user_cache import get_user_cache
 
 
 logger = logging.getLogger(__name__)
 
+# Page that asks the user to confirm the logout, which is then sent as an XSRF-protected POST request
+LOGOUT_PAGE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Log out</title></head>
+<body>
+<form method="post" action="/logout">{xsrf}
+<p>Logging out stops all your running containers.</p>
+<button type="submit">Log out</button>
+</form>
+</body>
+</html>
+'''
 
-class LogoutHandler(RequestHandler, SessionMixin):
-    """Handle logout requests, ensuring all containers are shut down."""
+
+class LogoutHandler(SessionMixin, RequestHandler):
+    """Handle logout requests, ensuring all containers are shut down.
+
+    As following a link must not stop the user's containers, a ``GET`` request only asks the user to confirm the
+    logout. The logout itself is a ``POST`` request, which is protected by the XSRF check.
+    """
 
     def get(self: 'LogoutHandler') -> None:
+        """Ask the user to confirm the logout."""
+        if 'user_id' in self.session:
+            self.write(LOGOUT_PAGE.format(xsrf=self.xsrf_form_html()))
+        else:
+            self.redirect_after_logout()
+
+    async def post(self: 'LogoutHandler') -> None:
         """Perform the logout and shut down all user containers."""
+        snapshot = get_snapshot()
         if 'user_id' in self.session:
-            del self.session['user_id']
-        if config()['app']['vle']['url']:
-            self.redirect(config()['app']['vle']['url'])
+            user = await get_user_cache().get(self.session['user_id'], self.session.get('user_version', 0))
+            if user is not None:
+                get_idle_culler().shutdown(str(user.id), [
+                    container for container, _ in snapshot.container_index.containers(user.group_ids)])
+            self.session.clear()
+            await self.session.save()
+        self.redirect_after_logout()
+
+    def redirect_after_logout(self: 'LogoutHandler') -> None:
+        """Redirect to the VLE, if configured, or to the application."""
+        snapshot = get_snapshot()
+        if snapshot.config['app']['vle']['url']:
+            self.redirect(snapshot.config['app']['vle']['url'])
         else:
             self.redirect('/app')
@@ -1,32 +1,30 @@
 """Handler for the LTI login."""
+import json
 import logging
 
+import jwt
+
 from pylti1p3.cookie import CookieService as LTICookieService
+from pylti1p3.exception import LtiException
 from pylti1p3.message_launch import MessageLaunch as LTIMessageLaunch
 from pylti1p3.oidc_login import OIDCLogin as LTILogin
 from pylti1p3.request import Request as LTIRequest
 from pylti1p3.session import SessionService as LTISessionService
 from pylti1p3.tool_config import ToolConfDict
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from tornado.web import RequestHandler, HTTPError
+from time import time
+from tornado.web import RequestHandler, HTTPError, MissingArgumentError
 
+from ..admission import AdmissionMixin
+from ..lti_config import KeySetCache
 from ..session import SessionMixin, Session
-from ...models import get_sessionmaker, User, Group
-from ...utils import config
+from ..snapshot import get_snapshot
+from ..user_cache import get_user_cache
+from ...jwt_verifier import JwtVerifier, find_key, load_key, get_jwt_verifier
+from ...models import get_sessionmaker, upsert_launch_user
 
 logger = logging.getLogger(__name__)
 
 
-def generate_config() -> dict:
-    """Generate the configuration dictionary for the configured LTI platforms.
-
-    :return: The configuration dictionary for the LTI library.
-    :rtype: dict
-    """
-    return dict([(entry['iss'], entry) for entry in config()['lti']])
-
-
 class TornadoLTIRequest(LTIRequest):
     """Request wrapper for the LTI authentication processes."""
 
@@ -148,7 +146,7 @@ class TornadoLTILogin(LTILogin):
 class TornadoLTIMessageLaunch(LTIMessageLaunch):
     """LTI authentication process step 2: launch."""
 
-    def __init__(self: 'TornadoLTIMessageLaunch', request: TornadoLTIRequest, tool_config: ToolConfDict, cookie_service: TornadoLTICookieService) -> None:  # noqa: E501
+    def __init__(self: 'TornadoLTIMessageLaunch', request: TornadoLTIRequest, tool_config: ToolConfDict, cookie_service: TornadoLTICookieService, key_sets: KeySetCache) -> None:  # noqa: E501
         """Create a new :class:`~compute_home.server.handlers.lti.TornadoLTIMessageLaunch`.
 
         :param request: The request containing the launch data.
@@ -157,8 +155,12 @@ class TornadoLTIMessageLaunch(LTIMessageLaunch):
         :type tool_config: :class:`~pylti1p3.tool_config.ToolConfigDict`
         :param cookie_service: The cookie wrapper.
         :type cookie_service: :class:`~compute_home.server.handlers.lti.TornadoLTICookieService`
+        :param key_sets: The cache of the platforms' key sets.
+        :type key_sets: :class:`~container_launcher.server.lti_config.KeySetCache`
         """
         super().__init__(request, tool_config, LTISessionService(request), cookie_service)
+        self._key_sets = key_sets
+        self._signature_verified = False
 
     def _get_request_param(self: 'TornadoLTIMessageLaunch', key: str) -> str:
         """Get a request parameter value.
@@ -170,90 +172,222 @@ class TornadoLTIMessageLaunch(LTIMessageLaunch):
         """
         return self._request.get_param(key)
 
+    def validate_jwt_format(self: 'TornadoLTIMessageLaunch') -> 'TornadoLTIMessageLaunch':
+        """Decode the JWT header and body, unless that has already been done for this launch.
+
+        :return: This launch
+        :rtype: :class:`~compute_home.server.handlers.lti.TornadoLTIMessageLaunch`
+        """
+        if 'header' not in self._jwt or 'body' not in self._jwt:
+            super().validate_jwt_format()
+        return self
+
+    def get_unverified_key_id(self: 'TornadoLTIMessageLaunch') -> tuple[str, str]:
+        """Get the issuer and key id from the launch JWT, without verifying it.
+
+        This is only used to make sure that the issuer's key set is cached before the launch is validated. The decoded
+        JWT is kept, so that the validation does not decode it again.
+
+        :return: The issuer and the key id
+        :rtype: tuple[str, str]
+        """
+        self.validate_jwt_format()
+        return (self._jwt['body'].get('iss'), self._jwt['header'].get('kid'))
+
+    def get_unverified_body(self: 'TornadoLTIMessageLaunch') -> dict:
+        """Get the body of the launch JWT, without verifying it.
+
+        The decoded JWT is kept, so that neither the key lookup nor the validation decode it again.
+
+        :return: The JWT body
+        :rtype: dict
+        :raises LtiException: If the JWT cannot be decoded
+        """
+        self.validate_jwt_format()
+        return self._jwt['body']
+
+    def fetch_public_key(self: 'TornadoLTIMessageLaunch', key_set_url: str) -> dict:
+        """Get the platform's key set from the :class:`~container_launcher.server.lti_config.KeySetCache`.
+
+        Falls back to fetching the key set if it is not cached.
+
+        :param key_set_url: The URL of the platform's key set.
+        :type key_set_url: str
+        :return: The platform's key set.
+        :rtype: dict
+        """
+        key_set = self._key_sets.get(self._registration.get_issuer())
+        if key_set is not None:
+            return key_set
+        return super().fetch_public_key(key_set_url)
+
+    def get_public_key(self: 'TornadoLTIMessageLaunch') -> tuple[object, str]:
+        """Get the platform's public key for the launch JWT, using the cached parsed key where possible.
+
+        :return: The public key and the signature algorithm.
+        :rtype: tuple[object, str]
+        """
+        key_set = self._key_sets.get(self._registration.get_issuer())
+        if key_set is not None:
+            key = find_key(key_set, self._jwt['header'].get('kid'), self._jwt['header'].get('alg'))
+            if key is not None:
+                return load_key(json.dumps(key, sort_keys=True)), self._jwt['header']['alg']
+        return super().get_public_key()
+
+    async def verify_signature(self: 'TornadoLTIMessageLaunch', verifier: JwtVerifier) -> None:
+        """Verify the JWT signature in the verifier's worker processes, before the launch is validated.
+
+        If the platform's key is not cached, the signature is verified as part of the launch validation instead.
+
+        :param verifier: The verifier to use
+        :type verifier: :class:`~container_launcher.jwt_verifier.JwtVerifier`
+        """
+        iss, kid = self.get_unverified_key_id()
+        key_set = self._key_sets.get(iss)
+        if key_set is None:
+            return
+        key = find_key(key_set, kid, self._jwt['header'].get('alg'))
+        if key is None:
+            return
+        try:
+            self._jwt['body'] = await verifier.verify(self._get_id_token(), key, self._jwt['header']['alg'],
+                                                      self._jwt_verify_options)
+        except jwt.InvalidTokenError as e:
+            raise LtiException(f"Can't decode id_token: {e}")
+        self._signature_verified = True
+
+    def validate_jwt_signature(self: 'TornadoLTIMessageLaunch') -> 'TornadoLTIMessageLaunch':
+        """Verify the JWT signature, unless that has already been done by :meth:`verify_signature`.
+
+        :return: This launch
+        :rtype: :class:`~compute_home.server.handlers.lti.TornadoLTIMessageLaunch`
+        """
+        if not self._signature_verified:
+            super().validate_jwt_signature()
+        return self
+
 
-class LtiLoginStartHandler(RequestHandler, SessionMixin):
+class LtiLoginStartHandler(AdmissionMixin, SessionMixin, RequestHandler):
     """Request handler for handling the initial login process start request."""
 
-    def post(self: 'LtiLoginStartHandler') -> None:
+    def initialize(self: 'LtiLoginStartHandler') -> None:
+        """Use the current configuration snapshot for the whole request."""
+        self.snapshot = get_snapshot()
+
+    def admission_keys(self: 'LtiLoginStartHandler') -> tuple[str | None, str | None]:
+        """Get the issuer and the login hint from the login request.
+
+        :return: The issuer and the login hint, either of which may be ``None``
+        :rtype: tuple[str, str]
+        """
+        return self.get_argument('iss', None), self.get_argument('login_hint', None)
+
+    async def post(self: 'LtiLoginStartHandler') -> None:
         """Handle the POST request that starts the login process."""
         logger.debug('Starting the LTI login process')
         self.session.clear()
         oidc_request = TornadoLTIRequest(self)
         oidc_login = TornadoLTILogin(
             request=oidc_request,
-            tool_config=ToolConfDict(generate_config()),
+            tool_config=self.snapshot.tool_registry.tool_config,
             cookie_service=TornadoLTICookieService(self),
         )
         oidc_login.pass_params_to_launch({'xsrf': self.xsrf_token.decode('utf-8')})
         self.session['xsrf'] = self.xsrf_token.decode('utf-8')
+        redirect = oidc_login.get_redirect_object(self.get_argument('target_link_uri'))
+        await self.session.save()
         logger.debug('Redirecting to the LTI platform')
-        return oidc_login.redirect(self.get_argument('target_link_uri'))
+        redirect.do_redirect()
 
     def check_xsrf_cookie(self: 'LtiLoginStartHandler') -> None:
         """No XSRF check needed, as this will always come from external."""
         pass
 
 
-class LtiLaunchHandler(RequestHandler, SessionMixin):
+class LtiLaunchHandler(AdmissionMixin, SessionMixin, RequestHandler):
     """Request handler for handling the launch request after authentication is successful."""
 
+    _message_launch = None
+    _launch_data = None
+
+    def initialize(self: 'LtiLaunchHandler') -> None:
+        """Use the current configuration snapshot for the whole request."""
+        self.snapshot = get_snapshot()
+
+    def admission_keys(self: 'LtiLaunchHandler') -> tuple[str | None, str | None]:
+        """Get the issuer and the subject from the launch JWT, without verifying it.
+
+        The JWT is decoded by the request's message launch, which keeps the decoded JWT for the validation.
+
+        :return: The issuer and the subject, either of which may be ``None``
+        :rtype: tuple[str, str]
+        """
+        try:
+            claims = self.message_launch.get_unverified_body()
+        except (LtiException, MissingArgumentError):
+            return None, None
+        if not isinstance(claims, dict):
+            return None, None
+        return (str(claims['iss']) if 'iss' in claims else None, str(claims['sub']) if 'sub' in claims else None)
+
+    @property
+    def message_launch(self: 'LtiLaunchHandler') -> TornadoLTIMessageLaunch:
+        """Return the :class:`~compute_home.server.handlers.lti.TornadoLTIMessageLaunch` for this request."""
+        if self._message_launch is None:
+            self._message_launch = TornadoLTIMessageLaunch(
+                request=TornadoLTIRequest(self),
+                tool_config=self.snapshot.tool_registry.tool_config,
+                cookie_service=TornadoLTICookieService(self),
+                key_sets=self.snapshot.tool_registry.key_sets,
+            )
+        return self._message_launch
+
+    async def get_launch_data(self: 'LtiLaunchHandler') -> dict:
+        """Validate the launch and return the decoded launch claims.
+
+        The JWT is decoded and its signature verified only once per request. If a
+        :class:`~container_launcher.jwt_verifier.JwtVerifier` is configured, the signature is verified in its worker
+        processes, so that a burst of launches does not block the event loop.
+
+        :return: The validated launch claims.
+        :rtype: dict
+        """
+        if self._launch_data is None:
+            await self.snapshot.tool_registry.key_sets.ensure(*self.message_launch.get_unverified_key_id())
+            if get_jwt_verifier() is not None:
+                await self.message_launch.verify_signature(get_jwt_verifier())
+            self._launch_data = self.message_launch.get_launch_data()
+        return self._launch_data
+
     async def post(self: 'LtiLaunchHandler') -> None:
         """Handle the POST request that completes the login proces."""
         logger.debug('Starting the LTI launch process')
-        tool_config = ToolConfDict(generate_config())
-        oidc_request = TornadoLTIRequest(self)
-        message_launch = TornadoLTIMessageLaunch(
-            request=oidc_request,
-            tool_config=tool_config,
-            cookie_service=TornadoLTICookieService(self),
-        )
-        logger.debug('LTI launch validated - logging in')
-        message_launch.get_launch_data()
-        data = message_launch.get_launch_data()
-        logger.debug(data)
-        logger.debug('Logging in user')
+        data = await self.get_launch_data()
+        context = data['https://purl.imsglobal.org/spec/lti/claim/context']
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'LTI launch validated - logging in {data["sub"]} from {data["iss"]}',
+                         extra={'iss': data['iss'], 'sub': data['sub'], 'context_id': context['id']})
         async with get_sessionmaker()() as dbsession:
-            # Find or create the user to log in
-            stmt = select(User).options(selectinload(User.groups)).filter(User.external_id == str(data['sub']))
-            result = await dbsession.execute(stmt)
-            user = result.scalars().first()
-            if user is None:
-                logger.debug('Creating a new user')
-                user = User(external_id=str(data['sub']), attributes={}, groups=[])
-                dbsession.add(user)
-                await dbsession.commit()
-            user.attributes['name'] = str(data['name'])
-            # Find or create the group the user belongs to
-            group_found = False
-            external_group_id = str(data['https://purl.imsglobal.org/spec/lti/claim/context']['id'])
-            for user_group in user.groups:
-                if user_group.external_id == external_group_id:
-                    group_found = True
-            if not group_found:
-                stmt = select(Group).filter(Group.external_id == external_group_id)
-                result = await dbsession.execute(stmt)
-                group = result.scalars().first()
-                if group is None:
-                    group = Group(external_id=external_group_id, attributes={
-                        'label': str(data['https://purl.imsglobal.org/spec/lti/claim/context']['title'])
-                    })
-                    dbsession.add(group)
-                user.groups.append(group)
-            dbsession.add(user)
+            user_id = await upsert_launch_user(dbsession,
+                                               str(data['sub']), {'name': str(data['name'])},
+                                               str(context['id']), {'label': str(context['title'])})
             await dbsession.commit()
+        get_user_cache().invalidate(user_id)
         self.session.clear()
-        self.session['user_id'] = user.id
+        self.session['user_id'] = user_id
+        self.session['user_version'] = time()
+        await self.session.save()
         self.redirect('/app')
 
-    def check_xsrf_cookie(self: 'LtiLaunchHandler') -> None:
-        """Check the XSRF state parameter."""
-        tool_config = ToolConfDict(generate_config())
-        oidc_request = TornadoLTIRequest(self)
-        message_launch = TornadoLTIMessageLaunch(
-            request=oidc_request,
-            tool_config=tool_config,
-            cookie_service=TornadoLTICookieService(self),
-        )
-        params = message_launch.get_params_from_login()
-        if params is None or 'xsrf' not in params or params['xsrf'] != self.session['xsrf']:
+    async def prepare(self: 'LtiLaunchHandler') -> None:
+        """Load the session and check the XSRF state parameter."""
+        await super().prepare()
+        if self._finished:
+            return
+        params = self.message_launch.get_params_from_login()
+        if params is None or 'xsrf' not in params or params['xsrf'] != self.session.get('xsrf'):
             raise HTTPError(status_code=403, log_message='XSRF validation failed')
+
+    def check_xsrf_cookie(self: 'LtiLaunchHandler') -> None:
+        """Skip the default XSRF check, as the XSRF state parameter is checked once the session is loaded."""
+        pass
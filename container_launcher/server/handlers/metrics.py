@@ -0,0 +1,37 @@
+"""Handler for the Prometheus metrics."""
+import hmac
+import logging
+
+from prometheus_client import CONTENT_TYPE_LATEST
+from tornado.web import RequestHandler
+
+from ...metrics import get_metrics
+from ...utils import config
+
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsHandler(RequestHandler):
+    """Export the metrics in the Prometheus text format.
+
+    If a ``server.metrics.token`` is configured, requests must send it as ``Authorization: Bearer <token>``.
+    """
+
+    def prepare(self: 'MetricsHandler') -> None:
+        """Check the bearer token, if one is configured."""
+        token = config()['server']['metrics']['token']
+        if token:
+            header = self.request.headers.get('Authorization', '')
+            if not header.startswith('Bearer ') or not hmac.compare_digest(header[7:].encode('utf-8'),
+                                                                            token.encode('utf-8')):
+                self.set_status(401)
+                self.set_header('WWW-Authenticate', 'Bearer')
+                self.finish()
+
+    def get(self: 'MetricsHandler') -> None:
+        """Send the current metrics."""
+        metrics = get_metrics()
+        metrics.update_gauges()
+        self.set_header('Content-Type', CONTENT_TYPE_LATEST)
+        self.write(metrics.generate())
@@ -0,0 +1,349 @@
+"""Handlers for the reverse proxy to the container hosts."""
+import asyncio
+import logging
+
+from time import monotonic
+from tornado.http1connection import HTTP1Connection, HTTP1ConnectionParameters
+from tornado.httpclient import HTTPClientError, HTTPRequest
+from tornado.httputil import HTTPHeaders, HTTPInputError, HTTPMessageDelegate, RequestStartLine, ResponseStartLine
+from tornado.iostream import StreamClosedError
+from tornado.routing import PathMatches
+from tornado.web import RequestHandler, HTTPError, stream_request_body
+from tornado.websocket import WebSocketClosedError, WebSocketHandler, websocket_connect
+from weakref import WeakKeyDictionary
+
+from ..proxy import connection_headers, get_upstream_pool, proxy_url, upstream_target
+from ..session import Session
+from ..snapshot import get_snapshot
+from ..user_cache import get_user_cache
+from ...utils import config
+
+
+logger = logging.getLogger(__name__)
+
+# The containers that the user of each client connection may access, keyed by the connection's stream
+authorisations = WeakKeyDictionary()
+# Number of seconds for which the user of a client connection is not looked up again
+AUTHORISATION_TTL = 5
+# Connection parameters for the upstream connections. Responses are streamed, so their size is not limited.
+UPSTREAM_PARAMETERS = HTTP1ConnectionParameters(decompress=False, chunk_size=65536, max_body_size=2 ** 62)
+# Close codes that are only reported locally and must not be sent in a close frame
+RESERVED_CLOSE_CODES = (1005, 1006, 1015)
+
+
+async def authorise(handler: RequestHandler, name: str) -> dict:
+    """Get the configuration of the container that a request is for, if the user may access the container.
+
+    The user and the containers available to them are looked up once per client connection and session cookie, so
+    that further requests on a keep-alive connection do not load the session. Logging in and out give the session a
+    new id and thus a new cookie. A session that ends in any other way, such as a logout sent with an earlier copy of
+    the cookie, is noticed within ``AUTHORISATION_TTL`` seconds, after which the session is loaded again.
+
+    :param handler: The handler of the request
+    :type handler: :class:`~tornado.web.RequestHandler`
+    :param name: The name of the container
+    :type name: str
+    :return: The container configuration
+    :rtype: dict
+    :raises HTTPError: If the user is not logged in or may not access the container
+    """
+    snapshot = get_snapshot()
+    stream = handler.request.connection.stream
+    cookie = handler.get_cookie(config()['server']['session']['name'])
+    authorisation = authorisations.get(stream)
+    if authorisation is None or authorisation[0] != cookie or authorisation[1] is not snapshot or \
+            monotonic() - authorisation[3] >= AUTHORISATION_TTL:
+        session = Session(handler)
+        await session.load()
+        if 'user_id' in session:
+            user = await get_user_cache().get(session['user_id'], session.get('user_version', 0))
+        else:
+            user = None
+        if user is None:
+            raise HTTPError(403, log_message='Proxy request without a logged in user')
+        containers = dict([(container['name'], container)
+                           for container, _ in snapshot.container_index.containers(user.group_ids)])
+        authorisation = (cookie, snapshot, containers, monotonic())
+        authorisations[stream] = authorisation
+    if name not in authorisation[2]:
+        raise HTTPError(404, log_message=f'Proxy request for the unavailable container {name}')
+    return authorisation[2][name]
+
+
+def forwarded_headers(handler: RequestHandler, exclude: frozenset[str] = frozenset()) -> HTTPHeaders:
+    """Get the headers to forward to the container host.
+
+    The ``Host`` header is kept, so that the container host sees the same origin as the browser. Of cookies with the
+    same name, only the first, which the browser sends for the most specific path, is forwarded, and the session cookie
+    is not forwarded at all.
+
+    :param handler: The handler of the request
+    :type handler: :class:`~tornado.web.RequestHandler`
+    :param exclude: The names of further headers not to forward, in lower case
+    :type exclude: frozenset[str]
+    :return: The headers
+    :rtype: :class:`~tornado.httputil.HTTPHeaders`
+    """
+    request = handler.request
+    skip = connection_headers(request.headers).union(exclude)
+    headers = HTTPHeaders()
+    for name, value in request.headers.get_all():
+        if name.lower() not in skip and name != 'Cookie':
+            headers.add(name, value)
+    cookies = {}
+    session_name = config()['server']['session']['name']
+    for value in request.headers.get_list('Cookie'):
+        for cookie in value.split(';'):
+            name = cookie.split('=', 1)[0].strip()
+            if name and name != session_name and name not in cookies:
+                cookies[name] = cookie.strip()
+    if cookies:
+        headers['Cookie'] = '; '.join(cookies.values())
+    forwarded_for = request.headers.get('X-Forwarded-For')
+    headers['X-Forwarded-For'] = f'{forwarded_for}, {request.remote_ip}' if forwarded_for else request.remote_ip
+    headers['X-Forwarded-Proto'] = request.protocol
+    headers['X-Forwarded-Host'] = request.host
+    return headers
+
+
+class UpstreamResponse(HTTPMessageDelegate):
+    """Streams the response from the container host to the client, one chunk at a time."""
+
+    def __init__(self: 'UpstreamResponse', handler: 'ContainerProxyHandler') -> None:
+        """Create a new :class:`~container_launcher.server.handlers.proxy.UpstreamResponse`.
+
+        :param handler: The handler to stream the response to
+        :type handler: :class:`~container_launcher.server.handlers.proxy.ContainerProxyHandler`
+        """
+        self._handler = handler
+        self.started = False
+        self.keep_alive = False
+
+    def headers_received(self: 'UpstreamResponse', start_line: ResponseStartLine, headers: HTTPHeaders) -> None:
+        """Send the response status and headers to the client."""
+        if 100 <= start_line.code < 200:
+            return
+        self.started = True
+        delimited = ('Content-Length' in headers or 'chunked' in headers.get('Transfer-Encoding', '').lower()
+                     or start_line.code in (204, 304) or self._handler.request.method == 'HEAD')
+        self.keep_alive = (start_line.version == 'HTTP/1.1' and delimited
+                           and headers.get('Connection', '').lower() != 'close')
+        self._handler.relay_headers(start_line, headers)
+
+    def data_received(self: 'UpstreamResponse', chunk: bytes) -> asyncio.Future:
+        """Send a chunk of the response body to the client, waiting until it has been sent."""
+        self._handler.write(chunk)
+        return self._handler.flush()
+
+
+@stream_request_body
+class ContainerProxyHandler(RequestHandler):
+    """Proxy HTTP requests for ``/containers/<name>/...`` to the container's host.
+
+    Request and response bodies are streamed in both directions, without holding the whole body in memory. Connections
+    to the container hosts are kept alive and reused via the :class:`~container_launcher.server.proxy.UpstreamPool`.
+    """
+
+    SUPPORTED_METHODS = ('GET', 'HEAD', 'POST', 'DELETE', 'PATCH', 'PUT', 'OPTIONS')
+
+    async def prepare(self: 'ContainerProxyHandler') -> None:
+        """Check that the user may access the container and send the request headers to the container host."""
+        container = await authorise(self, self.path_args[0])
+        self._container = container
+        self._host, self._target = upstream_target(container, self.request.path.split('/', 3)[3],
+                                                   self.request.query)
+        self._upstream_headers = forwarded_headers(self)
+        self._body_sent = False
+        self._upstream_error = None
+        await self._open(reuse=True)
+
+    async def _open(self: 'ContainerProxyHandler', reuse: bool) -> None:
+        """Open the upstream connection and send the request headers.
+
+        If the headers cannot be sent on a reused connection, which the host may have closed while it was idle, they
+        are sent on a new connection instead.
+
+        :param reuse: Whether an idle connection may be reused
+        :type reuse: bool
+        """
+        try:
+            self._stream, self._reused = await get_upstream_pool().connect(self._host, reuse=reuse)
+        except (OSError, StreamClosedError, asyncio.TimeoutError) as e:
+            raise HTTPError(502, log_message=f'Connecting to {self._host.netloc} failed: {e}')
+        self._connection = HTTP1Connection(self._stream, True, UPSTREAM_PARAMETERS)
+        try:
+            await self._connection.write_headers(RequestStartLine(self.request.method, self._target, 'HTTP/1.1'),
+                                                 self._upstream_headers.copy())
+        except StreamClosedError as e:
+            if self._reused:
+                await self._open(reuse=False)
+            else:
+                raise HTTPError(502, log_message=f'Sending the request to {self._host.netloc} failed: {e}')
+
+    async def data_received(self: 'ContainerProxyHandler', chunk: bytes) -> None:
+        """Send a chunk of the request body to the container host.
+
+        If the container host has closed the connection, the remaining body is discarded and the error is reported once
+        the whole request has been received.
+        """
+        self._body_sent = True
+        if self._upstream_error is None:
+            try:
+                await self._connection.write(chunk)
+            except StreamClosedError as e:
+                self._upstream_error = e
+
+    async def proxy(self: 'ContainerProxyHandler', *args: list) -> None:
+        """Finish the request to the container host and stream the response to the client.
+
+        A request without a body that fails on a reused connection before any response has been received is retried
+        once on a new connection.
+        """
+        if self._upstream_error is not None:
+            self._stream.close()
+            raise HTTPError(502, log_message=f'Sending the request to {self._host.netloc} failed: '
+                                             f'{self._upstream_error}')
+        while True:
+            response = UpstreamResponse(self)
+            try:
+                self._connection.finish()
+                is_open = await self._connection.read_response(response)
+            except (StreamClosedError, HTTPInputError) as e:
+                self._stream.close()
+                if self._reused and not self._body_sent and not response.started:
+                    await self._open(reuse=False)
+                    continue
+                raise HTTPError(502, log_message=f'Reading the response from {self._host.netloc} failed: {e}')
+            if not response.started:
+                self._stream.close()
+                if self._reused and not self._body_sent:
+                    await self._open(reuse=False)
+                    continue
+                raise HTTPError(502, log_message=f'{self._host.netloc} closed the connection without a response')
+            break
+        if is_open and response.keep_alive:
+            get_upstream_pool().release(self._host, self._stream)
+        else:
+            self._stream.close()
+
+    get = head = post = delete = patch = put = options = proxy
+
+    def relay_headers(self: 'ContainerProxyHandler', start_line: ResponseStartLine, headers: HTTPHeaders) -> None:
+        """Set the status and headers of the response from the container host.
+
+        :param start_line: The response status line
+        :type start_line: :class:`~tornado.httputil.ResponseStartLine`
+        :param headers: The response headers
+        :type headers: :class:`~tornado.httputil.HTTPHeaders`
+        """
+        self.set_status(start_line.code, start_line.reason)
+        self.clear_header('Content-Type')
+        skip = connection_headers(headers)
+        seen = set()
+        for name, value in headers.get_all():
+            if name.lower() in skip:
+                continue
+            if name == 'Location' and value.startswith(self._container['host']):
+                value = proxy_url(self._container, value)
+            if name in seen:
+                self.add_header(name, value)
+            else:
+                seen.add(name)
+                self.set_header(name, value)
+
+    def on_connection_close(self: 'ContainerProxyHandler') -> None:
+        """Close the upstream connection if the client goes away before the response has been sent."""
+        if getattr(self, '_stream', None) is not None:
+            self._stream.close()
+        super().on_connection_close()
+
+    def compute_etag(self: 'ContainerProxyHandler') -> None:
+        """Do not add an ``Etag``, the container host's caching headers are passed on unchanged."""
+        return None
+
+    def check_xsrf_cookie(self: 'ContainerProxyHandler') -> None:
+        """Skip the XSRF check, which is left to the container host."""
+        pass
+
+
+class WebSocketUpgradeMatches(PathMatches):
+    """Matches requests for a path that ask to upgrade the connection to a WebSocket."""
+
+    def match(self: 'WebSocketUpgradeMatches', request: object) -> dict | None:
+        """Match the path, if the request is a WebSocket upgrade request."""
+        if request.headers.get('Upgrade', '').lower() != 'websocket':
+            return None
+        return super().match(request)
+
+
+class ContainerWebSocketProxyHandler(WebSocketHandler):
+    """Proxy WebSocket connections for ``/containers/<name>/...`` to the container's host.
+
+    The connection to the container host is opened before the handshake with the client completes, so that the
+    subprotocol selected by the container host can be passed on. Messages are forwarded one at a time in each
+    direction and each message is only read once the previous message has been sent on.
+    """
+
+    _upstream = None
+
+    async def prepare(self: 'ContainerWebSocketProxyHandler') -> None:
+        """Check that the user may access the container and open the WebSocket connection to the container host."""
+        container = await authorise(self, self.path_args[0])
+        host, target = upstream_target(container, self.request.path.split('/', 3)[3], self.request.query)
+        scheme = 'wss' if host.scheme == 'https' else 'ws'
+        headers = forwarded_headers(self, frozenset(('sec-websocket-key', 'sec-websocket-version',
+                                                     'sec-websocket-extensions', 'sec-websocket-protocol')))
+        subprotocols = [protocol.strip() for value in self.request.headers.get_list('Sec-WebSocket-Protocol')
+                        for protocol in value.split(',') if protocol.strip()]
+        try:
+            self._upstream = await websocket_connect(
+                HTTPRequest(f'{scheme}://{host.netloc}{target}', headers=headers,
+                            connect_timeout=config()['server']['proxy']['connect_timeout']),
+                subprotocols=subprotocols or None,
+                max_message_size=self.max_message_size)
+        except (OSError, HTTPClientError, StreamClosedError) as e:
+            raise HTTPError(502, log_message=f'Connecting to {host.netloc} failed: {e}')
+
+    @property
+    def max_message_size(self: 'ContainerWebSocketProxyHandler') -> int:
+        """Return the maximum size of proxied messages, which is separate from the limit of the API connections."""
+        return config()['server']['proxy']['websocket_max_message_size']
+
+    def select_subprotocol(self: 'ContainerWebSocketProxyHandler', subprotocols: list[str]) -> str | None:
+        """Select the subprotocol that the container host selected."""
+        return self._upstream.selected_subprotocol
+
+    def open(self: 'ContainerWebSocketProxyHandler', *args: list) -> None:
+        """Start forwarding the messages from the container host."""
+        asyncio.ensure_future(self._forward_upstream())
+
+    async def _forward_upstream(self: 'ContainerWebSocketProxyHandler') -> None:
+        """Forward the messages from the container host to the client, until either side closes the connection."""
+        while True:
+            message = await self._upstream.read_message()
+            if message is None:
+                code = self._upstream.close_code
+                self.close(code if code not in RESERVED_CLOSE_CODES else None, self._upstream.close_reason)
+                return
+            try:
+                await self.write_message(message, binary=isinstance(message, bytes))
+            except WebSocketClosedError:
+                return
+
+    async def on_message(self: 'ContainerWebSocketProxyHandler', message: str | bytes) -> None:
+        """Forward a message from the client to the container host."""
+        try:
+            await self._upstream.write_message(message, binary=isinstance(message, bytes))
+        except WebSocketClosedError:
+            self.close()
+
+    def on_close(self: 'ContainerWebSocketProxyHandler') -> None:
+        """Close the connection to the container host."""
+        if self._upstream is not None:
+            code = self.close_code
+            self._upstream.close(code if code not in RESERVED_CLOSE_CODES else None, self.close_reason)
+
+    def on_finish(self: 'ContainerWebSocketProxyHandler') -> None:
+        """Close the connection to the container host if the handshake with the client failed."""
+        if self._upstream is not None and self.ws_connection is None:
+            self._upstream.close()
@@ -2,98 +2,367 @@
 import json
 import logging
 
-from sqlalchemy.exc import NoResultFound
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from tornado.websocket import WebSocketHandler
-from typing import Callable
+from asyncio import Future
+from time import perf_counter
+from tornado.websocket import WebSocketHandler, WebSocketClosedError
 
+from ..connections import get_connection_registry, POLICY_VIOLATION
+from ..container_watcher import get_container_watchers
+from ..culler import get_idle_culler
+from ..jobs import get_job_queue, ContainerJob
+from ..jupyterhub import get_jupyterhub_client
 from ..session import SessionMixin
-from ...models import get_sessionmaker, User
+from ..snapshot import get_snapshot
+from ..user_cache import get_user_cache
+from ...metrics import observe_message
 from ...utils import config
 
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
 
 logger = logging.getLogger(__name__)
 
 
-class ApiHandler(WebSocketHandler, SessionMixin):
-    """Handle all API requests."""
+def add_request_id(reply: dict | str, request_id: int | str | None) -> dict | str:
+    """Add the id of the request to its reply.
+
+    :param reply: The reply, either as a message or as a serialised JSON message
+    :type reply: dict or str
+    :param request_id: The id of the request or ``None`` if the request has no id
+    :type request_id: int or str
+    :return: The reply with the request id
+    :rtype: dict or str
+    """
+    if request_id is None:
+        return reply
+    elif isinstance(reply, str):
+        return f'{{"id": {json.dumps(request_id)}, {reply[1:]}'
+    return dict(reply, id=request_id)
+
+
+class ApiHandler(SessionMixin, WebSocketHandler):
+    """Handle all API requests.
+
+    Each request is a message with a ``type`` and an optional ``id`` that is copied into the reply. A frame can contain
+    a list of requests instead of a single request. These are handled in order and answered by a single frame with
+    the list of replies. Clients that negotiate the ``msgpack`` subprotocol exchange binary MessagePack frames instead
+    of JSON.
+
+    Status pushes are dropped while more than the configured ``max_buffer`` bytes are waiting to be sent to the
+    client, with the latest container states sent once the buffer has drained. A client that sends further requests
+    while its buffer is full is disconnected. The final status of a container job is always sent, as the client has no
+    other way of learning it.
+    """
+
+    # Request type to the name of the method handling it and whether the method requires a logged in user
+    ROUTES = {
+        'request-config': ('request_config', False),
+        'request-user': ('request_user', False),
+        'request-containers': ('request_containers', True),
+        'start-container': ('start_container', True),
+        'stop-container': ('stop_container', True),
+    }
+
+    def select_subprotocol(self: 'ApiHandler', subprotocols: list[str]) -> str | None:
+        """Select ``msgpack`` if the client supports it and MessagePack is installed, JSON otherwise."""
+        if 'msgpack' in subprotocols and msgpack is not None:
+            return 'msgpack'
+        elif 'json' in subprotocols:
+            return 'json'
+        return None
+
+    def get_compression_options(self: 'ApiHandler') -> dict | None:
+        """Enable permessage-deflate, unless disabled in the settings."""
+        if config()['server']['websocket']['compression']:
+            return {'compression_level': config()['server']['websocket']['compression_level']}
+        return None
 
     async def open(self: 'ApiHandler') -> None:
         """Handle opening the connection and initialising the user."""
         logger.debug('Accepting a new API connection')
         self._user = None
+        self._container_states = None
+        self._binary = self.selected_subprotocol == 'msgpack'
+        self._close_after_reply = False
+        self._buffered = 0
+        self._stale_states = None
+        get_connection_registry().add(self)
+
+    @property
+    def buffered(self: 'ApiHandler') -> int:
+        """Return the number of bytes that are waiting to be sent to the client."""
+        return self._buffered
+
+    def on_close(self: 'ApiHandler') -> None:
+        """Stop watching the user's containers and record the user's presence when the connection is closed."""
+        get_connection_registry().remove(self, str(self._user.id) if self._user is not None else None)
+        if self._user is not None:
+            get_idle_culler().disconnected(str(self._user.id))
+        if self._container_states is not None:
+            get_container_watchers().unsubscribe(str(self._user.id), self.update_containers)
+
+    async def on_message(self: 'ApiHandler', data: str | bytes) -> None:
+        """Handle the request or list of requests in a Websocket frame and send the replies.
 
-    async def on_message(self: 'ApiHandler', data: str) -> None:
-        """Run the appropriate action upon receiving a Websocket message."""
+        All requests in the frame use the configuration snapshot that is current when the frame arrives.
+        """
+        self.snapshot = get_snapshot()
+        if self._user is not None:
+            get_idle_culler().active(str(self._user.id))
         try:
-            msg = json.loads(data)
-            if 'type' in msg:
-                if msg['type'] == 'request-config':
-                    self.request_config()
-                elif msg['type'] == 'request-user':
-                    await self.request_user()
-                elif self._user is not None:
-                    if msg['type'] == 'request-containers':
-                        self.request_containers()
+            if self._binary:
+                requests = msgpack.unpackb(data)
             else:
-                logger.debug(f'Invalid message {json.dumps(msg)}')
-        except json.JSONDecodeError as e:
-            logger.error(e)
+                requests = json.loads(data)
+        except (TypeError, ValueError) as e:
+            logger.error(f'Invalid API frame: {e}')
+            return
+        if isinstance(requests, list):
+            replies = []
+            for request in requests:
+                reply = await self.handle_request(request)
+                if reply is not None:
+                    replies.append(reply)
+            if replies:
+                self.send_messages(replies)
+        else:
+            reply = await self.handle_request(requests)
+            if reply is not None:
+                self.send_message(reply)
+        if self._close_after_reply:
+            self.close()
+
+    async def handle_request(self: 'ApiHandler', request: dict) -> dict | str | None:
+        """Dispatch a single request to the method handling its type.
+
+        :param request: The request
+        :type request: dict
+        :return: The reply or ``None`` if there is no reply
+        :rtype: dict or str
+        """
+        if not isinstance(request, dict):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'Invalid request {request}')
+            return None
+        if self._close_after_reply:
+            return None
+        if request.get('type') not in self.ROUTES:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'Invalid request {request}', extra={'request_type': request.get('type')})
+            reply = {'type': 'error', 'message': 'Invalid request'}
+        else:
+            method, requires_user = self.ROUTES[request['type']]
+            if requires_user and self._user is None:
+                reply = {'type': 'error', 'message': 'Not logged in'}
+            else:
+                start = perf_counter()
+                reply = await getattr(self, method)(request)
+                observe_message(request['type'], perf_counter() - start)
+        if reply is None or (isinstance(reply, dict) and reply['type'] == 'error' and 'id' not in request):
+            return None
+        return add_request_id(reply, request.get('id'))
+
+    def encode(self: 'ApiHandler', msg: dict | str | list) -> str | bytes:
+        """Encode a message or list of messages in the negotiated encoding.
+
+        :param msg: The message, the serialised JSON message, or a list of either
+        :type msg: dict or str or list
+        :return: The encoded message
+        :rtype: str or bytes
+        """
+        if self._binary:
+            if isinstance(msg, list):
+                return msgpack.packb([json.loads(part) if isinstance(part, str) else part for part in msg])
+            return msgpack.packb(json.loads(msg) if isinstance(msg, str) else msg)
+        if isinstance(msg, list):
+            return f'[{", ".join(part if isinstance(part, str) else json.dumps(part) for part in msg)}]'
+        return msg if isinstance(msg, str) else json.dumps(msg)
+
+    def send_message(self: 'ApiHandler', msg: dict | str, push: bool = False, final: bool = False) -> bool:
+        """Send a message to the client.
+
+        :param msg: The message or the serialised JSON message
+        :type msg: dict or str
+        :param push: Whether the message is a status push that is dropped if the client is not keeping up
+        :type push: bool
+        :param final: Whether the message is a final status that is sent even if the client is not keeping up
+        :type final: bool
+        :return: Whether the message was sent
+        :rtype: bool
+        """
+        return self.write_frame(self.encode(msg), push, final)
+
+    def send_messages(self: 'ApiHandler', msgs: list[dict | str]) -> bool:
+        """Send a list of messages to the client in a single frame.
+
+        :param msgs: The messages
+        :type msgs: list
+        :return: Whether the messages were sent
+        :rtype: bool
+        """
+        return self.write_frame(self.encode(msgs), False)
 
-    def send_message(self: 'ApiHandler', msg: str) -> None:
-        """Send a message back to the client."""
-        self.write_message(json.dumps(msg))
+    def write_frame(self: 'ApiHandler', data: str | bytes, push: bool, final: bool = False) -> bool:
+        """Write an encoded frame, keeping track of the number of bytes waiting to be sent.
 
-    def request_config(self: 'ApiHandler') -> None:
+        If the buffer is full, pushes are dropped, final statuses are written anyway, and the connection is closed for
+        any other frame. Final statuses cannot fill the buffer without bound, as each job sends only one.
+
+        :param data: The encoded frame
+        :type data: str or bytes
+        :param push: Whether the frame is a status push
+        :type push: bool
+        :param final: Whether the frame is a final status
+        :type final: bool
+        :return: Whether the frame was written
+        :rtype: bool
+        """
+        if self._buffered > get_connection_registry().max_buffer and not final:
+            if not push:
+                logger.warning('Closing a connection that is not reading its messages')
+                self.close(POLICY_VIOLATION, 'Too slow')
+            return False
+        try:
+            future = self.write_message(data, binary=self._binary)
+        except WebSocketClosedError:
+            return False
+        self._buffered = self._buffered + len(data)
+        future.add_done_callback(lambda f: self.on_flushed(f, len(data)))
+        return True
+
+    def on_flushed(self: 'ApiHandler', future: Future, size: int) -> None:
+        """Handle a frame having been sent, sending the container states that were dropped while the buffer was full.
+
+        :param future: The future returned when writing the frame
+        :type future: :class:`~asyncio.Future`
+        :param size: The size of the frame
+        :type size: int
+        """
+        self._buffered = self._buffered - size
+        if not future.cancelled() and future.exception() is not None:
+            return
+        if self._stale_states is not None and self._buffered <= get_connection_registry().max_buffer:
+            states = self._stale_states
+            self._stale_states = None
+            self.update_containers(states)
+
+    async def request_config(self: 'ApiHandler', request: dict) -> str:
         """Handle the request for the current configuration."""
-        self.send_message({
-            'type': 'config',
-            'config': {
-                'title': config()['app']['title'],
-                'vle': config()['app']['vle']
-            }
-        })
+        return self.snapshot.config_message
 
-    async def request_user(self: 'ApiHandler') -> Callable[[], None]:
+    async def request_user(self: 'ApiHandler', request: dict) -> dict:
         """Handle the request for the logged in user.
 
-        Fetch the user from the database if not done yet.
+        Fetch the user from the user cache if not done yet.
         """
         if 'user_id' in self.session:
             if self._user is None:
-                async with get_sessionmaker()() as dbsession:
-                    stmt = select(User).filter(User.id == self.session['user_id']).options(selectinload(User.groups))
-                    result = await dbsession.execute(stmt)
-                    try:
-                        self._user = result.scalar_one()
-                    except NoResultFound:
-                        self.send_message({'type': 'unauthorised'})
-                        self.close()
-            self.send_message({
+                self._user = await get_user_cache().get(self.session['user_id'],
+                                                          self.session.get('user_version', 0))
+                if self._user is None:
+                    self._close_after_reply = True
+                    return {'type': 'unauthorised'}
+                get_connection_registry().assign(self, str(self._user.id))
+                get_idle_culler().connected(str(self._user.id), [
+                    container for container, _ in self.snapshot.container_index.containers(self._user.group_ids)])
+            return {
                 'type': 'user',
                 'user': {
                     'id': str(self._user.id),
-                    'name': self._user.attributes['name'],
+                    'name': self._user.name,
                 }
-            })
+            }
         else:
-            self.send_message({'type': 'logged-out'})
-            self.close()
+            self._close_after_reply = True
+            return {'type': 'logged-out'}
+
+    async def request_containers(self: 'ApiHandler', request: dict) -> str:
+        """Request the currently configured containers with their state in JupyterHub."""
+        index = self.snapshot.container_index
+        containers = [container for container, _ in index.containers(self._user.group_ids)]
+        states = await get_jupyterhub_client().container_states(str(self._user.id), containers)
+        if self._container_states is None:
+            self._container_states = states
+            get_container_watchers().subscribe(str(self._user.id), containers, self.update_containers)
+        else:
+            self._container_states = states
+        return index.containers_message(self._user.group_ids, states)
 
-    def request_containers(self: 'ApiHandler') -> None:
-        """Request the currently configured containers."""
-        containers = []
-        group_ids = set(map(lambda g: g.external_id, self._user.groups))
-        for container_config in config()['app']['containers']:
-            if len(group_ids.intersection(container_config['groups'])) > 0:
-                containers.append({
-                    'name': container_config['name'],
-                    'title': container_config['title'],
-                    'description': container_config['description'],
-                    'state': 'paused',
-                })
-        self.send_message({
-            'type': 'containers',
-            'containers': containers
-        })
+    def update_containers(self: 'ApiHandler', states: dict[str, dict]) -> None:
+        """Send the containers whose state has changed since they were last sent.
+
+        If the update is dropped because the client is not keeping up, the states are sent once it has caught up.
+
+        :param states: The current state of the watched containers
+        :type states: dict[str, dict]
+        """
+        changed = [dict(name=name, **state) for name, state in states.items()
+                   if name in self._container_states and self._container_states[name] != state]
+        if changed and self.ws_connection is not None:
+            if self.send_message({'type': 'containers-update', 'containers': changed}, push=True):
+                for update in changed:
+                    self._container_states[update['name']] = states[update['name']]
+            else:
+                self._stale_states = states
+
+    async def start_container(self: 'ApiHandler', request: dict) -> dict:
+        """Handle the request to start one of the user's containers."""
+        return self.container_action('start', request.get('container'))
+
+    async def stop_container(self: 'ApiHandler', request: dict) -> dict:
+        """Handle the request to stop one of the user's containers."""
+        return self.container_action('stop', request.get('container'))
+
+    def container_action(self: 'ApiHandler', action: str, name: str) -> dict:
+        """Queue a job to start or stop one of the user's containers.
+
+        :param action: Either ``start`` or ``stop``
+        :type action: str
+        :param name: The name of the container
+        :type name: str
+        :return: The current status of the job
+        :rtype: dict
+        """
+        for container, _ in self.snapshot.container_index.containers(self._user.group_ids):
+            if container['name'] == name:
+                job = get_job_queue().submit(str(self._user.id), container, action)
+                if job is None:
+                    return {'type': 'container-job', 'container': name, 'action': action, 'status': 'failed',
+                            'message': 'Too many requests, please try again later'}
+                job.add_listener(self.send_job_status)
+                return self.job_status(job)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Container {name} is not available to user {self._user.id}',
+                         extra={'container': name, 'user_id': self._user.id})
+        return {'type': 'error', 'message': 'Unknown container'}
+
+    def job_status(self: 'ApiHandler', job: ContainerJob) -> dict:
+        """Get the status message for a container job.
+
+        :param job: The job to get the status message for
+        :type job: :class:`~container_launcher.server.jobs.ContainerJob`
+        :return: The status message
+        :rtype: dict
+        """
+        msg = {'type': 'container-job', 'container': job.container['name'], 'action': job.action,
+               'status': job.status}
+        if job.message is not None:
+            msg['message'] = job.message
+        return msg
+
+    def send_job_status(self: 'ApiHandler', job: ContainerJob) -> None:
+        """Send the status of a container job.
+
+        Intermediate statuses are dropped if the client is not keeping up, but the final status is always sent.
+
+        :param job: The job to send the status for
+        :type job: :class:`~container_launcher.server.jobs.ContainerJob`
+        """
+        if self.ws_connection is not None:
+            if job.status in ('queued', 'running'):
+                self.send_message(self.job_status(job), push=True)
+            else:
+                self.send_message(self.job_status(job), final=True)
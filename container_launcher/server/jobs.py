@@ -0,0 +1,233 @@
+"""Queue for starting and stopping containers with bounded concurrency."""
+import asyncio
+import logging
+
+from time import monotonic
+from typing import Callable
+
+from .container_watcher import get_container_watchers
+from .jupyterhub import get_jupyterhub_client, server_state, JupyterHubError
+from ..metrics import count_job
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+queue = None
+
+# Number of seconds between two checks whether a started or stopped container has reached its target state
+COMPLETION_POLL_INTERVAL = 1
+# Number of seconds to wait before retrying a request that the hub rejected as too many requests
+RETRY_DELAY = 5
+# The state that each action waits for
+TARGET_STATES = {'start': 'running', 'stop': 'paused'}
+ACTION_PARTICIPLES = {'start': 'started', 'stop': 'stopped'}
+
+
+class ContainerJob(object):
+    """A single request to start or stop a user's container.
+
+    The job notifies its listeners when it is queued, starts running, completes, or fails.
+    """
+
+    def __init__(self: 'ContainerJob', user_name: str, container: dict, action: str) -> None:
+        """Create a new :class:`~container_launcher.server.jobs.ContainerJob`.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param container: The container to start or stop
+        :type container: dict
+        :param action: Either ``start`` or ``stop``
+        :type action: str
+        """
+        self.user_name = user_name
+        self.container = container
+        self.action = action
+        self.status = 'queued'
+        self.queued = monotonic()
+        self.started = None
+        self.message = None
+        self._listeners = []
+
+    def add_listener(self: 'ContainerJob', listener: Callable[['ContainerJob'], None]) -> None:
+        """Add a listener that is called whenever the job's status changes.
+
+        :param listener: The listener to add
+        :type listener: Callable[[ContainerJob], None]
+        """
+        self._listeners.append(listener)
+
+    def set_status(self: 'ContainerJob', status: str, message: str | None = None) -> None:
+        """Set the job's status and notify all listeners.
+
+        :param status: The new status: ``queued``, ``running``, ``completed``, or ``failed``
+        :type status: str
+        :param message: An optional message describing the status
+        :type message: str
+        """
+        self.status = status
+        self.message = message
+        for listener in self._listeners:
+            try:
+                listener(self)
+            except Exception as e:
+                logger.debug(f'Notifying a job listener failed: {e}')
+
+
+class ContainerJobQueue(object):
+    """Queue of container start and stop jobs.
+
+    At most ``max_concurrent`` jobs run at the same time and at most ``max_per_host`` of those against the same hub.
+    A job holds its slot until the container has reached its target state, so that the number of concurrent spawns on
+    each hub is bounded. Requests for a container that already has a queued or running job are merged with that job.
+    """
+
+    def __init__(self: 'ContainerJobQueue', max_concurrent: int, max_per_host: int, max_queued: int,
+                 timeout: int) -> None:
+        """Create a new :class:`~container_launcher.server.jobs.ContainerJobQueue`.
+
+        :param max_concurrent: The maximum number of jobs that run at the same time
+        :type max_concurrent: int
+        :param max_per_host: The maximum number of jobs that run at the same time against the same hub
+        :type max_per_host: int
+        :param max_queued: The maximum number of jobs that are queued or running
+        :type max_queued: int
+        :param timeout: The number of seconds after which a running job fails
+        :type timeout: int
+        """
+        self._max_per_host = max_per_host
+        self._max_queued = max_queued
+        self._timeout = timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._host_slots = {}
+        self._jobs = {}
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def length(self: 'ContainerJobQueue') -> int:
+        """Return the number of jobs that are queued or running."""
+        return len(self._jobs)
+
+    def submit(self: 'ContainerJobQueue', user_name: str, container: dict, action: str) -> ContainerJob | None:
+        """Submit a job to start or stop a container.
+
+        If a job for the same container is already queued or running, that job is returned instead. A queued job for
+        the opposite action is changed to the new action.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param container: The container to start or stop
+        :type container: dict
+        :param action: Either ``start`` or ``stop``
+        :type action: str
+        :return: The job or ``None`` if the queue is full
+        :rtype: :class:`~container_launcher.server.jobs.ContainerJob`
+        """
+        key = (container['host'], user_name, container['name'])
+        job = self._jobs.get(key)
+        if job is not None:
+            if job.action != action and job.status == 'queued':
+                job.action = action
+                job.set_status('queued')
+            return job
+        if len(self._jobs) >= self._max_queued:
+            logger.warning('Container job queue is full')
+            return None
+        job = ContainerJob(user_name, container, action)
+        self._jobs[key] = job
+        asyncio.ensure_future(self._run(key, job))
+        return job
+
+    async def _run(self: 'ContainerJobQueue', key: tuple[str, str, str], job: ContainerJob) -> None:
+        """Run a job once a slot for its hub and a global slot are available.
+
+        :param key: The key of the job
+        :type key: tuple[str, str, str]
+        :param job: The job to run
+        :type job: :class:`~container_launcher.server.jobs.ContainerJob`
+        """
+        host = job.container['host']
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self._max_per_host)
+        try:
+            async with self._host_slots[host]:
+                async with self._slots:
+                    job.started = monotonic()
+                    job.set_status('running')
+                    try:
+                        await asyncio.wait_for(self._execute(job), self._timeout)
+                        self.completed = self.completed + 1
+                        job.set_status('completed')
+                    except asyncio.TimeoutError:
+                        self.failed = self.failed + 1
+                        job.set_status('failed', f'The container did not {job.action} in time')
+                    except JupyterHubError as e:
+                        logger.error(f'Failed to {job.action} {job.container["name"]} for {job.user_name}: {e}')
+                        self.failed = self.failed + 1
+                        job.set_status('failed', f'The container could not be {ACTION_PARTICIPLES[job.action]}')
+                    except Exception:
+                        logger.exception(f'Failed to {job.action} {job.container["name"]} for {job.user_name}')
+                        self.failed = self.failed + 1
+                        job.set_status('failed', f'The container could not be {ACTION_PARTICIPLES[job.action]}')
+        finally:
+            del self._jobs[key]
+            if job.status in ('completed', 'failed'):
+                count_job(job.action, job.status)
+            get_container_watchers().refresh(job.user_name)
+
+    async def _execute(self: 'ContainerJobQueue', job: ContainerJob) -> None:
+        """Send the job's request to the hub and wait until the container has reached its target state.
+
+        Containers that are still starting are only stopped once they have started. If a started container is stopped
+        again before it is running, the spawn has failed and the job fails straight away instead of holding its slots
+        until the timeout.
+
+        :param job: The job to execute
+        :type job: :class:`~container_launcher.server.jobs.ContainerJob`
+        :raises JupyterHubError: If the request to the hub fails or the container failed to start
+        """
+        client = get_jupyterhub_client()
+        host = job.container['host']
+        if job.action == 'stop':
+            while True:
+                servers = await client.user_servers(host, job.user_name, max_age=0)
+                if server_state(host, servers.get(job.container['name']))['state'] != 'starting':
+                    break
+                await asyncio.sleep(COMPLETION_POLL_INTERVAL)
+        while True:
+            try:
+                if job.action == 'start':
+                    await client.start_server(host, job.user_name, job.container['name'])
+                else:
+                    await client.stop_server(host, job.user_name, job.container['name'])
+                break
+            except JupyterHubError as e:
+                if e.code != 429:
+                    raise
+                await asyncio.sleep(RETRY_DELAY)
+        get_container_watchers().refresh(job.user_name)
+        while True:
+            servers = await client.user_servers(host, job.user_name, max_age=0)
+            state = server_state(host, servers.get(job.container['name']))
+            if state['state'] == TARGET_STATES[job.action]:
+                return
+            if job.action == 'start' and state['state'] == 'paused':
+                raise JupyterHubError(f'The server {job.container["name"]} stopped before it was ready')
+            await asyncio.sleep(COMPLETION_POLL_INTERVAL)
+
+
+def get_job_queue() -> ContainerJobQueue:
+    """Get the container job queue.
+
+    This returns a singleton instance.
+
+    :return: The container job queue as configured by the settings.
+    :rtype: :class:`~container_launcher.server.jobs.ContainerJobQueue`
+    """
+    global queue
+    if queue is None:
+        logger.debug('Creating container job queue')
+        settings = config()['jupyterhub']['jobs']
+        queue = ContainerJobQueue(settings['max_concurrent'], settings['max_per_host'], settings['max_queued'],
+                                  settings['timeout'])
+    return queue
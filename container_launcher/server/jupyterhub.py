@@ -0,0 +1,327 @@
+"""Asynchronous client for the JupyterHub REST API."""
+import asyncio
+import json
+import logging
+
+from time import monotonic, perf_counter
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError, HTTPRequest
+from urllib.parse import quote, urljoin
+
+from .proxy import proxy_url
+from ..metrics import observe_hub_request
+from ..utils import config
+
+try:
+    from tornado.curl_httpclient import CurlAsyncHTTPClient
+except ImportError:  # pragma: no cover
+    CurlAsyncHTTPClient = None
+
+
+logger = logging.getLogger(__name__)
+client = None
+
+# Maximum number of users for which the servers are cached
+STATE_CACHE_SIZE = 10000
+
+
+class JupyterHubError(Exception):
+    """Exception raised when the JupyterHub API cannot be accessed."""
+
+    def __init__(self: 'JupyterHubError', message: str, code: int | None = None) -> None:
+        """Create a new :class:`~container_launcher.server.jupyterhub.JupyterHubError`.
+
+        :param message: The error message
+        :type message: str
+        :param code: The HTTP status code returned by the hub, if any
+        :type code: int
+        """
+        super().__init__(message)
+        self.code = code
+
+
+class JupyterHubClient(object):
+    """Client for the JupyterHub REST API that is shared by all requests in a process.
+
+    All requests go through a single HTTP client with a bounded number of connections, which keeps connections alive
+    between requests if ``pycurl`` is installed. The servers of a user are fetched with a single request per hub,
+    concurrent requests for the same user share that request, and the result is cached for ``state_ttl`` seconds.
+    """
+
+    def __init__(self: 'JupyterHubClient', api_token: str, max_connections: int, request_timeout: int,
+                 state_ttl: int) -> None:
+        """Create a new :class:`~container_launcher.server.jupyterhub.JupyterHubClient`.
+
+        :param api_token: The token used to authenticate against the JupyterHub API
+        :type api_token: str
+        :param max_connections: The maximum number of concurrent connections to the hubs
+        :type max_connections: int
+        :param request_timeout: The number of seconds after which a request to a hub fails
+        :type request_timeout: int
+        :param state_ttl: The number of seconds to cache the servers of a user for
+        :type state_ttl: int
+        """
+        self._api_token = api_token
+        self._max_connections = max_connections
+        self._request_timeout = request_timeout
+        self._state_ttl = state_ttl
+        self._servers = {}
+        self._inflight = {}
+        self._generation = 0
+        self._http_client = None
+
+    async def fetch(self: 'JupyterHubClient', host: str, path: str, method: str = 'GET',
+                    body: dict | None = None) -> dict | None:
+        """Send a request to the JupyterHub API.
+
+        :param host: The base URL of the hub
+        :type host: str
+        :param path: The API path, relative to ``hub/api/``
+        :type path: str
+        :param method: The HTTP method to use
+        :type method: str
+        :param body: The JSON body to send
+        :type body: dict
+        :return: The decoded JSON response or ``None`` if the resource does not exist or the response is empty
+        :rtype: dict
+        """
+        if self._http_client is None:
+            if CurlAsyncHTTPClient is not None:
+                self._http_client = CurlAsyncHTTPClient(force_instance=True, max_clients=self._max_connections)
+            else:
+                logger.debug('pycurl is not installed, connections to JupyterHub will not be kept alive')
+                self._http_client = AsyncHTTPClient(force_instance=True, max_clients=self._max_connections)
+        url = hub_url(host, f'hub/api/{path}')
+        if body is not None:
+            body = json.dumps(body)
+        elif method in ('POST', 'PUT', 'PATCH'):
+            body = ''
+        request = HTTPRequest(url,
+                              method=method,
+                              headers={'Authorization': f'token {self._api_token}',
+                                       'Content-Type': 'application/json'},
+                              body=body,
+                              request_timeout=self._request_timeout)
+        start = perf_counter()
+        try:
+            response = await self._http_client.fetch(request)
+        except HTTPClientError as e:
+            if e.code == 404:
+                return None
+            raise JupyterHubError(f'Request to {url} failed: {e}', e.code)
+        except OSError as e:
+            raise JupyterHubError(f'Request to {url} failed: {e}')
+        finally:
+            observe_hub_request(method, perf_counter() - start)
+        if not response.body:
+            return None
+        try:
+            return json.loads(response.body)
+        except ValueError:
+            raise JupyterHubError(f'Invalid response from {url}. Must be JSON')
+
+    async def user_servers(self: 'JupyterHubClient', host: str, user_name: str,
+                           max_age: int | None = None) -> dict[str, dict]:
+        """Get the default and named servers of a user.
+
+        :param host: The base URL of the hub
+        :type host: str
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param max_age: The maximum age in seconds of cached servers, if lower than the configured ``state_ttl``
+        :type max_age: int
+        :return: The server models keyed by server name, where the default server has the name ``''``
+        :rtype: dict[str, dict]
+        """
+        key = (host, user_name)
+        entry = self._servers.get(key)
+        if entry is not None:
+            if monotonic() - entry[0] < min(self._state_ttl, max_age if max_age is not None else self._state_ttl):
+                return entry[1]
+            del self._servers[key]
+        if key not in self._inflight:
+            def done(future: asyncio.Future) -> None:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+                if not future.cancelled():
+                    # Mark the exception as retrieved, in case all requests waiting for it have been cancelled
+                    future.exception()
+
+            future = asyncio.ensure_future(self._load_servers(host, user_name, self._generation))
+            future.add_done_callback(done)
+            self._inflight[key] = future
+        return await asyncio.shield(self._inflight[key])
+
+    async def _load_servers(self: 'JupyterHubClient', host: str, user_name: str, generation: int) -> dict[str, dict]:
+        """Load the servers of a user from the hub and cache them.
+
+        The servers are only cached if no invalidation happened while they were loaded.
+
+        :param host: The base URL of the hub
+        :type host: str
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param generation: The invalidation generation at the time the load was started
+        :type generation: int
+        :return: The server models keyed by server name
+        :rtype: dict[str, dict]
+        """
+        user = await self.fetch(host, f'users/{quote(user_name, safe="")}')
+        servers = {}
+        if user is not None:
+            servers = user.get('servers') or {}
+        if generation == self._generation:
+            if len(self._servers) >= STATE_CACHE_SIZE:
+                self._servers.clear()
+            self._servers[(host, user_name)] = (monotonic(), servers)
+        return servers
+
+    def invalidate(self: 'JupyterHubClient', host: str, user_name: str) -> None:
+        """Remove the cached servers of a user, so that the next request fetches them from the hub.
+
+        Requests that are already in progress are not shared with later requests and their result is not cached.
+
+        :param host: The base URL of the hub
+        :type host: str
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        """
+        self._servers.pop((host, user_name), None)
+        self._inflight.pop((host, user_name), None)
+        self._generation = self._generation + 1
+
+    async def start_server(self: 'JupyterHubClient', host: str, user_name: str, server_name: str) -> None:
+        """Start a named server, creating the user in the hub if needed.
+
+        Nothing is done if the server is already running or starting.
+
+        :param host: The base URL of the hub
+        :type host: str
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param server_name: The name of the server to start
+        :type server_name: str
+        """
+        user_path = f'users/{quote(user_name, safe="")}'
+        user = await self.fetch(host, user_path)
+        if user is None:
+            try:
+                await self.fetch(host, user_path, method='POST')
+            except JupyterHubError as e:
+                if e.code != 409:
+                    raise
+        else:
+            server = (user.get('servers') or {}).get(server_name)
+            if server is not None and (server.get('ready') or server.get('pending')):
+                return
+        try:
+            await self.fetch(host, f'{user_path}/servers/{quote(server_name, safe="")}', method='POST')
+        finally:
+            self.invalidate(host, user_name)
+
+    async def stop_server(self: 'JupyterHubClient', host: str, user_name: str, server_name: str) -> None:
+        """Stop a named server.
+
+        :param host: The base URL of the hub
+        :type host: str
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param server_name: The name of the server to stop
+        :type server_name: str
+        """
+        try:
+            await self.fetch(host, f'users/{quote(user_name, safe="")}/servers/{quote(server_name, safe="")}',
+                             method='DELETE')
+        finally:
+            self.invalidate(host, user_name)
+
+    async def container_states(self: 'JupyterHubClient', user_name: str, containers: list[dict],
+                               max_age: int | None = None) -> dict[str, dict]:
+        """Get the state of each container for a user.
+
+        Each container is the named server with the container's name on the container's ``host``. The servers on each
+        hub are fetched concurrently.
+
+        :param user_name: The name of the user in the hub
+        :type user_name: str
+        :param containers: The containers to get the state for
+        :type containers: list[dict]
+        :param max_age: The maximum age in seconds of cached servers, if lower than the configured ``state_ttl``
+        :type max_age: int
+        :return: The state of each container keyed by container name, with the ``url`` added for running containers. If
+                 the proxy is enabled, the ``url`` points to the proxy.
+        :rtype: dict[str, dict]
+        """
+        hosts = list(dict.fromkeys(container['host'] for container in containers))
+        results = await asyncio.gather(*[self.user_servers(host, user_name, max_age) for host in hosts],
+                                       return_exceptions=True)
+        servers = {}
+        for host, result in zip(hosts, results):
+            if isinstance(result, Exception):
+                logger.warning(f'Fetching the servers of {user_name} from {host} failed: {result}')
+                result = None
+            servers[host] = result
+        states = {}
+        for container in containers:
+            host_servers = servers[container['host']]
+            if host_servers is None:
+                states[container['name']] = {'state': 'unknown'}
+            else:
+                state = server_state(container['host'], host_servers.get(container['name']))
+                if 'url' in state and config()['server']['proxy']['enabled']:
+                    state['url'] = proxy_url(container, state['url'])
+                states[container['name']] = state
+        return states
+
+
+def hub_url(host: str, path: str) -> str:
+    """Join a path to the base URL of a hub.
+
+    The base URL is treated as a directory, even if it does not end with a ``/``, so that the last segment of a hub
+    that is served below a path, such as ``http://proxy/jhub``, is kept.
+
+    :param host: The base URL of the hub
+    :type host: str
+    :param path: The path to join, relative to the base URL or absolute
+    :type path: str
+    :return: The joined URL
+    :rtype: str
+    """
+    return urljoin(host if host.endswith('/') else f'{host}/', path)
+
+
+def server_state(host: str, server: dict | None) -> dict:
+    """Map a JupyterHub server model onto the container state sent to the client.
+
+    :param host: The base URL of the hub
+    :type host: str
+    :param server: The server model or ``None`` if the server does not exist
+    :type server: dict
+    :return: The container state, with the ``url`` for running containers
+    :rtype: dict
+    """
+    if server is None:
+        return {'state': 'paused'}
+    elif server.get('pending') == 'spawn':
+        return {'state': 'starting'}
+    elif server.get('pending') == 'stop':
+        return {'state': 'stopping'}
+    elif server.get('ready'):
+        return {'state': 'running', 'url': hub_url(host, server.get('url', ''))}
+    return {'state': 'paused'}
+
+
+def get_jupyterhub_client() -> JupyterHubClient:
+    """Get the JupyterHub client.
+
+    This returns a singleton instance.
+
+    :return: The JupyterHub client as configured by the settings.
+    :rtype: :class:`~container_launcher.server.jupyterhub.JupyterHubClient`
+    """
+    global client
+    if client is None:
+        logger.debug('Creating JupyterHub client')
+        settings = config()['jupyterhub']
+        client = JupyterHubClient(settings['api_token'], settings['max_connections'], settings['request_timeout'],
+                                  settings['state_ttl'])
+    return client
@@ -0,0 +1,149 @@
+"""Per-process LTI tool configuration and platform key set cache."""
+import asyncio
+import json
+import logging
+
+from pylti1p3.exception import LtiException
+from pylti1p3.tool_config import ToolConfDict
+from time import monotonic
+from tornado.httpclient import AsyncHTTPClient, HTTPClientError
+
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of seconds between two key set refreshes triggered by an unknown key id. This stops a stream of
+# launches with a bogus key id from turning into a stream of requests to the platform.
+MIN_REFRESH_INTERVAL = 30
+
+
+class KeySetCache(object):
+    """Cache for the platforms' JSON Web Key Sets, keyed by issuer.
+
+    Key sets are refreshed when they are older than the issuer's ``key_set_ttl`` or when a launch uses a key id that
+    is not in the cached key set. Concurrent fetches for the same issuer share a single request. Key sets are fetched
+    with the cache's own HTTP client, so that a fetch that launches wait for is not queued behind other requests.
+    """
+
+    def __init__(self: 'KeySetCache', urls: dict[str, str], ttls: dict[str, int]) -> None:
+        """Create a new :class:`~container_launcher.server.lti_config.KeySetCache`.
+
+        :param urls: The key set URL for each issuer
+        :type urls: dict[str, str]
+        :param ttls: The number of seconds to cache the key set for each issuer
+        :type ttls: dict[str, int]
+        """
+        self._urls = urls
+        self._ttls = ttls
+        self._key_sets = {}
+        self._fetched = {}
+        self._inflight = {}
+        self._http_client = None
+
+    def inherit(self: 'KeySetCache', previous: 'KeySetCache') -> None:
+        """Keep the key sets cached by a previous cache for all issuers whose key set URL has not changed.
+
+        :param previous: The previous cache
+        :type previous: :class:`~container_launcher.server.lti_config.KeySetCache`
+        """
+        for iss, key_set in previous._key_sets.items():
+            if self._urls.get(iss) == previous._urls.get(iss):
+                self._key_sets[iss] = key_set
+                self._fetched[iss] = previous._fetched[iss]
+
+    def get(self: 'KeySetCache', iss: str) -> dict | None:
+        """Get the cached key set for the issuer, without any network access.
+
+        :param iss: The issuer to get the key set for
+        :type iss: str
+        :return: The key set or ``None`` if it has not been fetched yet
+        :rtype: dict
+        """
+        return self._key_sets.get(iss)
+
+    def _needs_fetch(self: 'KeySetCache', iss: str, kid: str | None) -> bool:
+        """Determine whether the key set for the issuer needs to be fetched.
+
+        :param iss: The issuer to check
+        :type iss: str
+        :param kid: The key id that needs to be available
+        :type kid: str
+        :return: Whether the key set must be fetched
+        :rtype: bool
+        """
+        key_set = self._key_sets.get(iss)
+        if key_set is None:
+            return True
+        age = monotonic() - self._fetched[iss]
+        if age > self._ttls.get(iss, 0):
+            return True
+        if kid is not None and age > MIN_REFRESH_INTERVAL:
+            return not any(key.get('kid') == kid for key in key_set.get('keys', []))
+        return False
+
+    async def ensure(self: 'KeySetCache', iss: str, kid: str | None = None) -> None:
+        """Ensure that an up-to-date key set for the issuer is cached.
+
+        If a previously fetched key set exists and the refresh fails, the previous key set remains in use.
+
+        :param iss: The issuer to ensure the key set for
+        :type iss: str
+        :param kid: The key id that the key set should contain
+        :type kid: str
+        """
+        if iss not in self._urls or not self._needs_fetch(iss, kid):
+            return
+        if iss not in self._inflight:
+            self._inflight[iss] = asyncio.ensure_future(self._fetch(iss))
+            self._inflight[iss].add_done_callback(lambda _: self._inflight.pop(iss, None))
+        try:
+            await asyncio.shield(self._inflight[iss])
+        except LtiException:
+            if iss not in self._key_sets:
+                raise
+            logger.warning(f'Refreshing the key set for {iss} failed, using the cached key set')
+
+    async def _fetch(self: 'KeySetCache', iss: str) -> None:
+        """Fetch the key set for the issuer.
+
+        :param iss: The issuer to fetch the key set for
+        :type iss: str
+        """
+        url = self._urls[iss]
+        logger.debug(f'Fetching the key set for {iss} from {url}')
+        if self._http_client is None:
+            self._http_client = AsyncHTTPClient(force_instance=True)
+        try:
+            response = await self._http_client.fetch(url)
+            key_set = json.loads(response.body)
+        except (HTTPClientError, OSError) as e:
+            raise LtiException(f'Error during fetch URL {url}: {e}')
+        except ValueError:
+            raise LtiException(f'Invalid response from {url}. Must be JSON')
+        if not isinstance(key_set, dict) or not isinstance(key_set.get('keys'), list):
+            raise LtiException(f'Invalid response from {url}. Must be a JSON Web Key Set')
+        self._key_sets[iss] = key_set
+        self._fetched[iss] = monotonic()
+
+
+class ToolRegistry(object):
+    """The parsed LTI tool configuration, with the tool keys loaded and the platform key sets cached."""
+
+    def __init__(self: 'ToolRegistry', platforms: list[dict], previous: 'ToolRegistry | None' = None) -> None:
+        """Create a new :class:`~container_launcher.server.lti_config.ToolRegistry`.
+
+        :param platforms: The configured LTI platforms
+        :type platforms: list[dict]
+        :param previous: The registry that this registry replaces, whose cached key sets are kept
+        :type previous: :class:`~container_launcher.server.lti_config.ToolRegistry`
+        """
+        platforms = dict([(entry['iss'], entry) for entry in platforms])
+        self.tool_config = ToolConfDict(platforms)
+        for iss, entry in platforms.items():
+            with open(entry['private_key_file']) as in_f:
+                self.tool_config.set_private_key(iss, in_f.read())
+            with open(entry['public_key_file']) as in_f:
+                self.tool_config.set_public_key(iss, in_f.read())
+        self.key_sets = KeySetCache(dict([(iss, entry['key_set_url']) for iss, entry in platforms.items()]),
+                                    dict([(iss, entry['key_set_ttl']) for iss, entry in platforms.items()]))
+        if previous is not None:
+            self.key_sets.inherit(previous.key_sets)
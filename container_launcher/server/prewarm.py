@@ -0,0 +1,247 @@
+"""Scheduler that starts containers for group members ahead of their use."""
+import asyncio
+import logging
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.future import select
+
+from .jobs import get_job_queue
+from .jupyterhub import get_jupyterhub_client, server_state
+from .snapshot import get_snapshot
+from ..models import get_sessionmaker, Group
+from ..models.users_groups import users_groups
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+scheduler = None
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+def parse_time(value: str) -> tuple[int, int]:
+    """Parse a ``HH:MM`` time.
+
+    :param value: The time to parse
+    :type value: str
+    :return: The hour and minute
+    :rtype: tuple[int, int]
+    """
+    hour, minute = value.split(':')
+    return int(hour), int(minute)
+
+
+def prewarm_size(container: dict, now: datetime, lead_time: int) -> int:
+    """Get the number of containers that should be running for a container configuration at a given time.
+
+    This is the container's base ``size`` or, if larger, the ``size`` of any schedule entry that is active at that
+    time. A schedule entry becomes active ``lead_time`` seconds before its ``start`` time.
+
+    :param container: The container configuration
+    :type container: dict
+    :param now: The local time to get the size for
+    :type now: datetime
+    :param lead_time: The number of seconds before the start of a schedule entry that it becomes active
+    :type lead_time: int
+    :return: The number of containers to keep running
+    :rtype: int
+    """
+    size = container['prewarm']['size']
+    for entry in container['prewarm']['schedule']:
+        for day_offset in (0, -1):
+            day = now.date() + timedelta(days=day_offset)
+            if WEEKDAYS[day.weekday()] not in entry['days']:
+                continue
+            start_hour, start_minute = parse_time(entry['start'])
+            end_hour, end_minute = parse_time(entry['end'])
+            start = datetime.combine(day, datetime.min.time()).replace(hour=start_hour, minute=start_minute)
+            end = datetime.combine(day, datetime.min.time()).replace(hour=end_hour, minute=end_minute)
+            if end <= start:
+                end = end + timedelta(days=1)
+            if start - timedelta(seconds=lead_time) <= now < end:
+                size = max(size, entry['size'])
+    return size
+
+
+class PrewarmScheduler(object):
+    """Scheduler that keeps containers running for the members of each container's groups.
+
+    Every ``interval`` seconds, for each container with a prewarm size greater than zero, containers are started for
+    members of the container's groups until that many of the prewarmed containers are running or starting. The
+    members are taken in turn, continuing after the last member considered in the previous run, and members whose
+    container is already running are skipped. Each member's container is prewarmed at most once while the size stays
+    above zero, so that containers stopped by the idle culler are not restarted. When the size drops to zero,
+    prewarmed containers on which the hub has seen no activity since they became ready are stopped.
+
+    JupyterHub cannot move a running server from one user to another, so instead of a shared pool of anonymous servers
+    the servers are started for the users that are expected to use them.
+
+    The containers are read from the current configuration snapshot on every run, so that changes to the prewarm
+    settings take effect when the configuration is reloaded.
+    """
+
+    def __init__(self: 'PrewarmScheduler', interval: int, lead_time: int) -> None:
+        """Create a new :class:`~container_launcher.server.prewarm.PrewarmScheduler`.
+
+        :param interval: The number of seconds between two runs
+        :type interval: int
+        :param lead_time: The number of seconds before the start of a scheduled session that containers are started
+        :type lead_time: int
+        """
+        self._interval = interval
+        self._lead_time = lead_time
+        self._prewarmed = {}
+        self._cursors = {}
+        self._task = None
+
+    def start(self: 'PrewarmScheduler') -> None:
+        """Start the scheduler."""
+        if self._task is None:
+            logger.debug('Starting the prewarm scheduler')
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self: 'PrewarmScheduler') -> None:
+        """Periodically start and stop the prewarmed containers."""
+        while True:
+            now = datetime.now()
+            containers = get_snapshot().config['app']['containers']
+            for container in containers:
+                if container['name'] not in self._prewarmed and \
+                        container['prewarm']['size'] == 0 and not container['prewarm']['schedule']:
+                    continue
+                try:
+                    await self._prewarm(container, prewarm_size(container, now, self._lead_time))
+                except Exception as e:
+                    logger.warning(f'Prewarming {container["name"]} failed: {e}')
+            await asyncio.sleep(self._interval)
+
+    async def _prewarm(self: 'PrewarmScheduler', container: dict, size: int) -> None:
+        """Start or stop the containers of one container configuration to match the prewarm size.
+
+        :param container: The container configuration
+        :type container: dict
+        :param size: The number of containers that should be running
+        :type size: int
+        """
+        client = get_jupyterhub_client()
+        prewarmed = self._prewarmed.setdefault(container['name'], {})
+        servers = await self._servers(container, list(prewarmed))
+        if size == 0:
+            for user_name, ready in list(prewarmed.items()):
+                server = servers[user_name]
+                if ready is None or (server is not None and not used_since(server, ready)):
+                    logger.debug(f'Stopping unused prewarmed {container["name"]} for {user_name}')
+                    job = get_job_queue().submit(user_name, container, 'stop')
+                    if job is None or job.action != 'stop':
+                        # The queue is full or the container is still being started, so try again in the next run
+                        continue
+                del prewarmed[user_name]
+            self._cursors.pop(container['name'], None)
+            return
+        running = [user_name for user_name, server in servers.items()
+                   if server_state(container['host'], server)['state'] in ('running', 'starting')]
+        if len(running) >= size:
+            return
+        members = await self._members(container, size, self._cursors.get(container['name']))
+        user_names = [user_name for user_name in members if user_name not in prewarmed]
+        states = dict(zip(user_names, await asyncio.gather(*[client.container_states(user_name, [container])
+                                                             for user_name in user_names])))
+        for user_name in members:
+            if len(running) >= size:
+                break
+            self._cursors[container['name']] = int(user_name)
+            if user_name in states and states[user_name][container['name']]['state'] == 'paused':
+                logger.debug(f'Prewarming {container["name"]} for {user_name}')
+                if get_job_queue().submit(user_name, container, 'start') is not None:
+                    prewarmed[user_name] = None
+                    running.append(user_name)
+
+    async def _servers(self: 'PrewarmScheduler', container: dict, user_names: list[str]) -> dict[str, dict | None]:
+        """Get the prewarmed servers and record the time at which each was first seen ready.
+
+        JupyterHub updates a server's last activity when it spawns the server and when it adds the server to its
+        proxy, so the server only counts as used if the hub has seen activity after the scheduler first saw it ready.
+
+        :param container: The container configuration
+        :type container: dict
+        :param user_names: The hub user names of the prewarmed containers
+        :type user_names: list[str]
+        :return: The server model of each user, or ``None`` if the user has no server for the container
+        :rtype: dict[str, dict | None]
+        """
+        client = get_jupyterhub_client()
+        prewarmed = self._prewarmed[container['name']]
+        results = await asyncio.gather(*[client.user_servers(container['host'], user_name, max_age=0)
+                                        for user_name in user_names])
+        now = datetime.now(timezone.utc)
+        servers = {}
+        for user_name, user_servers in zip(user_names, results):
+            servers[user_name] = user_servers.get(container['name'])
+            if prewarmed[user_name] is None and servers[user_name] is not None and servers[user_name].get('ready'):
+                prewarmed[user_name] = now
+        return servers
+
+    async def _members(self: 'PrewarmScheduler', container: dict, limit: int, after: int | None) -> list[str]:
+        """Get the hub user names of members of the container's groups.
+
+        The members are returned in the order of their ids, starting after the given id and wrapping around to the
+        lowest id, so that successive runs move on to members that have not been considered yet.
+
+        :param container: The container configuration
+        :type container: dict
+        :param limit: The maximum number of members to return
+        :type limit: int
+        :param after: The id of the last member that was considered in the previous run
+        :type after: int
+        :return: The hub user names
+        :rtype: list[str]
+        """
+        async with get_sessionmaker()() as dbsession:
+            stmt = select(users_groups.c.user_id).join(Group, Group.id == users_groups.c.group_id).filter(
+                Group.external_id.in_(container['groups'])).distinct().order_by(users_groups.c.user_id)
+            if after is None:
+                user_ids = list((await dbsession.execute(stmt.limit(limit))).scalars())
+            else:
+                user_ids = list((await dbsession.execute(
+                    stmt.filter(users_groups.c.user_id > after).limit(limit))).scalars())
+                if len(user_ids) < limit:
+                    user_ids.extend((await dbsession.execute(
+                        stmt.filter(users_groups.c.user_id <= after).limit(limit - len(user_ids)))).scalars())
+            return [str(user_id) for user_id in user_ids]
+
+
+def used_since(server: dict, since: datetime) -> bool:
+    """Check whether the hub has seen activity on a server since the given time.
+
+    :param server: The server model
+    :type server: dict
+    :param since: The time to check from, with time zone
+    :type since: datetime
+    :return: Whether the server has been used
+    :rtype: bool
+    """
+    if not server.get('last_activity'):
+        return False
+    try:
+        last_activity = datetime.fromisoformat(server['last_activity'].replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    if last_activity.tzinfo is None:
+        last_activity = last_activity.replace(tzinfo=timezone.utc)
+    return last_activity > since
+
+
+def get_prewarm_scheduler() -> PrewarmScheduler:
+    """Get the prewarm scheduler.
+
+    This returns a singleton instance.
+
+    :return: The prewarm scheduler as configured by the settings.
+    :rtype: :class:`~container_launcher.server.prewarm.PrewarmScheduler`
+    """
+    global scheduler
+    if scheduler is None:
+        logger.debug('Creating prewarm scheduler')
+        scheduler = PrewarmScheduler(config()['jupyterhub']['prewarm']['interval'],
+                                     config()['jupyterhub']['prewarm']['lead_time'])
+    return scheduler
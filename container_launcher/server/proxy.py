@@ -0,0 +1,193 @@
+"""Keep-alive connection pool and URL mapping for the reverse proxy to the container hosts."""
+import logging
+import socket
+import ssl
+
+from time import monotonic
+from tornado.iostream import IOStream
+from tornado.tcpclient import TCPClient
+from urllib.parse import quote, urlsplit, SplitResult
+
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+pool = None
+
+# Headers that only apply to a single connection and must not be forwarded, in lower case
+HOP_BY_HOP_HEADERS = frozenset(('connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te',
+                                'trailer', 'transfer-encoding', 'upgrade', 'expect'))
+
+
+def proxy_path(container: dict) -> str:
+    """Get the path under which a container's host is served by the proxy.
+
+    :param container: The container configuration
+    :type container: dict
+    :return: The path, ending in a ``/``
+    :rtype: str
+    """
+    return f'/containers/{quote(container["name"], safe="")}/'
+
+
+def proxy_url(container: dict, url: str) -> str:
+    """Map a URL on a container's host onto the corresponding URL on the proxy.
+
+    :param container: The container configuration
+    :type container: dict
+    :param url: The URL on the container's host
+    :type url: str
+    :return: The URL on the proxy, as an absolute path
+    :rtype: str
+    """
+    host_path = urlsplit(container['host']).path.rstrip('/') + '/'
+    target = urlsplit(url)
+    if target.path.startswith(host_path):
+        path = target.path[len(host_path):]
+    else:
+        path = target.path.lstrip('/')
+    return proxy_path(container) + path + (f'?{target.query}' if target.query else '')
+
+
+def upstream_target(container: dict, path: str, query: str) -> tuple[SplitResult, str]:
+    """Get the container host and the request target to forward a proxied request to.
+
+    :param container: The container configuration
+    :type container: dict
+    :param path: The raw request path below the container's proxy path
+    :type path: str
+    :param query: The raw query string
+    :type query: str
+    :return: The container's host and the request target on that host
+    :rtype: tuple[SplitResult, str]
+    """
+    host = urlsplit(container['host'])
+    target = host.path.rstrip('/') + '/' + path
+    if query:
+        target = f'{target}?{query}'
+    return host, target
+
+
+def connection_headers(headers: object) -> frozenset[str]:
+    """Get the names of the headers that must not be forwarded.
+
+    These are the hop-by-hop headers and any header listed in the ``Connection`` header.
+
+    :param headers: The request or response headers
+    :type headers: :class:`~tornado.httputil.HTTPHeaders`
+    :return: The header names in lower case
+    :rtype: frozenset[str]
+    """
+    listed = [name.strip().lower() for value in headers.get_list('Connection') for name in value.split(',')]
+    if listed:
+        return HOP_BY_HOP_HEADERS.union(listed)
+    return HOP_BY_HOP_HEADERS
+
+
+def is_reusable(stream: IOStream) -> bool:
+    """Check whether an idle connection is still open, without reading from it.
+
+    An idle HTTP connection has nothing to read, so if the peer has closed it or sent unexpected data, it cannot be
+    used for another request.
+
+    :param stream: The idle connection
+    :type stream: :class:`~tornado.iostream.IOStream`
+    :return: Whether the connection can be used for another request
+    :rtype: bool
+    """
+    if stream.closed():
+        return False
+    try:
+        socket.socket.recv(stream.socket, 1, socket.MSG_PEEK)
+    except BlockingIOError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class UpstreamPool(object):
+    """Pool of idle keep-alive connections to the container hosts.
+
+    Connections are taken out of the pool for the duration of a single request and returned once the response has been
+    read completely. At most ``max_idle`` idle connections are kept per host and idle connections are closed after
+    ``idle_timeout`` seconds.
+    """
+
+    def __init__(self: 'UpstreamPool', max_idle: int, idle_timeout: int, connect_timeout: int) -> None:
+        """Create a new :class:`~container_launcher.server.proxy.UpstreamPool`.
+
+        :param max_idle: The maximum number of idle connections per host
+        :type max_idle: int
+        :param idle_timeout: The number of seconds after which idle connections are closed
+        :type idle_timeout: int
+        :param connect_timeout: The number of seconds to wait for a new connection
+        :type connect_timeout: int
+        """
+        self._max_idle = max_idle
+        self._idle_timeout = idle_timeout
+        self._connect_timeout = connect_timeout
+        self._idle = {}
+        self._tcp_client = TCPClient()
+        self._ssl_context = None
+
+    async def connect(self: 'UpstreamPool', host: SplitResult, reuse: bool = True) -> tuple[IOStream, bool]:
+        """Get a connection to a host, reusing an idle connection if possible.
+
+        :param host: The URL of the host
+        :type host: :class:`~urllib.parse.SplitResult`
+        :param reuse: Whether an idle connection may be reused
+        :type reuse: bool
+        :return: The connection and whether it is a reused connection
+        :rtype: tuple[IOStream, bool]
+        """
+        key = (host.scheme, host.hostname, host.port)
+        idle = self._idle.get(key)
+        now = monotonic()
+        while reuse and idle:
+            stream, released = idle.pop()
+            if now - released < self._idle_timeout and is_reusable(stream):
+                return stream, True
+            stream.close()
+        if host.scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            port = host.port or 443
+            stream = await self._tcp_client.connect(host.hostname, port, ssl_options=self._ssl_context,
+                                                    server_hostname=host.hostname, timeout=self._connect_timeout)
+        else:
+            stream = await self._tcp_client.connect(host.hostname, host.port or 80, timeout=self._connect_timeout)
+        stream.set_nodelay(True)
+        return stream, False
+
+    def release(self: 'UpstreamPool', host: SplitResult, stream: IOStream) -> None:
+        """Return a connection whose response has been read completely to the pool.
+
+        :param host: The URL of the host
+        :type host: :class:`~urllib.parse.SplitResult`
+        :param stream: The connection
+        :type stream: :class:`~tornado.iostream.IOStream`
+        """
+        if stream.closed():
+            return
+        idle = self._idle.setdefault((host.scheme, host.hostname, host.port), [])
+        if len(idle) >= self._max_idle:
+            stream.close()
+        else:
+            idle.append((stream, monotonic()))
+
+
+def get_upstream_pool() -> UpstreamPool:
+    """Get the upstream connection pool.
+
+    This returns a singleton instance.
+
+    :return: The upstream connection pool as configured by the settings.
+    :rtype: :class:`~container_launcher.server.proxy.UpstreamPool`
+    """
+    global pool
+    if pool is None:
+        logger.debug('Creating upstream connection pool')
+        settings = config()['server']['proxy']
+        pool = UpstreamPool(settings['max_idle'], settings['idle_timeout'], settings['connect_timeout'])
+    return pool
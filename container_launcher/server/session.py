@@ -1,13 +1,160 @@
 """Tornado Session Mixin."""
-import json
+import logging
+import secrets
+
+from copy import deepcopy
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete
+from sqlalchemy.future import select
+from time import monotonic
+from tornado.ioloop import IOLoop
 from tornado.web import RequestHandler
 from typing import Iterator
 
+from ..models import get_sessionmaker, dialect_insert, SessionData
 from ..utils import config
 
 
+logger = logging.getLogger(__name__)
+backend = None
+
+# Number of seconds between two purges of expired sessions
+PURGE_INTERVAL = 600
+
+
+class MemorySessionBackend(object):
+    """Session backend that stores the session data in the process' memory.
+
+    Sessions are lost when the process restarts and are not shared between processes. Like the
+    :class:`~container_launcher.server.session.SqlSessionBackend`, the backend stores and returns copies of the
+    session data, so that changes are only seen by other requests once they have been saved.
+    """
+
+    def __init__(self: 'MemorySessionBackend') -> None:
+        """Create a new :class:`~container_launcher.server.session.MemorySessionBackend`."""
+        self._sessions = {}
+        self._last_purge = monotonic()
+
+    async def load(self: 'MemorySessionBackend', session_id: str) -> dict | None:
+        """Load the session data.
+
+        :param session_id: The id of the session to load.
+        :type session_id: str
+        :return: The session data or ``None`` if the session does not exist or has expired.
+        :rtype: dict
+        """
+        entry = self._sessions.get(session_id)
+        if entry is not None:
+            if entry[0] > datetime.now(timezone.utc):
+                return deepcopy(entry[1])
+            del self._sessions[session_id]
+        return None
+
+    async def save(self: 'MemorySessionBackend', session_id: str, data: dict, expires: datetime) -> None:
+        """Save the session data.
+
+        :param session_id: The id of the session to save.
+        :type session_id: str
+        :param data: The session data to save.
+        :type data: dict
+        :param expires: The time at which the session expires.
+        :type expires: datetime
+        """
+        self._sessions[session_id] = (expires, deepcopy(data))
+        if monotonic() - self._last_purge > PURGE_INTERVAL:
+            self._last_purge = monotonic()
+            now = datetime.now(timezone.utc)
+            for expired_id in [key for key, value in self._sessions.items() if value[0] <= now]:
+                del self._sessions[expired_id]
+
+    async def delete(self: 'MemorySessionBackend', session_id: str) -> None:
+        """Delete the session data.
+
+        :param session_id: The id of the session to delete.
+        :type session_id: str
+        """
+        self._sessions.pop(session_id, None)
+
+
+class SqlSessionBackend(object):
+    """Session backend that stores the session data in the database."""
+
+    def __init__(self: 'SqlSessionBackend') -> None:
+        """Create a new :class:`~container_launcher.server.session.SqlSessionBackend`."""
+        self._last_purge = monotonic()
+
+    async def load(self: 'SqlSessionBackend', session_id: str) -> dict | None:
+        """Load the session data.
+
+        :param session_id: The id of the session to load.
+        :type session_id: str
+        :return: The session data or ``None`` if the session does not exist or has expired.
+        :rtype: dict
+        """
+        async with get_sessionmaker()() as dbsession:
+            stmt = select(SessionData.data).filter(SessionData.id == session_id,
+                                                   SessionData.expires > datetime.now(timezone.utc))
+            result = await dbsession.execute(stmt)
+            return result.scalars().first()
+
+    async def save(self: 'SqlSessionBackend', session_id: str, data: dict, expires: datetime) -> None:
+        """Save the session data.
+
+        :param session_id: The id of the session to save.
+        :type session_id: str
+        :param data: The session data to save.
+        :type data: dict
+        :param expires: The time at which the session expires.
+        :type expires: datetime
+        """
+        async with get_sessionmaker()() as dbsession:
+            insert = dialect_insert(dbsession)
+            stmt = insert(SessionData.__table__).values(id=session_id, data=data, expires=expires)
+            stmt = stmt.on_conflict_do_update(index_elements=[SessionData.__table__.c.id],
+                                              set_={'data': stmt.excluded.data, 'expires': stmt.excluded.expires})
+            await dbsession.execute(stmt)
+            if monotonic() - self._last_purge > PURGE_INTERVAL:
+                self._last_purge = monotonic()
+                await dbsession.execute(delete(SessionData).filter(SessionData.expires <= datetime.now(timezone.utc)))
+            await dbsession.commit()
+
+    async def delete(self: 'SqlSessionBackend', session_id: str) -> None:
+        """Delete the session data.
+
+        :param session_id: The id of the session to delete.
+        :type session_id: str
+        """
+        async with get_sessionmaker()() as dbsession:
+            await dbsession.execute(delete(SessionData).filter(SessionData.id == session_id))
+            await dbsession.commit()
+
+
+def get_session_backend() -> MemorySessionBackend | SqlSessionBackend:
+    """Get the session backend.
+
+    This returns a singleton instance.
+
+    :return: The session backend as configured by the settings.
+    :rtype: :class:`~container_launcher.server.session.MemorySessionBackend` or
+            :class:`~container_launcher.server.session.SqlSessionBackend`
+    """
+    global backend
+    if backend is None:
+        logger.debug('Creating session backend')
+        if config()['server']['session']['backend'] == 'memory':
+            backend = MemorySessionBackend()
+        else:
+            backend = SqlSessionBackend()
+    return backend
+
+
 class Session(object):
-    """The Session object implements a cookie-baked session."""
+    """The Session object implements a server-side session.
+
+    The session cookie only contains the opaque session id. Changes to the session are only held in memory until
+    :meth:`~container_launcher.server.session.Session.save` is called, so that any number of changes during one request
+    result in a single write to the session backend.
+    """
 
     def __init__(self: 'Session', handler: RequestHandler) -> 'Session':
         """Initialise the session.
@@ -17,19 +164,51 @@ class Session(object):
         """
         self._handler = handler
         self._dict = {}
+        self._id = None
+        self._discarded_id = None
+        self._modified = False
         try:
             cookie = self._handler.get_secure_cookie(config()['server']['session']['name'],
                                                      max_age_days=config()['server']['session']['validity_days'])
             if cookie:
-                self._dict = json.loads(cookie)
+                self._id = cookie.decode('utf-8')
         except Exception:
             pass
 
-    def update_cookie(self: 'Session') -> None:
-        """Update the cookie with the session data."""
-        self._handler.set_secure_cookie(config()['server']['session']['name'],
-                                        json.dumps(self._dict),
-                                        expires_days=config()['server']['session']['validity_days'])
+    async def load(self: 'Session') -> None:
+        """Load the session data from the session backend."""
+        if self._id is not None:
+            data = await get_session_backend().load(self._id)
+            if data is not None:
+                self._dict = data
+            else:
+                self._id = None
+
+    async def save(self: 'Session') -> None:
+        """Write all changes to the session backend."""
+        if not self._modified:
+            return
+        self._modified = False
+        if self._discarded_id is not None:
+            await get_session_backend().delete(self._discarded_id)
+            self._discarded_id = None
+        if self._id is not None:
+            expires = datetime.now(timezone.utc) + timedelta(days=config()['server']['session']['validity_days'])
+            await get_session_backend().save(self._id, self._dict, expires)
+
+    @property
+    def modified(self: 'Session') -> bool:
+        """Return whether the session has changes that have not been saved."""
+        return self._modified
+
+    def _modify(self: 'Session') -> None:
+        """Mark the session as modified, creating the session id and cookie if needed."""
+        self._modified = True
+        if self._id is None:
+            self._id = secrets.token_urlsafe(32)
+            self._handler.set_secure_cookie(config()['server']['session']['name'],
+                                            self._id,
+                                            expires_days=config()['server']['session']['validity_days'])
 
     def __setitem__(self: 'Session', key: str, value: str) -> None:
         """Set a session value.
@@ -40,7 +219,7 @@ class Session(object):
         :type value: str
         """
         self._dict[key] = value
-        self.update_cookie()
+        self._modify()
 
     def __getitem__(self: 'Session', key: str) -> str:
         """Get a session value.
@@ -73,7 +252,7 @@ class Session(object):
         :type key: str
         """
         del self._dict[key]
-        self.update_cookie()
+        self._modify()
 
     def get(self: 'Session', key: str, default: str = None) -> str:
         """Get a session value with a default.
@@ -91,15 +270,24 @@ class Session(object):
             return default
 
     def clear(self: 'Session') -> None:
-        """Clear the session."""
+        """Clear the session.
+
+        The session is given a new id, so that an id known before the session was cleared cannot be used afterwards.
+        """
         self._dict = {}
-        self.update_cookie()
+        if self._id is not None:
+            if self._discarded_id is None:
+                self._discarded_id = self._id
+            self._id = None
+        self._modify()
 
 
 class SessionMixin(object):
     """The SessionMixin provides a dynamically constructed session.
 
-    Can be used with :class:`~tornado.web.RequestHandler` subclasses.
+    Can be used with :class:`~tornado.web.RequestHandler` subclasses and must be listed before the
+    :class:`~tornado.web.RequestHandler` base class. The session is loaded in ``prepare`` and any changes that have not
+    been explicitly saved are written when the request finishes.
     """
 
     _session = None
@@ -110,3 +298,13 @@ class SessionMixin(object):
         if self._session is None:
             self._session = Session(self)
         return self._session
+
+    async def prepare(self: RequestHandler) -> None:
+        """Load the session before the request is handled."""
+        await self.session.load()
+
+    def on_finish(self: RequestHandler) -> None:
+        """Write any unsaved session changes."""
+        if self._session is not None and self._session.modified:
+            IOLoop.current().spawn_callback(self._session.save)
+        super().on_finish()
@@ -0,0 +1,183 @@
+"""Immutable snapshots of the configuration and the indexes derived from it."""
+import asyncio
+import json
+import logging
+import os
+
+from .containers import ContainerIndex
+from .lti_config import ToolRegistry
+from ..log import configure_logging
+from ..utils import config, set_config
+
+
+logger = logging.getLogger(__name__)
+snapshot = None
+
+# Configuration sections that only take effect when the server is restarted
+RESTART_SECTIONS = ('server', 'database', 'jupyterhub')
+
+
+class ConfigSnapshot(object):
+    """The validated configuration together with the indexes derived from it.
+
+    A snapshot is not changed once it has been created. Reloading the configuration creates a new snapshot and swaps
+    it in as a whole, so a request that holds on to a snapshot sees a consistent configuration even if the
+    configuration is reloaded while the request is handled.
+
+    * config - The validated configuration
+    * tool_registry - The LTI tool configuration by issuer
+    * container_index - The containers by group
+    * config_message - The serialised ``config`` message sent to the client
+    """
+
+    def __init__(self: 'ConfigSnapshot', settings: dict, previous: 'ConfigSnapshot | None' = None) -> None:
+        """Create a new :class:`~container_launcher.server.snapshot.ConfigSnapshot`.
+
+        :param settings: The validated configuration
+        :type settings: dict
+        :param previous: The snapshot that this snapshot replaces, from which cached platform key sets are kept
+        :type previous: :class:`~container_launcher.server.snapshot.ConfigSnapshot`
+        """
+        self.config = settings
+        self.tool_registry = ToolRegistry(settings['lti'],
+                                          previous.tool_registry if previous is not None else None)
+        self.container_index = ContainerIndex(settings['app']['containers'])
+        self.config_message = json.dumps({
+            'type': 'config',
+            'config': {
+                'title': settings['app']['title'],
+                'vle': settings['app']['vle'],
+            }
+        })
+
+
+def get_snapshot() -> ConfigSnapshot:
+    """Get the current configuration snapshot.
+
+    Callers that need a consistent view of the configuration should fetch the snapshot once and keep using it.
+
+    :return: The current configuration snapshot.
+    :rtype: :class:`~container_launcher.server.snapshot.ConfigSnapshot`
+    """
+    global snapshot
+    if snapshot is None:
+        logger.debug('Creating configuration snapshot')
+        snapshot = ConfigSnapshot(config())
+    return snapshot
+
+
+def load_snapshot(previous: ConfigSnapshot) -> ConfigSnapshot:
+    """Load the configuration file and create a new snapshot from it.
+
+    This does not touch the current snapshot and is safe to run outside the event loop.
+
+    :param previous: The current snapshot
+    :type previous: :class:`~container_launcher.server.snapshot.ConfigSnapshot`
+    :return: The new snapshot
+    :rtype: :class:`~container_launcher.server.snapshot.ConfigSnapshot`
+    """
+    from ..cli import find_config_file, load_config
+
+    path = find_config_file()
+    if path is None:
+        raise FileNotFoundError('The configuration file no longer exists')
+    return ConfigSnapshot(load_config(path), previous)
+
+
+def activate_snapshot(new: ConfigSnapshot, keep_restart_sections: bool = True) -> None:
+    """Make a snapshot the current snapshot.
+
+    Changes to the ``RESTART_SECTIONS`` only take effect after a restart. Unless told otherwise, their previous values
+    are copied into the new snapshot, so that code that reads them after the reload sees the same settings as the
+    objects created at startup.
+
+    :param new: The snapshot to activate
+    :type new: :class:`~container_launcher.server.snapshot.ConfigSnapshot`
+    :param keep_restart_sections: Whether to keep the previous values of the ``RESTART_SECTIONS``. The worker
+                                  supervisor does not keep them, so that the workers it restarts use the new values.
+    :type keep_restart_sections: bool
+    """
+    global snapshot
+    previous = get_snapshot()
+    for section in RESTART_SECTIONS:
+        if new.config.get(section) != previous.config.get(section):
+            logger.warning(f'Changes to the {section} settings only take effect after a restart')
+            if keep_restart_sections:
+                new.config[section] = previous.config[section]
+    if (new.config.get('logging') != previous.config.get('logging')
+            or new.config['log_queue'] != previous.config['log_queue']):
+        configure_logging(new.config)
+    snapshot = new
+    set_config(new.config)
+    logger.info('Configuration reloaded')
+
+
+def reload_snapshot(keep_restart_sections: bool = True) -> bool:
+    """Reload the configuration, blocking until it has been loaded.
+
+    :param keep_restart_sections: Whether to keep the previous values of the ``RESTART_SECTIONS``
+    :type keep_restart_sections: bool
+    :return: Whether the configuration was reloaded. If the new configuration is invalid, the current configuration
+             remains in use.
+    :rtype: bool
+    """
+    try:
+        new = load_snapshot(get_snapshot())
+    except Exception as e:
+        logger.error(f'Reloading the configuration failed: {e}')
+        return False
+    activate_snapshot(new, keep_restart_sections)
+    return True
+
+
+async def reload_snapshot_async() -> bool:
+    """Reload the configuration, loading and validating it outside the event loop.
+
+    :return: Whether the configuration was reloaded. If the new configuration is invalid, the current configuration
+             remains in use.
+    :rtype: bool
+    """
+    try:
+        new = await asyncio.get_running_loop().run_in_executor(None, load_snapshot, get_snapshot())
+    except Exception as e:
+        logger.error(f'Reloading the configuration failed: {e}')
+        return False
+    activate_snapshot(new)
+    return True
+
+
+class ConfigFileWatcher(object):
+    """Watcher that reloads the configuration when the configuration file changes."""
+
+    def __init__(self: 'ConfigFileWatcher') -> None:
+        """Create a new :class:`~container_launcher.server.snapshot.ConfigFileWatcher`."""
+        self._signature = self._current_signature()
+        self._reloading = False
+
+    def _current_signature(self: 'ConfigFileWatcher') -> tuple | None:
+        """Get the modification time and size of the configuration file.
+
+        :return: The modification time and size or ``None`` if there is no configuration file
+        :rtype: tuple
+        """
+        from ..cli import find_config_file
+
+        path = find_config_file()
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+            return (path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    async def check(self: 'ConfigFileWatcher') -> None:
+        """Reload the configuration if the configuration file has changed since the last check."""
+        signature = self._current_signature()
+        if signature is not None and signature != self._signature and not self._reloading:
+            self._signature = signature
+            self._reloading = True
+            try:
+                await reload_snapshot_async()
+            finally:
+                self._reloading = False
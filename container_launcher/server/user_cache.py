@@ -0,0 +1,137 @@
+"""Process-local cache of the users and their group memberships."""
+import asyncio
+import logging
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from time import monotonic, time
+
+from ..models import get_sessionmaker, User
+from ..utils import config
+
+
+logger = logging.getLogger(__name__)
+cache = None
+
+
+@dataclass(frozen=True)
+class CachedUser(object):
+    """The data needed by the API for a single user.
+
+    * id - The unique database id
+    * name - The user's name
+    * group_ids - The external ids of the groups the user belongs to
+    """
+
+    id: int
+    name: str
+    group_ids: frozenset[str]
+
+
+class UserCache(object):
+    """LRU cache of :class:`~container_launcher.server.user_cache.CachedUser`, keyed by the user's database id.
+
+    Entries expire after ``ttl`` seconds and are invalidated explicitly whenever a launch in this process changes the
+    user. A launch handled by another worker process cannot invalidate this cache, so it stores the time of the launch
+    as the ``user_version`` in the session instead. Entries and loads that started before the version passed to
+    :meth:`~container_launcher.server.user_cache.UserCache.get` are not used. Concurrent requests for the same uncached
+    user share a single database query.
+    """
+
+    def __init__(self: 'UserCache', size: int, ttl: int) -> None:
+        """Create a new :class:`~container_launcher.server.user_cache.UserCache`.
+
+        :param size: The maximum number of users to cache
+        :type size: int
+        :param ttl: The number of seconds to cache each user for
+        :type ttl: int
+        """
+        self._size = size
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._generation = 0
+
+    async def get(self: 'UserCache', user_id: int, version: float = 0) -> CachedUser | None:
+        """Get the user with the given id, loading it from the database if it is not cached.
+
+        :param user_id: The database id of the user
+        :type user_id: int
+        :param version: The time of the last launch that changed the user, as stored in the session
+        :type version: float
+        :return: The user or ``None`` if no user with that id exists
+        :rtype: :class:`~container_launcher.server.user_cache.CachedUser`
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            if monotonic() - entry[0] < self._ttl and entry[1] >= version:
+                self._entries.move_to_end(user_id)
+                return entry[2]
+            del self._entries[user_id]
+        inflight = self._inflight.get(user_id)
+        if inflight is None or inflight[0] < version:
+            started = time()
+            future = asyncio.ensure_future(self._load(user_id, self._generation, started))
+            future.add_done_callback(lambda f: self._inflight.pop(user_id)
+                                     if self._inflight.get(user_id, (None, None))[1] is f else None)
+            inflight = (started, future)
+            self._inflight[user_id] = inflight
+        return await asyncio.shield(inflight[1])
+
+    async def _load(self: 'UserCache', user_id: int, generation: int, started: float) -> CachedUser | None:
+        """Load the user with the given id from the database and cache it.
+
+        The user is only cached if no invalidation happened while it was loaded.
+
+        :param user_id: The database id of the user
+        :type user_id: int
+        :param generation: The invalidation generation at the start of the load
+        :type generation: int
+        :param started: The time at the start of the load, which is the version of the loaded user
+        :type started: float
+        :return: The user or ``None`` if no user with that id exists
+        :rtype: :class:`~container_launcher.server.user_cache.CachedUser`
+        """
+        async with get_sessionmaker()() as dbsession:
+            stmt = select(User).filter(User.id == user_id).options(selectinload(User.groups))
+            result = await dbsession.execute(stmt)
+            user = result.scalars().first()
+        if user is None:
+            return None
+        cached = CachedUser(id=user.id,
+                            name=user.attributes['name'],
+                            group_ids=frozenset(group.external_id for group in user.groups))
+        if generation == self._generation:
+            self._entries[user_id] = (monotonic(), started, cached)
+            if len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+        return cached
+
+    def invalidate(self: 'UserCache', user_id: int) -> None:
+        """Remove the user with the given id from the cache.
+
+        Loads that are in progress are not cached when they complete.
+
+        :param user_id: The database id of the user
+        :type user_id: int
+        """
+        self._generation = self._generation + 1
+        self._entries.pop(user_id, None)
+        self._inflight.pop(user_id, None)
+
+
+def get_user_cache() -> UserCache:
+    """Get the user cache.
+
+    This returns a singleton instance.
+
+    :return: The user cache as configured by the settings.
+    :rtype: :class:`~container_launcher.server.user_cache.UserCache`
+    """
+    global cache
+    if cache is None:
+        logger.debug('Creating user cache')
+        cache = UserCache(config()['server']['user_cache']['size'], config()['server']['user_cache']['ttl'])
+    return cache
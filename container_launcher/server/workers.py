@@ -0,0 +1,234 @@
+"""Pre-forking supervisor for running the server in multiple worker processes."""
+import logging
+import os
+import select
+import signal
+import time
+
+from dataclasses import dataclass
+from typing import Callable
+
+from ..metrics import mark_process_dead
+
+
+logger = logging.getLogger(__name__)
+
+# Number of seconds between two heartbeats sent by a worker
+HEARTBEAT_INTERVAL = 1
+# Number of seconds without a heartbeat after which a worker is considered hung and killed
+HEARTBEAT_TIMEOUT = 30
+# Minimum number of seconds a worker must run for, before it is restarted immediately after exiting
+MIN_WORKER_LIFETIME = 1
+
+
+@dataclass
+class Worker(object):
+    """The supervisor's record of a single worker process.
+
+    * worker_id - The index of the worker, which is kept when the worker is restarted
+    * pid - The process id
+    * heartbeat_fd - The read end of the worker's heartbeat pipe
+    * started - The monotonic time at which the worker was started
+    * last_heartbeat - The monotonic time of the last heartbeat
+    * stopping - The monotonic time at which the worker was asked to stop or ``None``
+    """
+
+    worker_id: int
+    pid: int
+    heartbeat_fd: int
+    started: float
+    last_heartbeat: float
+    stopping: float | None = None
+
+
+class WorkerSupervisor(object):
+    """Supervisor that pre-forks a fixed number of worker processes and keeps them running.
+
+    The supervisor restarts workers that exit unexpectedly or stop sending heartbeats. ``SIGTERM`` and ``SIGINT`` stop
+    all workers gracefully. ``SIGHUP`` reloads the configuration in the supervisor, so that restarted workers use it,
+    and is passed on to the workers, which reload the configuration without dropping connections. ``SIGUSR2`` performs
+    a rolling restart in which replacement workers are started before the old workers are stopped. Workers are asked to
+    stop via ``SIGTERM`` and are killed if they have not exited after ``shutdown_timeout`` seconds.
+    """
+
+    def __init__(self: 'WorkerSupervisor', workers: int, run_worker: Callable[[int, int], None],
+                 shutdown_timeout: int, reload: Callable[[], bool] | None = None) -> None:
+        """Create a new :class:`~container_launcher.server.workers.WorkerSupervisor`.
+
+        :param workers: The number of worker processes to run
+        :type workers: int
+        :param run_worker: The function to run in each worker process. It is passed the worker id and the file
+                           descriptor to write heartbeats to and must return when the worker has stopped.
+        :type run_worker: Callable[[int, int], None]
+        :param shutdown_timeout: The number of seconds to give a worker to stop gracefully
+        :type shutdown_timeout: int
+        :param reload: The function that reloads the configuration in the supervisor
+        :type reload: Callable[[], bool]
+        """
+        self._workers = workers
+        self._run_worker = run_worker
+        self._shutdown_timeout = shutdown_timeout
+        self._children = {}
+        self._stop_requested = False
+        self._restart_requested = False
+        self._reload = reload
+        self._reload_requested = False
+
+    def run(self: 'WorkerSupervisor') -> None:
+        """Start the workers and supervise them until they have all stopped."""
+        logger.info(f'Starting {self._workers} worker processes')
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_reload)
+        signal.signal(signal.SIGUSR2, self._request_restart)
+        for worker_id in range(self._workers):
+            self._spawn(worker_id)
+        stopping = False
+        while self._children:
+            if self._stop_requested and not stopping:
+                logger.info('Stopping all worker processes')
+                stopping = True
+                for worker in list(self._children.values()):
+                    self._stop(worker)
+            elif self._reload_requested and not stopping:
+                self._reload_requested = False
+                if self._reload is None or self._reload():
+                    for worker in self._children.values():
+                        if worker.stopping is None:
+                            self._signal(worker, signal.SIGHUP)
+            elif self._restart_requested and not stopping:
+                logger.info('Restarting all worker processes')
+                self._restart_requested = False
+                for worker in [worker for worker in self._children.values() if worker.stopping is None]:
+                    self._spawn(worker.worker_id)
+                    self._stop(worker)
+            self._wait_for_heartbeats()
+            self._reap(restart=not stopping)
+            self._kill_unresponsive()
+        logger.info('All worker processes have stopped')
+
+    def _request_stop(self: 'WorkerSupervisor', signum: int, frame: object) -> None:
+        """Signal handler that requests all workers to be stopped."""
+        self._stop_requested = True
+
+    def _request_reload(self: 'WorkerSupervisor', signum: int, frame: object) -> None:
+        """Signal handler that requests the configuration to be reloaded."""
+        self._reload_requested = True
+
+    def _request_restart(self: 'WorkerSupervisor', signum: int, frame: object) -> None:
+        """Signal handler that requests a rolling restart of all workers."""
+        self._restart_requested = True
+
+    def _spawn(self: 'WorkerSupervisor', worker_id: int) -> None:
+        """Fork a new worker process.
+
+        :param worker_id: The id of the worker to start
+        :type worker_id: int
+        """
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGUSR2):
+                signal.signal(signum, signal.SIG_DFL)
+            os.close(read_fd)
+            for worker in self._children.values():
+                os.close(worker.heartbeat_fd)
+            os.set_blocking(write_fd, False)
+            exit_code = 0
+            try:
+                self._run_worker(worker_id, write_fd)
+            except Exception:
+                logger.exception(f'Worker {worker_id} failed')
+                exit_code = 1
+            finally:
+                logging.shutdown()
+                os._exit(exit_code)
+        os.close(write_fd)
+        now = time.monotonic()
+        self._children[pid] = Worker(worker_id=worker_id, pid=pid, heartbeat_fd=read_fd, started=now,
+                                     last_heartbeat=now)
+        logger.debug(f'Started worker {worker_id} with pid {pid}')
+
+    def _stop(self: 'WorkerSupervisor', worker: Worker) -> None:
+        """Ask a worker to stop gracefully.
+
+        :param worker: The worker to stop
+        :type worker: :class:`~container_launcher.server.workers.Worker`
+        """
+        if worker.stopping is None:
+            worker.stopping = time.monotonic()
+            self._signal(worker, signal.SIGTERM)
+
+    def _signal(self: 'WorkerSupervisor', worker: Worker, signum: int) -> None:
+        """Send a signal to a worker, ignoring workers that have already exited.
+
+        :param worker: The worker to send the signal to
+        :type worker: :class:`~container_launcher.server.workers.Worker`
+        :param signum: The signal to send
+        :type signum: int
+        """
+        try:
+            os.kill(worker.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _wait_for_heartbeats(self: 'WorkerSupervisor') -> None:
+        """Wait for at most one heartbeat interval and record the heartbeats received from the workers."""
+        workers = dict([(worker.heartbeat_fd, worker) for worker in self._children.values()])
+        try:
+            readable, _, _ = select.select(list(workers.keys()), [], [], HEARTBEAT_INTERVAL)
+        except InterruptedError:
+            return
+        now = time.monotonic()
+        for fd in readable:
+            if os.read(fd, 4096):
+                workers[fd].last_heartbeat = now
+
+    def _reap(self: 'WorkerSupervisor', restart: bool) -> None:
+        """Collect all exited workers, restarting those that exited unexpectedly.
+
+        :param restart: Whether unexpectedly exited workers should be restarted
+        :type restart: bool
+        """
+        while self._children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            worker = self._children.pop(pid, None)
+            if worker is None:
+                continue
+            mark_process_dead(pid)
+            os.close(worker.heartbeat_fd)
+            if worker.stopping is not None:
+                logger.debug(f'Worker {worker.worker_id} with pid {pid} has stopped')
+            else:
+                if os.WIFSIGNALED(status):
+                    logger.warning(f'Worker {worker.worker_id} with pid {pid} was killed by signal '
+                                   f'{os.WTERMSIG(status)}')
+                else:
+                    logger.warning(f'Worker {worker.worker_id} with pid {pid} exited with status '
+                                   f'{os.WEXITSTATUS(status)}')
+                if restart:
+                    if time.monotonic() - worker.started < MIN_WORKER_LIFETIME:
+                        time.sleep(MIN_WORKER_LIFETIME)
+                    self._spawn(worker.worker_id)
+
+    def _kill_unresponsive(self: 'WorkerSupervisor') -> None:
+        """Kill all workers that have stopped sending heartbeats or have not stopped within the shutdown timeout."""
+        now = time.monotonic()
+        for worker in self._children.values():
+            if worker.stopping is not None:
+                if now - worker.stopping > self._shutdown_timeout + HEARTBEAT_TIMEOUT:
+                    logger.error(f'Worker {worker.worker_id} with pid {worker.pid} did not stop, killing it')
+                    self._kill(worker)
+            elif now - worker.last_heartbeat > HEARTBEAT_TIMEOUT:
+                logger.error(f'Worker {worker.worker_id} with pid {worker.pid} is not responding, killing it')
+                self._kill(worker)
+
+    def _kill(self: 'WorkerSupervisor', worker: Worker) -> None:
+        """Kill a worker.
+
+        :param worker: The worker to kill
+        :type worker: :class:`~container_launcher.server.workers.Worker`
+        """
+        self._signal(worker, signal.SIGKILL)
@@ -0,0 +1 @@
+"""Tests for the Compute Home application."""
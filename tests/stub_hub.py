@@ -0,0 +1,134 @@
+"""Stub JupyterHub API for the tests.
+
+The hub keeps its users and servers in a :class:`~tests.stub_hub.HubState` and is served below its ``prefix``.
+Started servers are pending for ``spawn_time`` seconds and then either become ready or, if the spawn fails, are
+removed again, as JupyterHub does. Like JupyterHub, the hub records activity on a server when its spawn completes.
+"""
+import asyncio
+import copy
+
+from datetime import datetime, timezone
+from tornado.web import Application, RequestHandler
+
+
+class HubState(object):
+    """The users and servers of the stub hub and the requests it has received."""
+
+    def __init__(self: 'HubState') -> None:
+        """Create a new, empty :class:`~tests.stub_hub.HubState`."""
+        self.users = {}
+        self.requests = []
+        self.latency = 0
+        self.spawn_time = 0
+        self.fail_spawns = False
+        self.prefix = ''
+
+    def count(self: 'HubState', method: str, path: str | None = None) -> int:
+        """Count the requests with the given method and, optionally, path.
+
+        :param method: The HTTP method
+        :type method: str
+        :param path: The request path
+        :type path: str
+        :return: The number of matching requests
+        :rtype: int
+        """
+        return len([request for request in self.requests
+                    if request[0] == method and (path is None or request[1] == path)])
+
+    async def spawn(self: 'HubState', user_name: str, server_name: str) -> None:
+        """Complete a pending spawn after ``spawn_time`` seconds.
+
+        :param user_name: The name of the user
+        :type user_name: str
+        :param server_name: The name of the server
+        :type server_name: str
+        """
+        await asyncio.sleep(self.spawn_time)
+        servers = self.users[user_name]['servers']
+        if self.fail_spawns:
+            servers.pop(server_name, None)
+        elif server_name in servers:
+            servers[server_name] = {'name': server_name, 'ready': True, 'pending': None,
+                                    'url': f'{self.prefix}/user/{user_name}/{server_name}/',
+                                    'last_activity': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')}
+
+
+class HubHandler(RequestHandler):
+    """Base class for the stub hub's API handlers."""
+
+    def initialize(self: 'HubHandler', state: HubState) -> None:
+        """Use the shared hub state."""
+        self.state = state
+
+    def prepare(self: 'HubHandler') -> None:
+        """Record the request."""
+        self.state.requests.append((self.request.method, self.request.path))
+
+    async def respond(self: 'HubHandler', status: int, body: dict | None = None) -> None:
+        """Send the response after the configured latency.
+
+        :param status: The HTTP status code
+        :type status: int
+        :param body: The JSON body, captured before the delay
+        :type body: dict
+        """
+        if self.state.latency:
+            await asyncio.sleep(self.state.latency)
+        self.set_status(status)
+        if body is not None:
+            self.write(body)
+
+
+class UserHandler(HubHandler):
+    """Get and create users."""
+
+    async def get(self: 'UserHandler', user_name: str) -> None:
+        """Send the user with their servers as they were when the request arrived."""
+        if user_name not in self.state.users:
+            await self.respond(404)
+            return
+        await self.respond(200, copy.deepcopy(self.state.users[user_name]))
+
+    async def post(self: 'UserHandler', user_name: str) -> None:
+        """Create the user."""
+        if user_name in self.state.users:
+            await self.respond(409)
+            return
+        self.state.users[user_name] = {'name': user_name, 'servers': {}}
+        await self.respond(201, copy.deepcopy(self.state.users[user_name]))
+
+
+class ServerHandler(HubHandler):
+    """Start and stop named servers."""
+
+    async def post(self: 'ServerHandler', user_name: str, server_name: str) -> None:
+        """Start the server, which stays pending until the spawn completes."""
+        if user_name not in self.state.users:
+            await self.respond(404)
+            return
+        servers = self.state.users[user_name]['servers']
+        if server_name not in servers:
+            servers[server_name] = {'name': server_name, 'ready': False, 'pending': 'spawn', 'url': None}
+            asyncio.ensure_future(self.state.spawn(user_name, server_name))
+        await self.respond(202)
+
+    async def delete(self: 'ServerHandler', user_name: str, server_name: str) -> None:
+        """Stop the server."""
+        if user_name not in self.state.users:
+            await self.respond(404)
+            return
+        self.state.users[user_name]['servers'].pop(server_name, None)
+        await self.respond(204)
+
+
+def make_app(state: HubState) -> Application:
+    """Create the stub hub application.
+
+    :param state: The state of the hub
+    :type state: :class:`~tests.stub_hub.HubState`
+    :return: The application, which serves the API below ``<prefix>/hub/api/``
+    :rtype: :class:`~tornado.web.Application`
+    """
+    return Application([(f'{state.prefix}/hub/api/users/([^/]+)', UserHandler, {'state': state}),
+                        (f'{state.prefix}/hub/api/users/([^/]+)/servers/([^/]+)', ServerHandler, {'state': state})])
@@ -0,0 +1,178 @@
+"""Tests for the admission control of the LTI requests."""
+import base64
+import json
+import pytest
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, MissingArgumentError, RequestHandler
+from unittest import mock
+from urllib.parse import urlencode
+
+from container_launcher.server import admission
+from container_launcher.server.admission import AdmissionController, AdmissionMixin, TokenBuckets
+from container_launcher.server.handlers.lti import LtiLaunchHandler
+
+
+@pytest.fixture
+def count_admission() -> mock.Mock:
+    """Record the admission metrics."""
+    with mock.patch.object(admission, 'count_admission') as count:
+        yield count
+
+
+def test_bucket_refills_at_rate() -> None:
+    """A bucket allows a burst, then refills at the rate, up to the burst size."""
+    buckets = TokenBuckets(2, 2, 10)
+    assert buckets.take('key', 100) == 0
+    assert buckets.take('key', 100) == 0
+    assert buckets.take('key', 100) == 0.5
+    assert buckets.take('key', 100.25) == 0.25
+    assert buckets.take('key', 100.5) == 0
+    assert buckets.take('key', 200) == 0
+    assert buckets.take('key', 200) == 0
+    assert buckets.take('key', 200) > 0
+
+
+def test_bucket_without_limit() -> None:
+    """Without a rate or a key, no token is needed."""
+    assert all(TokenBuckets(0, 1, 10).take('key', 100) == 0 for _ in range(10))
+    assert all(TokenBuckets(1, 1, 10).take(None, 100) == 0 for _ in range(10))
+
+
+def test_evicted_bucket_starts_full() -> None:
+    """Once more than ``size`` keys are tracked, the least recently used bucket is evicted and starts full again."""
+    buckets = TokenBuckets(1, 1, 2)
+    assert buckets.take('first', 100) == 0
+    assert buckets.take('second', 100) == 0
+    assert buckets.take('first', 100) > 0
+    assert buckets.take('third', 100) == 0
+    assert buckets.take('second', 100) == 0
+
+
+def test_in_flight_limit(count_admission: mock.Mock) -> None:
+    """Requests beyond the in-flight limit are shed until an admitted request is released."""
+    controller = AdmissionController(2, 0, 1, 0, 1, 10, 7)
+    assert controller.admit('handler', 'iss', 'first') == 0
+    assert controller.admit('handler', 'iss', 'second') == 0
+    assert controller.admit('handler', 'iss', 'third') == 7
+    count_admission.assert_called_with('handler', 'shed_in_flight')
+    controller.release()
+    assert controller.admit('handler', 'iss', 'third') == 0
+    assert controller.in_flight == 2
+
+
+def test_user_and_issuer_rates(count_admission: mock.Mock) -> None:
+    """The users of an issuer are limited separately, and all of them together by the issuer's rate."""
+    controller = AdmissionController(0, 0.5, 2, 0.25, 1, 10, 7)
+    assert controller.admit('handler', 'iss', 'first') == 0
+    assert controller.admit('handler', 'iss', 'first') == 4
+    count_admission.assert_called_with('handler', 'shed_user')
+    assert controller.admit('handler', 'other', 'first') == 0
+    assert controller.admit('handler', 'iss', 'second') == 0
+    assert controller.admit('handler', 'iss', 'third') == 2
+    count_admission.assert_called_with('handler', 'shed_issuer')
+
+
+def launch_handler(id_token: str | None) -> LtiLaunchHandler:
+    """Get a launch handler for a request with the given ``id_token`` form field."""
+    def get_argument(name: str) -> str:
+        if name != 'id_token' or id_token is None:
+            raise MissingArgumentError(name)
+        return id_token
+
+    handler = LtiLaunchHandler.__new__(LtiLaunchHandler)
+    handler.snapshot = mock.Mock()
+    handler.get_argument = get_argument
+    return handler
+
+
+def encode_part(value: dict) -> str:
+    """Encode a JWT header or body without padding."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('utf-8').rstrip('=')
+
+
+def test_launch_admission_keys() -> None:
+    """The issuer and subject are taken from the unverified JWT, which the launch keeps for the validation."""
+    handler = launch_handler(f'{encode_part({"kid": "k1"})}.{encode_part({"iss": "iss", "sub": 42})}.signature')
+    assert handler.admission_keys() == ('iss', '42')
+    assert handler.message_launch.get_unverified_key_id() == ('iss', 'k1')
+
+
+@pytest.mark.parametrize('id_token', [None, 'not a JWT', f'{encode_part({})}.{encode_part(["list"])}.signature'])
+def test_launch_admission_keys_invalid(id_token: str | None) -> None:
+    """A launch without a decodable JWT is admitted without an issuer or subject."""
+    assert launch_handler(id_token).admission_keys() == (None, None)
+
+
+class PreparedHandler(RequestHandler):
+    """Stand-in for the handlers with the :class:`~container_launcher.server.session.SessionMixin`."""
+
+    async def prepare(self: 'PreparedHandler') -> None:
+        """Prepare the request, like the session mixin without loading a session."""
+        pass
+
+
+class AdmittedHandler(AdmissionMixin, PreparedHandler):
+    """Handler that answers the requests it admits."""
+
+    def admission_keys(self: 'AdmittedHandler') -> tuple[str | None, str | None]:
+        """Use the issuer and user from the form."""
+        return self.get_body_argument('iss', None), self.get_body_argument('user', None)
+
+    def get(self: 'AdmittedHandler') -> None:
+        """Answer the request."""
+        self.write('admitted')
+
+    post = get
+
+
+class TestAdmissionMixin(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.admission.AdmissionMixin`."""
+
+    def get_app(self: 'TestAdmissionMixin') -> Application:
+        """Create an application with a single admission controlled handler."""
+        return Application([('/lti', AdmittedHandler)])
+
+    def setUp(self: 'TestAdmissionMixin') -> None:
+        """Use an admission controller that admits one request per user."""
+        super().setUp()
+        self.settings = {'server': {'admission': {'waiting_page': True}}}
+        self.controller = AdmissionController(0, 0, 1, 0.001, 1, 10, 5)
+        for patcher in [mock.patch.object(admission, 'config', lambda: self.settings),
+                        mock.patch.object(admission, 'controller', self.controller),
+                        mock.patch.object(admission, 'count_admission')]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_admitted_request_is_released(self: 'TestAdmissionMixin') -> None:
+        """An admitted request is handled and released once it has finished."""
+        response = self.fetch('/lti', method='POST', body=urlencode({'iss': 'iss', 'user': 'user'}))
+        assert response.code == 200
+        assert response.body == b'admitted'
+        assert self.controller.in_flight == 0
+
+    def test_waiting_page_reposts_form(self: 'TestAdmissionMixin') -> None:
+        """A shed form is sent back as a waiting page that posts the same fields to the same URL after a delay."""
+        body = urlencode([('iss', 'iss'), ('user', 'user'), ('id_token', 'a"b<c>'), ('state', '1'), ('state', '2')])
+        assert self.fetch('/lti?x=1&y=2', method='POST', body=body).code == 200
+        response = self.fetch('/lti?x=1&y=2', method='POST', body=body)
+        assert response.code == 503
+        page = response.body.decode('utf-8')
+        assert response.headers['Retry-After'] == '1000'
+        assert '<form method="post" action="/lti?x=1&amp;y=2">' in page
+        for name, value in [('iss', 'iss'), ('user', 'user'), ('id_token', 'a&quot;b&lt;c&gt;'), ('state', '1'),
+                            ('state', '2')]:
+            assert f'<input type="hidden" name="{name}" value="{value}">' in page
+        assert 'a"b<c>' not in page
+        assert '1000000);' in page
+        assert self.controller.in_flight == 0
+
+    def test_shed_without_waiting_page(self: 'TestAdmissionMixin') -> None:
+        """Without the waiting page, a shed request only gets the status and the Retry-After header."""
+        self.settings['server']['admission']['waiting_page'] = False
+        body = urlencode({'iss': 'iss', 'user': 'user'})
+        self.fetch('/lti', method='POST', body=body)
+        response = self.fetch('/lti', method='POST', body=body)
+        assert response.code == 503
+        assert response.headers['Retry-After'] == '1000'
+        assert response.body == b''
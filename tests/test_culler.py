@@ -0,0 +1,115 @@
+"""Tests for the idle culler."""
+import asyncio
+import pytest
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from unittest import mock
+
+from container_launcher.models import Base
+from container_launcher.server import culler
+from container_launcher.server.culler import IdleCuller
+
+
+CONTAINERS = [{'name': 'container', 'host': 'http://hub/'}]
+
+
+class Clock(object):
+    """Monotonic clock that only advances when told to."""
+
+    def __init__(self: 'Clock') -> None:
+        """Start the clock."""
+        self.now = 1000.0
+
+    def __call__(self: 'Clock') -> float:
+        """Get the current time."""
+        return self.now
+
+
+async def run_workers(dsn: str, scenario: str) -> dict:
+    """Run a scenario with two workers that share the presence of their users.
+
+    :return: The users whose containers each worker stopped
+    :rtype: dict
+    """
+    engine = create_async_engine(dsn)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession)
+        clock = Clock()
+        stopped = {'first': [], 'second': []}
+        workers = {}
+        for name in stopped:
+            workers[name] = IdleCuller(True, 10, 60, 20)
+            workers[name].share_presence()
+            workers[name]._task = mock.Mock()
+            workers[name]._stop_containers = mock.AsyncMock(
+                side_effect=lambda user_name, containers, min_idle, name=name: stopped[name].append(user_name))
+        with mock.patch.object(culler, 'get_sessionmaker', lambda: session_factory), \
+                mock.patch.object(culler, 'monotonic', clock):
+            first, second = workers['first'], workers['second']
+            if scenario == 'reconnected':
+                first.connected('user', CONTAINERS)
+                await first._cull()
+                first.disconnected('user')
+                second.connected('user', CONTAINERS)
+                await second._cull()
+                clock.now += 11
+                await first._cull()
+                await second._cull()
+                second.disconnected('user')
+                clock.now += 11
+                await second._cull()
+            elif scenario == 'left':
+                first.connected('user', CONTAINERS)
+                await first._cull()
+                first.disconnected('user')
+                clock.now += 11
+                await first._cull()
+                await second._cull()
+        return stopped
+    finally:
+        await engine.dispose()
+
+
+def test_reconnected_user_is_culled_by_other_worker(tmp_path: str) -> None:
+    """A user who reconnected to another worker is only culled by that worker, once idle there."""
+    stopped = asyncio.run(run_workers(f'sqlite+aiosqlite:///{tmp_path}/test.sqlite', 'reconnected'))
+    assert stopped == {'first': [], 'second': ['user']}
+
+
+def test_own_presence_does_not_prevent_culling(tmp_path: str) -> None:
+    """A worker's own record of a user does not stop it from culling that user."""
+    stopped = asyncio.run(run_workers(f'sqlite+aiosqlite:///{tmp_path}/test.sqlite', 'left'))
+    assert stopped == {'first': ['user'], 'second': []}
+
+
+def test_unshared_presence_culls_locally_idle_users() -> None:
+    """Without shared presence, a user idle in the process is culled without touching the database."""
+    clock = Clock()
+    idle_culler = IdleCuller(True, 10, 60, 20)
+    idle_culler._task = mock.Mock()
+    idle_culler._stop_containers = mock.AsyncMock()
+    with mock.patch.object(culler, 'monotonic', clock), \
+            mock.patch.object(culler, 'get_sessionmaker', side_effect=AssertionError):
+        idle_culler.connected('user', CONTAINERS)
+        idle_culler.disconnected('user')
+        asyncio.run(idle_culler._cull())
+        idle_culler._stop_containers.assert_not_called()
+        clock.now += 11
+        asyncio.run(idle_culler._cull())
+    idle_culler._stop_containers.assert_called_once_with('user', CONTAINERS, 10)
+
+
+def test_shutdown_logs_failures(caplog: pytest.LogCaptureFixture) -> None:
+    """A failure to shut down a user's containers is logged instead of being left in the task."""
+    async def run() -> None:
+        idle_culler = IdleCuller(True, 10, 60, 20)
+        idle_culler._task = mock.Mock()
+        idle_culler._stop_containers = mock.AsyncMock(side_effect=Exception('The hub is not available'))
+        idle_culler.shutdown('user', CONTAINERS)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert 'Shutting down the containers of user failed: The hub is not available' in caplog.text
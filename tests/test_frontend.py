@@ -0,0 +1,87 @@
+"""Tests for the frontend files handler."""
+import pathlib
+import tempfile
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+from unittest import mock
+
+from container_launcher.server.handlers import frontend
+from container_launcher.server.handlers.frontend import AssetIndex, FrontendHandler
+
+
+INDEX_HTML = b'<html><head><script defer src="/app/build/bundle.js"></script></head></html>'
+BUNDLE_JS = b'console.log("compute home");\n' * 100
+
+
+class TestFrontendHandler(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.handlers.frontend.FrontendHandler`."""
+
+    def get_app(self: 'TestFrontendHandler') -> Application:
+        """Create an application that serves an index of two frontend files."""
+        with tempfile.TemporaryDirectory() as directory:
+            root = pathlib.Path(directory)
+            (root / 'build').mkdir()
+            (root / 'index.html').write_bytes(INDEX_HTML)
+            (root / 'build' / 'bundle.js').write_bytes(BUNDLE_JS)
+            with mock.patch.object(frontend, 'brotli', mock.Mock(compress=lambda data, quality: b'br')):
+                self.assets = AssetIndex(root)
+        return Application([('/app(.*)', FrontendHandler, {'assets': self.assets})])
+
+    def test_not_modified(self: 'TestFrontendHandler') -> None:
+        """A request with a matching If-None-Match header gets a 304 without a body."""
+        response = self.fetch('/app/build/bundle.js')
+        assert response.code == 200
+        response = self.fetch('/app/build/bundle.js', headers={'If-None-Match': response.headers['Etag']})
+        assert response.code == 304
+        assert response.body == b''
+
+    def test_modified(self: 'TestFrontendHandler') -> None:
+        """A request with a different If-None-Match header gets the file."""
+        response = self.fetch('/app/build/bundle.js', headers={'If-None-Match': '"outdated"'})
+        assert response.code == 200
+        assert response.body == BUNDLE_JS
+
+    def test_identity_encoding(self: 'TestFrontendHandler') -> None:
+        """Without an Accept-Encoding header the uncompressed file is sent."""
+        response = self.fetch('/app/build/bundle.js', decompress_response=False)
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        assert response.headers['Etag'] == self.assets.get('build/bundle.js').etag
+        assert response.body == BUNDLE_JS
+
+    def test_gzip_encoding(self: 'TestFrontendHandler') -> None:
+        """The gzip variant is sent if only gzip is accepted."""
+        response = self.fetch('/app/build/bundle.js', headers={'Accept-Encoding': 'gzip, br;q=0'},
+                              decompress_response=False)
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Etag'].endswith('-gzip"')
+        assert response.body == self.assets.get('build/bundle.js').variants['gzip']
+
+    def test_brotli_encoding(self: 'TestFrontendHandler') -> None:
+        """The brotli variant is preferred over gzip."""
+        response = self.fetch('/app/build/bundle.js', headers={'Accept-Encoding': 'gzip, deflate, br'},
+                              decompress_response=False)
+        assert response.headers['Content-Encoding'] == 'br'
+        assert response.headers['Etag'].endswith('-br"')
+        assert response.body == b'br'
+
+    def test_versioned_build_file_is_immutable(self: 'TestFrontendHandler') -> None:
+        """A build file requested with its current version token is cached as immutable."""
+        version = self.assets.get('build/bundle.js').version
+        assert f'/app/build/bundle.js?v={version}' in self.assets.index.variants['identity'].decode('utf-8')
+        response = self.fetch(f'/app/build/bundle.js?v={version}')
+        assert response.headers['Cache-Control'] == frontend.IMMUTABLE_CACHE_CONTROL
+
+    def test_unversioned_build_file_is_revalidated(self: 'TestFrontendHandler') -> None:
+        """A build file requested without or with an outdated version token must be revalidated."""
+        assert self.fetch('/app/build/bundle.js').headers['Cache-Control'] == frontend.REVALIDATE_CACHE_CONTROL
+        response = self.fetch('/app/build/bundle.js?v=outdated')
+        assert response.headers['Cache-Control'] == frontend.REVALIDATE_CACHE_CONTROL
+
+    def test_index_is_revalidated(self: 'TestFrontendHandler') -> None:
+        """The index and unknown paths, which get the index, must be revalidated."""
+        for path in ('/app/index.html', '/app/some/route'):
+            response = self.fetch(path)
+            assert response.headers['Cache-Control'] == frontend.REVALIDATE_CACHE_CONTROL
+            assert response.body == self.assets.index.variants['identity']
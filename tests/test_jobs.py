@@ -0,0 +1,93 @@
+"""Tests for the container job queue."""
+import asyncio
+
+from time import monotonic
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application
+from unittest import mock
+
+from container_launcher.server import jobs
+from container_launcher.server.jobs import ContainerJobQueue
+from container_launcher.server.jupyterhub import JupyterHubClient
+
+from .stub_hub import HubState, make_app
+
+
+class TestContainerJobQueue(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.jobs.ContainerJobQueue` against a stub hub."""
+
+    def get_app(self: 'TestContainerJobQueue') -> Application:
+        """Create the stub hub."""
+        self.hub = HubState()
+        self.hub.spawn_time = 0.1
+        return make_app(self.hub)
+
+    def setUp(self: 'TestContainerJobQueue') -> None:
+        """Create a job queue that uses the stub hub and polls quickly."""
+        super().setUp()
+        client = JupyterHubClient('token', 10, 5, 60)
+        for patcher in [mock.patch.object(jobs, 'get_jupyterhub_client', lambda: client),
+                        mock.patch.object(jobs, 'get_container_watchers'),
+                        mock.patch.object(jobs, 'COMPLETION_POLL_INTERVAL', 0.02)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.queue = ContainerJobQueue(2, 1, 10, 10)
+        self.container = {'name': 'container', 'host': self.get_url('/')}
+
+    async def wait(self: 'TestContainerJobQueue', job: jobs.ContainerJob) -> list[str]:
+        """Wait for a job to finish.
+
+        :return: The statuses of the job
+        :rtype: list[str]
+        """
+        statuses = []
+        finished = asyncio.Event()
+
+        def listener(job: jobs.ContainerJob) -> None:
+            statuses.append(job.status)
+            if job.status in ('completed', 'failed'):
+                finished.set()
+
+        job.add_listener(listener)
+        await finished.wait()
+        await asyncio.sleep(0)
+        return statuses
+
+    @gen_test
+    async def test_start_completes_once_running(self: 'TestContainerJobQueue') -> None:
+        """A start job completes once the server is ready."""
+        statuses = await self.wait(self.queue.submit('user', self.container, 'start'))
+        assert statuses == ['running', 'completed']
+        assert self.hub.users['user']['servers']['container']['ready']
+        assert self.queue.completed == 1
+        assert self.queue.length == 0
+
+    @gen_test
+    async def test_failed_spawn_fails_job(self: 'TestContainerJobQueue') -> None:
+        """A spawn that returns to stopped fails the job straight away and releases its slots."""
+        self.hub.fail_spawns = True
+        start = monotonic()
+        job = self.queue.submit('user', self.container, 'start')
+        statuses = await self.wait(job)
+        assert statuses == ['running', 'failed']
+        assert job.message == 'The container could not be started'
+        assert monotonic() - start < 2
+        assert self.queue.failed == 1
+        assert self.queue.length == 0
+        self.hub.fail_spawns = False
+        statuses = await self.wait(self.queue.submit('user', self.container, 'start'))
+        assert statuses == ['running', 'completed']
+
+    @gen_test
+    async def test_stop_waits_for_start(self: 'TestContainerJobQueue') -> None:
+        """A stop job for a starting server only stops it once it has started."""
+        self.hub.users['user'] = {'name': 'user', 'servers': {
+            'container': {'name': 'container', 'ready': False, 'pending': 'spawn', 'url': None}}}
+        job = self.queue.submit('user', self.container, 'stop')
+        await asyncio.sleep(0.1)
+        assert self.hub.count('DELETE') == 0
+        assert job.status == 'running'
+        self.hub.users['user']['servers']['container'].update({'ready': True, 'pending': None})
+        assert await self.wait(job) == ['completed']
+        assert self.hub.count('DELETE') == 1
+        assert self.hub.users['user']['servers'] == {}
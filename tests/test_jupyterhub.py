@@ -0,0 +1,156 @@
+"""Tests for the JupyterHub API client."""
+import asyncio
+
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application
+from unittest import mock
+
+from container_launcher.server import jupyterhub
+from container_launcher.server.jupyterhub import JupyterHubClient, server_state
+
+from .stub_hub import HubState, make_app
+
+
+def test_server_state() -> None:
+    """Server models map onto the container states sent to the client."""
+    assert server_state('http://hub/', None) == {'state': 'paused'}
+    assert server_state('http://hub/', {'pending': 'spawn', 'ready': False}) == {'state': 'starting'}
+    assert server_state('http://hub/', {'pending': 'stop', 'ready': True}) == {'state': 'stopping'}
+    assert server_state('http://hub/', {'pending': None, 'ready': True, 'url': '/user/a/b/'}) == {
+        'state': 'running', 'url': 'http://hub/user/a/b/'}
+    assert server_state('http://hub/', {'pending': None, 'ready': False}) == {'state': 'paused'}
+    assert server_state('http://proxy/jhub', {'pending': None, 'ready': True, 'url': 'user/a/b/'}) == {
+        'state': 'running', 'url': 'http://proxy/jhub/user/a/b/'}
+
+
+class TestJupyterHubClient(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.jupyterhub.JupyterHubClient` against a stub hub."""
+
+    def get_app(self: 'TestJupyterHubClient') -> Application:
+        """Create the stub hub."""
+        self.hub = HubState()
+        return make_app(self.hub)
+
+    def setUp(self: 'TestJupyterHubClient') -> None:
+        """Create a client for the stub hub, with the proxy disabled."""
+        super().setUp()
+        patcher = mock.patch.object(jupyterhub, 'config', lambda: {'server': {'proxy': {'enabled': False}}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.host = self.get_url('/')
+        self.client = JupyterHubClient('token', 10, 5, 60)
+        self.hub.users['user'] = {'name': 'user', 'servers': {
+            'running': {'name': 'running', 'ready': True, 'pending': None, 'url': '/user/user/running/'},
+            'starting': {'name': 'starting', 'ready': False, 'pending': 'spawn', 'url': None},
+        }}
+
+    @gen_test
+    async def test_container_states(self: 'TestJupyterHubClient') -> None:
+        """The servers on each hub map onto the container states, with unreachable hubs reported as unknown."""
+        states = await self.client.container_states('user', [
+            {'name': 'running', 'host': self.host},
+            {'name': 'starting', 'host': self.host},
+            {'name': 'paused', 'host': self.host},
+            {'name': 'elsewhere', 'host': 'http://127.0.0.1:1/'},
+        ])
+        assert states == {
+            'running': {'state': 'running', 'url': f'{self.host}user/user/running/'},
+            'starting': {'state': 'starting'},
+            'paused': {'state': 'paused'},
+            'elsewhere': {'state': 'unknown'},
+        }
+        assert self.hub.count('GET') == 1
+
+    @gen_test
+    async def test_unknown_user_has_no_servers(self: 'TestJupyterHubClient') -> None:
+        """A user that does not exist in the hub has no servers."""
+        assert await self.client.user_servers(self.host, 'nobody') == {}
+
+    @gen_test
+    async def test_concurrent_requests_are_shared(self: 'TestJupyterHubClient') -> None:
+        """Concurrent requests for the servers of the same user share a single request to the hub."""
+        self.hub.latency = 0.1
+        results = await asyncio.gather(*[self.client.user_servers(self.host, 'user') for _ in range(20)])
+        assert self.hub.count('GET') == 1
+        assert all(result is results[0] for result in results)
+        assert set(results[0]) == {'running', 'starting'}
+
+    @gen_test
+    async def test_servers_are_cached(self: 'TestJupyterHubClient') -> None:
+        """The servers are cached for ``state_ttl`` seconds, unless a lower maximum age is requested."""
+        await self.client.user_servers(self.host, 'user')
+        await self.client.user_servers(self.host, 'user')
+        await self.client.user_servers(self.host, 'user', max_age=30)
+        assert self.hub.count('GET') == 1
+        await self.client.user_servers(self.host, 'user', max_age=0)
+        assert self.hub.count('GET') == 2
+
+    @gen_test
+    async def test_invalidate_discards_cached_servers(self: 'TestJupyterHubClient') -> None:
+        """Invalidating the servers of a user makes the next request fetch them from the hub."""
+        await self.client.user_servers(self.host, 'user')
+        self.hub.users['user']['servers'].pop('running')
+        self.client.invalidate(self.host, 'user')
+        assert set(await self.client.user_servers(self.host, 'user')) == {'starting'}
+        assert self.hub.count('GET') == 2
+
+    @gen_test
+    async def test_invalidate_during_load(self: 'TestJupyterHubClient') -> None:
+        """A load in progress during an invalidation is neither shared with later requests nor cached."""
+        self.hub.latency = 0.1
+        stale = asyncio.ensure_future(self.client.user_servers(self.host, 'user'))
+        await asyncio.sleep(0.05)
+        self.client.invalidate(self.host, 'user')
+        self.hub.users['user']['servers'].pop('running')
+        self.hub.latency = 0
+        fresh = await self.client.user_servers(self.host, 'user')
+        assert set(fresh) == {'starting'}
+        assert set(await stale) == {'running', 'starting'}
+        assert self.hub.count('GET') == 2
+        assert await self.client.user_servers(self.host, 'user') is fresh
+        assert self.hub.count('GET') == 2
+
+    @gen_test
+    async def test_start_and_stop_server(self: 'TestJupyterHubClient') -> None:
+        """Starting a server creates the user if needed and both starting and stopping invalidate the cache."""
+        self.hub.spawn_time = 0.1
+        await self.client.user_servers(self.host, 'new')
+        await self.client.start_server(self.host, 'new', 'server')
+        assert self.hub.count('POST', '/hub/api/users/new') == 1
+        assert server_state(self.host, (await self.client.user_servers(self.host, 'new'))['server']) == {
+            'state': 'starting'}
+        await self.client.start_server(self.host, 'new', 'server')
+        assert self.hub.count('POST', '/hub/api/users/new/servers/server') == 1
+        await self.client.stop_server(self.host, 'new', 'server')
+        assert await self.client.user_servers(self.host, 'new') == {}
+        await asyncio.sleep(0.1)
+
+
+class TestJupyterHubClientBelowPath(AsyncHTTPTestCase):
+    """Tests for a hub that is served below a path, configured without a trailing ``/``."""
+
+    def get_app(self: 'TestJupyterHubClientBelowPath') -> Application:
+        """Create the stub hub below ``/jhub``."""
+        self.hub = HubState()
+        self.hub.prefix = '/jhub'
+        return make_app(self.hub)
+
+    def setUp(self: 'TestJupyterHubClientBelowPath') -> None:
+        """Create a client for the stub hub, with the proxy disabled."""
+        super().setUp()
+        patcher = mock.patch.object(jupyterhub, 'config', lambda: {'server': {'proxy': {'enabled': False}}})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.host = self.get_url('/jhub')
+        self.client = JupyterHubClient('token', 10, 5, 60)
+
+    @gen_test
+    async def test_start_server(self: 'TestJupyterHubClientBelowPath') -> None:
+        """Requests keep the hub's path and running servers get their URL below it."""
+        self.hub.spawn_time = 0.01
+        await self.client.start_server(self.host, 'user', 'server')
+        assert self.hub.count('POST', '/jhub/hub/api/users/user/servers/server') == 1
+        await asyncio.sleep(0.05)
+        servers = await self.client.user_servers(self.host, 'user', max_age=0)
+        assert server_state(self.host, servers['server']) == {
+            'state': 'running', 'url': self.get_url('/jhub/user/user/server/')}
@@ -0,0 +1,92 @@
+"""Tests for the logout handler."""
+import re
+
+from datetime import datetime, timedelta, timezone
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, create_signed_value
+from unittest import mock
+from urllib.parse import urlencode
+
+from container_launcher.server import session
+from container_launcher.server.containers import ContainerIndex
+from container_launcher.server.handlers import logout
+from container_launcher.server.handlers.logout import LogoutHandler
+from container_launcher.server.session import MemorySessionBackend
+
+
+CONTAINERS = [{'name': 'container', 'title': 'Container', 'description': '', 'host': 'http://hub/',
+               'groups': ['course']}]
+SETTINGS = {'server': {'session': {'name': 'compute_home_session', 'validity_days': 1}}}
+
+
+class TestLogoutHandler(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.handlers.logout.LogoutHandler`."""
+
+    def get_app(self: 'TestLogoutHandler') -> Application:
+        """Create an application that only serves the logout, with XSRF protection as in the server."""
+        return Application([('/logout', LogoutHandler)], cookie_secret='secret', xsrf_cookies=True)
+
+    def setUp(self: 'TestLogoutHandler') -> None:
+        """Log a user in and stub the snapshot, the user cache and the idle culler."""
+        super().setUp()
+        self.backend = MemorySessionBackend()
+        self.culler = mock.Mock()
+        snapshot = mock.Mock(config={'app': {'vle': {'url': ''}}}, container_index=ContainerIndex(CONTAINERS))
+        user_cache = mock.Mock(get=mock.AsyncMock(return_value=mock.Mock(id=1, group_ids=frozenset(['course']))))
+        for patcher in [mock.patch.object(session, 'config', lambda: SETTINGS),
+                        mock.patch.object(session, 'backend', self.backend),
+                        mock.patch.object(logout, 'get_snapshot', return_value=snapshot),
+                        mock.patch.object(logout, 'get_user_cache', return_value=user_cache),
+                        mock.patch.object(logout, 'get_idle_culler', return_value=self.culler)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.io_loop.run_sync(lambda: self.backend.save('session-id', {'user_id': 1},
+                                                        datetime.now(timezone.utc) + timedelta(days=1)))
+        session_cookie = create_signed_value('secret', 'compute_home_session', 'session-id').decode('utf-8')
+        self.cookie = f'compute_home_session={session_cookie}'
+
+    def session_data(self: 'TestLogoutHandler') -> dict | None:
+        """Get the data stored for the logged in session."""
+        return self.io_loop.run_sync(lambda: self.backend.load('session-id'))
+
+    def confirm(self: 'TestLogoutHandler') -> tuple[str, str]:
+        """Get the confirmation page and return the XSRF cookie and form value."""
+        response = self.fetch('/logout', headers={'Cookie': self.cookie})
+        assert response.code == 200
+        xsrf_cookie = re.search(r'_xsrf=([^;]+)', response.headers['Set-Cookie']).group(1)
+        xsrf_value = re.search(r'name="_xsrf" value="([^"]+)"', response.body.decode('utf-8')).group(1)
+        return xsrf_cookie, xsrf_value
+
+    def test_get_only_asks_for_confirmation(self: 'TestLogoutHandler') -> None:
+        """Following a link to the logout neither logs the user out nor stops any containers."""
+        response = self.fetch('/logout', headers={'Cookie': self.cookie})
+        assert response.code == 200
+        assert b'<form method="post" action="/logout">' in response.body
+        assert self.session_data() == {'user_id': 1}
+        self.culler.shutdown.assert_not_called()
+
+    def test_get_without_login_redirects(self: 'TestLogoutHandler') -> None:
+        """A user who is not logged in is sent back to the application."""
+        response = self.fetch('/logout', follow_redirects=False)
+        assert response.code == 302
+        assert response.headers['Location'] == '/app'
+
+    def test_post_without_xsrf_is_rejected(self: 'TestLogoutHandler') -> None:
+        """A cross-site logout request is rejected without stopping any containers."""
+        response = self.fetch('/logout', method='POST', body='', headers={'Cookie': self.cookie},
+                              follow_redirects=False)
+        assert response.code == 403
+        assert self.session_data() == {'user_id': 1}
+        self.culler.shutdown.assert_not_called()
+
+    def test_post_logs_out_and_stops_containers(self: 'TestLogoutHandler') -> None:
+        """A confirmed logout ends the session, giving it a new id, and stops the user's containers."""
+        xsrf_cookie, xsrf_value = self.confirm()
+        response = self.fetch('/logout', method='POST', body=urlencode({'_xsrf': xsrf_value}),
+                              headers={'Cookie': f'{self.cookie}; _xsrf={xsrf_cookie}'}, follow_redirects=False)
+        assert response.code == 302
+        assert response.headers['Location'] == '/app'
+        assert self.session_data() is None
+        assert any(cookie.startswith('compute_home_session=') and self.cookie not in cookie
+                   for cookie in response.headers.get_list('Set-Cookie'))
+        self.culler.shutdown.assert_called_once_with('1', [CONTAINERS[0]])
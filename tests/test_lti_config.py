@@ -0,0 +1,121 @@
+"""Tests for the platform key set cache."""
+import asyncio
+
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application, RequestHandler
+from unittest import mock
+
+from container_launcher.server import lti_config
+from container_launcher.server.lti_config import KeySetCache, MIN_REFRESH_INTERVAL
+
+
+class KeySetHandler(RequestHandler):
+    """Stub JWKS endpoint that counts its requests."""
+
+    def initialize(self: 'KeySetHandler', state: dict) -> None:
+        """Use the shared stub state."""
+        self.state = state
+
+    async def get(self: 'KeySetHandler') -> None:
+        """Send the current key set."""
+        self.state['hits'] += 1
+        if self.state['delay']:
+            await asyncio.sleep(self.state['delay'])
+        if self.state['fail']:
+            self.set_status(500)
+            return
+        self.write({'keys': [{'kid': kid, 'kty': 'RSA'} for kid in self.state['kids']]})
+
+
+class TestKeySetCache(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.lti_config.KeySetCache` against a stub JWKS server."""
+
+    def get_app(self: 'TestKeySetCache') -> Application:
+        """Create the stub JWKS server."""
+        self.state = {'hits': 0, 'delay': 0, 'fail': False, 'kids': ['k1']}
+        return Application([('/jwks', KeySetHandler, {'state': self.state})])
+
+    def setUp(self: 'TestKeySetCache') -> None:
+        """Create a cache for the stub server with a controllable clock."""
+        super().setUp()
+        self.now = 1000.0
+        patcher = mock.patch.object(lti_config, 'monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = KeySetCache({'http://platform': self.get_url('/jwks')}, {'http://platform': 300})
+
+    def kids(self: 'TestKeySetCache') -> list[str]:
+        """Get the key ids in the cached key set."""
+        return [key['kid'] for key in self.cache.get('http://platform')['keys']]
+
+    @gen_test
+    async def test_cached_until_ttl_expires(self: 'TestKeySetCache') -> None:
+        """The key set is fetched once and fetched again only after the TTL."""
+        await self.cache.ensure('http://platform')
+        await self.cache.ensure('http://platform', 'k1')
+        self.now += 299
+        await self.cache.ensure('http://platform')
+        assert self.state['hits'] == 1
+        self.state['kids'] = ['k2']
+        self.now += 2
+        await self.cache.ensure('http://platform')
+        assert self.state['hits'] == 2
+        assert self.kids() == ['k2']
+
+    @gen_test
+    async def test_unknown_issuer_is_ignored(self: 'TestKeySetCache') -> None:
+        """Issuers without a configured key set URL are not fetched."""
+        await self.cache.ensure('http://other')
+        assert self.state['hits'] == 0
+        assert self.cache.get('http://other') is None
+
+    @gen_test
+    async def test_refresh_on_unknown_kid(self: 'TestKeySetCache') -> None:
+        """A key id that is not in the cached key set triggers a refresh."""
+        await self.cache.ensure('http://platform', 'k1')
+        self.state['kids'] = ['k1', 'k2']
+        self.now += MIN_REFRESH_INTERVAL + 1
+        await self.cache.ensure('http://platform', 'k2')
+        assert self.state['hits'] == 2
+        assert self.kids() == ['k1', 'k2']
+        self.now += MIN_REFRESH_INTERVAL + 1
+        await self.cache.ensure('http://platform', 'k2')
+        assert self.state['hits'] == 2
+
+    @gen_test
+    async def test_unknown_kid_refresh_is_rate_limited(self: 'TestKeySetCache') -> None:
+        """Unknown key ids refresh the key set at most once per ``MIN_REFRESH_INTERVAL``."""
+        await self.cache.ensure('http://platform', 'k1')
+        for _ in range(5):
+            self.now += 1
+            await self.cache.ensure('http://platform', 'bogus')
+        assert self.state['hits'] == 1
+        self.now += MIN_REFRESH_INTERVAL
+        await self.cache.ensure('http://platform', 'bogus')
+        await self.cache.ensure('http://platform', 'bogus')
+        assert self.state['hits'] == 2
+
+    @gen_test
+    async def test_concurrent_fetches_are_shared(self: 'TestKeySetCache') -> None:
+        """Concurrent requests for the same issuer share a single fetch."""
+        self.state['delay'] = 0.1
+        await asyncio.gather(*[self.cache.ensure('http://platform', 'k1') for _ in range(20)])
+        assert self.state['hits'] == 1
+        assert self.kids() == ['k1']
+
+    @gen_test
+    async def test_failed_refresh_keeps_cached_key_set(self: 'TestKeySetCache') -> None:
+        """If a refresh fails, the previously fetched key set remains in use."""
+        await self.cache.ensure('http://platform')
+        self.state['fail'] = True
+        self.now += 301
+        await self.cache.ensure('http://platform')
+        assert self.state['hits'] == 2
+        assert self.kids() == ['k1']
+
+    @gen_test
+    async def test_failed_first_fetch_raises(self: 'TestKeySetCache') -> None:
+        """If there is no cached key set, a failed fetch raises an error."""
+        self.state['fail'] = True
+        with self.assertRaises(lti_config.LtiException):
+            await self.cache.ensure('http://platform')
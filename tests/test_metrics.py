@@ -0,0 +1,76 @@
+"""Tests for the Prometheus metrics endpoint."""
+import pytest
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application
+from unittest import mock
+
+from container_launcher.cli import validate_config
+
+pytest.importorskip('prometheus_client')
+
+from container_launcher.server.handlers import metrics  # noqa: E402
+from container_launcher.server.handlers.metrics import MetricsHandler  # noqa: E402
+
+
+class TestMetricsHandler(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.handlers.metrics.MetricsHandler`."""
+
+    token = 'secret'
+
+    def get_app(self: 'TestMetricsHandler') -> Application:
+        """Create an application that only serves the metrics."""
+        return Application([('/metrics', MetricsHandler)])
+
+    def setUp(self: 'TestMetricsHandler') -> None:
+        """Configure the metrics token and stub the metrics."""
+        super().setUp()
+        for patcher in [mock.patch.object(metrics, 'config', lambda: {'server': {'metrics': {'token': self.token}}}),
+                        mock.patch.object(metrics, 'get_metrics',
+                                          return_value=mock.Mock(generate=lambda: b'compute_home_test 1.0\n'))]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_missing_token(self: 'TestMetricsHandler') -> None:
+        """Requests without the token are rejected."""
+        response = self.fetch('/metrics')
+        assert response.code == 401
+        assert response.headers['WWW-Authenticate'] == 'Bearer'
+
+    def test_wrong_token(self: 'TestMetricsHandler') -> None:
+        """Requests with the wrong token are rejected."""
+        assert self.fetch('/metrics', headers={'Authorization': 'Bearer wrong'}).code == 401
+        assert self.fetch('/metrics', headers={'Authorization': 'secret'}).code == 401
+
+    def test_valid_token(self: 'TestMetricsHandler') -> None:
+        """Requests with the token receive the metrics."""
+        response = self.fetch('/metrics', headers={'Authorization': 'Bearer secret'})
+        assert response.code == 200
+        assert b'compute_home_' in response.body
+
+
+class TestMetricsHandlerWithoutToken(TestMetricsHandler):
+    """Tests for :class:`~container_launcher.server.handlers.metrics.MetricsHandler` without a token."""
+
+    token = ''
+
+    def test_missing_token(self: 'TestMetricsHandlerWithoutToken') -> None:
+        """Requests without a token receive the metrics."""
+        assert self.fetch('/metrics').code == 200
+
+    def test_wrong_token(self: 'TestMetricsHandlerWithoutToken') -> None:
+        """Any token is ignored."""
+        assert self.fetch('/metrics', headers={'Authorization': 'Bearer wrong'}).code == 200
+
+
+def test_metrics_disabled_by_default() -> None:
+    """The metrics endpoint must be enabled explicitly."""
+    settings = validate_config({
+        'app': {'containers': []},
+        'server': {'cookie_secret': 'secret'},
+        'database': {'dsn': 'sqlite+aiosqlite://'},
+        'lti': [{'iss': 'http://platform', 'client_id': 'client', 'auth_login_url': 'http://platform/auth',
+                 'auth_token_url': 'http://platform/token', 'key_set_url': 'http://platform/jwks',
+                 'private_key_file': 'private.pem', 'public_key_file': 'public.pem', 'deployment_ids': ['1']}],
+    })
+    assert settings['server']['metrics'] == {'enabled': False, 'token': ''}
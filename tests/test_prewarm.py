@@ -0,0 +1,128 @@
+"""Tests for the prewarm scheduler."""
+import asyncio
+import tempfile
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from tornado.testing import AsyncHTTPTestCase, gen_test
+from tornado.web import Application
+from typing import Callable
+from unittest import mock
+
+from container_launcher.models import Base, Group, User
+from container_launcher.server import jobs, jupyterhub, prewarm
+from container_launcher.server.jobs import ContainerJobQueue
+from container_launcher.server.jupyterhub import JupyterHubClient
+from container_launcher.server.prewarm import PrewarmScheduler
+
+from .stub_hub import HubState, make_app
+
+
+class TestPrewarmScheduler(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.prewarm.PrewarmScheduler` against a stub hub."""
+
+    def get_app(self: 'TestPrewarmScheduler') -> Application:
+        """Create the stub hub."""
+        self.hub = HubState()
+        self.hub.spawn_time = 0.05
+        return make_app(self.hub)
+
+    def setUp(self: 'TestPrewarmScheduler') -> None:
+        """Create a scheduler that uses the stub hub, a job queue and a database with three group members."""
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.engine = create_async_engine(f'sqlite+aiosqlite:///{directory.name}/test.sqlite')
+        self.io_loop.run_sync(self.create_members)
+        client = JupyterHubClient('token', 10, 5, 60)
+        self.queue = ContainerJobQueue(2, 1, 10, 10)
+        session_factory = sessionmaker(self.engine, class_=AsyncSession)
+        for patcher in [mock.patch.object(prewarm, 'get_jupyterhub_client', lambda: client),
+                        mock.patch.object(prewarm, 'get_job_queue', lambda: self.queue),
+                        mock.patch.object(prewarm, 'get_sessionmaker', lambda: session_factory),
+                        mock.patch.object(jobs, 'get_jupyterhub_client', lambda: client),
+                        mock.patch.object(jobs, 'get_container_watchers'),
+                        mock.patch.object(jobs, 'COMPLETION_POLL_INTERVAL', 0.02),
+                        mock.patch.object(jupyterhub, 'config', lambda: {'server': {'proxy': {'enabled': False}}})]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.scheduler = PrewarmScheduler(60, 900)
+        self.container = {'name': 'container', 'host': self.get_url('/'), 'groups': ['course']}
+
+    def tearDown(self: 'TestPrewarmScheduler') -> None:
+        """Close the database connections before the event loop is closed."""
+        self.io_loop.run_sync(self.engine.dispose)
+        super().tearDown()
+
+    async def create_members(self: 'TestPrewarmScheduler') -> None:
+        """Create the schema and three members of the container's group, with the ids 1 to 3."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with sessionmaker(self.engine, class_=AsyncSession)() as dbsession:
+            dbsession.add(Group(external_id='course', attributes={},
+                                users=[User(external_id=f'user-{idx}', attributes={}) for idx in range(3)]))
+            await dbsession.commit()
+
+    def server(self: 'TestPrewarmScheduler', user_name: str) -> dict | None:
+        """Get a user's server for the container from the stub hub."""
+        return self.hub.users.get(user_name, {'servers': {}})['servers'].get('container')
+
+    async def wait_for(self: 'TestPrewarmScheduler', condition: Callable[[], bool]) -> None:
+        """Wait until the condition holds."""
+        for _ in range(100):
+            if condition():
+                return
+            await asyncio.sleep(0.02)
+        raise AssertionError('The condition did not hold in time')
+
+    async def prewarm_ready(self: 'TestPrewarmScheduler', user_name: str) -> None:
+        """Prewarm a container, wait until it is ready and let the scheduler see that it is ready."""
+        await self.scheduler._prewarm(self.container, 1)
+        await self.wait_for(lambda: self.queue.length == 0)
+        assert self.server(user_name)['ready']
+        await self.scheduler._prewarm(self.container, 1)
+
+    @gen_test
+    async def test_unused_container_is_stopped(self: 'TestPrewarmScheduler') -> None:
+        """A prewarmed container that spawned but was never used is stopped when the size drops to zero."""
+        await self.prewarm_ready('1')
+        assert self.server('1')['last_activity']
+        await self.scheduler._prewarm(self.container, 0)
+        await self.wait_for(lambda: self.server('1') is None)
+        assert self.hub.count('DELETE') == 1
+
+    @gen_test
+    async def test_stop_is_retried_while_starting(self: 'TestPrewarmScheduler') -> None:
+        """A prewarmed container that is still being started when the size drops to zero is stopped in a later run."""
+        await self.scheduler._prewarm(self.container, 1)
+        await self.scheduler._prewarm(self.container, 0)
+        await self.wait_for(lambda: self.queue.length == 0)
+        assert self.server('1')['ready']
+        await self.scheduler._prewarm(self.container, 0)
+        await self.wait_for(lambda: self.server('1') is None)
+
+    @gen_test
+    async def test_used_container_is_kept(self: 'TestPrewarmScheduler') -> None:
+        """A prewarmed container on which the hub has seen activity after it became ready is kept running."""
+        await self.prewarm_ready('1')
+        activity = datetime.now(timezone.utc) + timedelta(seconds=1)
+        self.server('1')['last_activity'] = activity.isoformat().replace('+00:00', 'Z')
+        await self.scheduler._prewarm(self.container, 0)
+        await asyncio.sleep(0.1)
+        assert self.server('1')['ready']
+        assert self.hub.count('DELETE') == 0
+
+    @gen_test
+    async def test_members_are_taken_in_turn(self: 'TestPrewarmScheduler') -> None:
+        """Once a prewarmed container has been stopped, the next member's container is prewarmed."""
+        await self.prewarm_ready('1')
+        assert list(self.hub.users) == ['1']
+        for user_name in ('1', '2'):
+            await self.wait_for(lambda: self.queue.length == 0)
+            del self.hub.users[user_name]['servers']['container']
+            await self.scheduler._prewarm(self.container, 1)
+        await self.wait_for(lambda: self.queue.length == 0)
+        assert self.server('3')['ready']
+        assert self.server('1') is None
+        assert self.server('2') is None
@@ -0,0 +1,185 @@
+"""Tests for the reverse proxy to the container hosts."""
+import json
+import re
+
+from datetime import datetime, timedelta, timezone
+from tornado.http1connection import HTTP1Connection, HTTP1ConnectionParameters
+from tornado.httpserver import HTTPServer
+from tornado.httputil import HTTPHeaders, HTTPMessageDelegate, RequestStartLine, ResponseStartLine
+from tornado.iostream import IOStream
+from tornado.tcpclient import TCPClient
+from tornado.testing import AsyncHTTPTestCase, bind_unused_port, gen_test
+from tornado.web import Application, RequestHandler, create_signed_value
+from unittest import mock
+from urllib.parse import urlencode
+
+from container_launcher.server import proxy, session
+from container_launcher.server.containers import ContainerIndex
+from container_launcher.server.handlers import logout
+from container_launcher.server.handlers import proxy as proxy_handlers
+from container_launcher.server.handlers.logout import LogoutHandler
+from container_launcher.server.handlers.proxy import ContainerProxyHandler
+from container_launcher.server.proxy import UpstreamPool
+from container_launcher.server.session import MemorySessionBackend
+
+
+SETTINGS = {'server': {'session': {'name': 'compute_home_session', 'validity_days': 1}}}
+
+
+class EchoHandler(RequestHandler):
+    """Container host that answers every request with a description of the request."""
+
+    def echo(self: 'EchoHandler', path: str) -> None:
+        """Send the method, target, cookies and body of the request."""
+        self.write({'method': self.request.method, 'uri': self.request.uri,
+                    'cookie': self.request.headers.get('Cookie'), 'body': self.request.body.decode('utf-8')})
+
+    get = post = echo
+
+    def check_xsrf_cookie(self: 'EchoHandler') -> None:
+        """Accept all requests."""
+        pass
+
+
+class Response(HTTPMessageDelegate):
+    """Collects a response read from a client connection."""
+
+    def __init__(self: 'Response') -> None:
+        """Create an empty response."""
+        self.code = None
+        self.headers = None
+        self.body = b''
+
+    def headers_received(self: 'Response', start_line: ResponseStartLine, headers: HTTPHeaders) -> None:
+        """Store the status and headers."""
+        self.code = start_line.code
+        self.headers = headers
+
+    def data_received(self: 'Response', chunk: bytes) -> None:
+        """Store a chunk of the body."""
+        self.body = self.body + chunk
+
+
+class TestContainerProxy(AsyncHTTPTestCase):
+    """Tests for :class:`~container_launcher.server.handlers.proxy.ContainerProxyHandler` against an echo host."""
+
+    def get_app(self: 'TestContainerProxy') -> Application:
+        """Create an application that serves the proxy and the logout, with XSRF protection as in the server."""
+        return Application([('/logout', LogoutHandler), ('/containers/([^/]+)/(.*)', ContainerProxyHandler)],
+                           cookie_secret='secret', xsrf_cookies=True)
+
+    def setUp(self: 'TestContainerProxy') -> None:
+        """Start the echo host, log a user in and stub the snapshot, the user cache and the idle culler."""
+        super().setUp()
+        sock, port = bind_unused_port()
+        self.host_server = HTTPServer(Application([('/(.*)', EchoHandler)]))
+        self.host_server.add_sockets([sock])
+        containers = [{'name': 'container', 'title': 'Container', 'description': '',
+                       'host': f'http://127.0.0.1:{port}/jhub/', 'groups': ['course']},
+                      {'name': 'other', 'title': 'Other', 'description': '', 'host': f'http://127.0.0.1:{port}/',
+                       'groups': ['other']}]
+        self.backend = MemorySessionBackend()
+        self.user_cache = mock.Mock(get=mock.AsyncMock(return_value=mock.Mock(id=1, group_ids=frozenset(['course']))))
+        self.clock = mock.Mock(return_value=1000.0)
+        snapshot = mock.Mock(config={'app': {'vle': {'url': ''}}}, container_index=ContainerIndex(containers))
+        for patcher in [mock.patch.object(session, 'config', lambda: SETTINGS),
+                        mock.patch.object(session, 'backend', self.backend),
+                        mock.patch.object(proxy_handlers, 'config', lambda: SETTINGS),
+                        mock.patch.object(proxy_handlers, 'get_snapshot', return_value=snapshot),
+                        mock.patch.object(proxy_handlers, 'get_user_cache', return_value=self.user_cache),
+                        mock.patch.object(proxy_handlers, 'monotonic', self.clock),
+                        mock.patch.object(proxy, 'pool', UpstreamPool(10, 30, 10)),
+                        mock.patch.object(logout, 'get_snapshot', return_value=snapshot),
+                        mock.patch.object(logout, 'get_user_cache', return_value=self.user_cache),
+                        mock.patch.object(logout, 'get_idle_culler')]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.io_loop.run_sync(lambda: self.backend.save('session-id', {'user_id': 1},
+                                                        datetime.now(timezone.utc) + timedelta(days=1)))
+        session_cookie = create_signed_value('secret', 'compute_home_session', 'session-id').decode('utf-8')
+        self.cookie = f'compute_home_session={session_cookie}'
+
+    def tearDown(self: 'TestContainerProxy') -> None:
+        """Stop the echo host before the event loop is closed."""
+        self.host_server.stop()
+        super().tearDown()
+
+    async def connect(self: 'TestContainerProxy') -> IOStream:
+        """Open a keep-alive client connection to the proxy."""
+        return await TCPClient().connect('127.0.0.1', self.get_http_port())
+
+    async def request(self: 'TestContainerProxy', stream: IOStream, method: str, path: str, cookie: str | None,
+                      body: bytes = b'') -> Response:
+        """Send a request on a client connection and read the response.
+
+        :return: The response
+        :rtype: :class:`~tests.test_proxy.Response`
+        """
+        headers = HTTPHeaders({'Host': '127.0.0.1', 'Content-Length': str(len(body))})
+        if cookie:
+            headers['Cookie'] = cookie
+        if method == 'POST':
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        connection = HTTP1Connection(stream, True, HTTP1ConnectionParameters())
+        await connection.write_headers(RequestStartLine(method, path, 'HTTP/1.1'), headers)
+        if body:
+            await connection.write(body)
+        connection.finish()
+        response = Response()
+        await connection.read_response(response)
+        return response
+
+    @gen_test
+    async def test_request_is_proxied(self: 'TestContainerProxy') -> None:
+        """A request is sent to the container's host below its path, without the session cookie."""
+        stream = await self.connect()
+        response = await self.request(stream, 'POST', '/containers/container/api/x?a=1',
+                                      f'{self.cookie}; other=value', b'data')
+        assert response.code == 200
+        assert json.loads(response.body) == {'method': 'POST', 'uri': '/jhub/api/x?a=1', 'cookie': 'other=value',
+                                             'body': 'data'}
+
+    @gen_test
+    async def test_authorisation_is_cached_per_connection(self: 'TestContainerProxy') -> None:
+        """Further requests on a keep-alive connection do not look the user up again."""
+        stream = await self.connect()
+        for _ in range(3):
+            assert (await self.request(stream, 'GET', '/containers/container/', self.cookie)).code == 200
+        assert self.user_cache.get.await_count == 1
+
+    @gen_test
+    async def test_login_required(self: 'TestContainerProxy') -> None:
+        """Requests without a logged in user are rejected."""
+        stream = await self.connect()
+        assert (await self.request(stream, 'GET', '/containers/container/', None)).code == 403
+
+    @gen_test
+    async def test_unavailable_container(self: 'TestContainerProxy') -> None:
+        """Requests for a container that is not available to the user are rejected."""
+        stream = await self.connect()
+        assert (await self.request(stream, 'GET', '/containers/other/', self.cookie)).code == 404
+
+    @gen_test
+    async def test_logout_ends_authorisation_on_connection(self: 'TestContainerProxy') -> None:
+        """After a logout on the same keep-alive connection, proxied requests are rejected."""
+        stream = await self.connect()
+        assert (await self.request(stream, 'GET', '/containers/container/', self.cookie)).code == 200
+        confirm = await self.request(stream, 'GET', '/logout', self.cookie)
+        xsrf_cookie = re.search(r'_xsrf=([^;]+)', confirm.headers['Set-Cookie']).group(1)
+        xsrf_value = re.search(r'name="_xsrf" value="([^"]+)"', confirm.body.decode('utf-8')).group(1)
+        response = await self.request(stream, 'POST', '/logout', f'{self.cookie}; _xsrf={xsrf_cookie}',
+                                      urlencode({'_xsrf': xsrf_value}).encode('utf-8'))
+        assert response.code == 302
+        new_cookie = re.search(r'(compute_home_session=[^;]+)', response.headers['Set-Cookie']).group(1)
+        assert new_cookie != self.cookie
+        assert (await self.request(stream, 'GET', '/containers/container/', new_cookie)).code == 403
+
+    @gen_test
+    async def test_ended_session_is_noticed(self: 'TestContainerProxy') -> None:
+        """A session that ended while its cookie is still sent is noticed once the authorisation has expired."""
+        stream = await self.connect()
+        assert (await self.request(stream, 'GET', '/containers/container/', self.cookie)).code == 200
+        await self.backend.delete('session-id')
+        assert (await self.request(stream, 'GET', '/containers/container/', self.cookie)).code == 200
+        self.clock.return_value = 1000.0 + proxy_handlers.AUTHORISATION_TTL
+        assert (await self.request(stream, 'GET', '/containers/container/', self.cookie)).code == 403
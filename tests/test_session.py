@@ -0,0 +1,130 @@
+"""Tests for the server-side sessions."""
+import asyncio
+import pytest
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from typing import Awaitable, Callable
+from unittest import mock
+
+from container_launcher.models import Base
+from container_launcher.server import session
+from container_launcher.server.session import MemorySessionBackend, Session, SqlSessionBackend
+
+
+SETTINGS = {'server': {'session': {'name': 'compute_home_session', 'validity_days': 1}}}
+
+
+class CookieJar(object):
+    """Stand-in for the request handler, which only stores the secure cookies."""
+
+    def __init__(self: 'CookieJar') -> None:
+        """Create an empty cookie jar."""
+        self.cookies = {}
+
+    def get_secure_cookie(self: 'CookieJar', name: str, max_age_days: int) -> bytes | None:
+        """Get a cookie."""
+        return self.cookies.get(name)
+
+    def set_secure_cookie(self: 'CookieJar', name: str, value: str, expires_days: int) -> None:
+        """Set a cookie."""
+        self.cookies[name] = value.encode('utf-8')
+
+
+def run_with_backend(backend: str, tmp_path: str, test: Callable[[], Awaitable[None]]) -> None:
+    """Run a test against the session backend with the given name."""
+    async def run() -> None:
+        engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/sessions.sqlite')
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = sessionmaker(engine, class_=AsyncSession)
+            instance = MemorySessionBackend() if backend == 'memory' else SqlSessionBackend()
+            with mock.patch.object(session, 'config', lambda: SETTINGS), \
+                    mock.patch.object(session, 'get_sessionmaker', lambda: session_factory), \
+                    mock.patch.object(session, 'backend', instance):
+                await test()
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+async def load(cookies: CookieJar) -> Session:
+    """Load the session for the cookies."""
+    loaded = Session(cookies)
+    await loaded.load()
+    return loaded
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sql'])
+def test_round_trip(backend: str, tmp_path: str) -> None:
+    """Saved values are loaded by the next request with the same cookie."""
+    async def test() -> None:
+        cookies = CookieJar()
+        first = await load(cookies)
+        first['user_id'] = 1
+        first['groups'] = ['course']
+        await first.save()
+        second = await load(cookies)
+        assert second.get('user_id') == 1
+        assert second.get('groups') == ['course']
+        assert 'user_id' not in await load(CookieJar())
+
+    run_with_backend(backend, tmp_path, test)
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sql'])
+def test_unsaved_changes_not_shared(backend: str, tmp_path: str) -> None:
+    """Changes are only seen by other requests once they have been saved."""
+    async def test() -> None:
+        cookies = CookieJar()
+        first = await load(cookies)
+        first['groups'] = ['course']
+        await first.save()
+        second = await load(cookies)
+        second['user_id'] = 2
+        second['groups'].append('other')
+        first['groups'].append('changed after saving')
+        third = await load(cookies)
+        assert 'user_id' not in third
+        assert third['groups'] == ['course']
+        await second.save()
+        assert (await load(cookies))['groups'] == ['course', 'other']
+
+    run_with_backend(backend, tmp_path, test)
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sql'])
+def test_clear_discards_session_id(backend: str, tmp_path: str) -> None:
+    """Clearing the session gives it a new id and deletes the data stored for the old id."""
+    async def test() -> None:
+        cookies = CookieJar()
+        first = await load(cookies)
+        first['user_id'] = 1
+        await first.save()
+        old_cookies = CookieJar()
+        old_cookies.cookies = dict(cookies.cookies)
+        second = await load(cookies)
+        second.clear()
+        await second.save()
+        assert cookies.cookies != old_cookies.cookies
+        assert 'user_id' not in await load(old_cookies)
+        assert 'user_id' not in await load(cookies)
+
+    run_with_backend(backend, tmp_path, test)
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sql'])
+def test_expired_session(backend: str, tmp_path: str) -> None:
+    """Expired sessions are not loaded."""
+    async def test() -> None:
+        await session.get_session_backend().save('expired', {'user_id': 1},
+                                                 datetime.now(timezone.utc) - timedelta(seconds=1))
+        await session.get_session_backend().save('valid', {'user_id': 2},
+                                                 datetime.now(timezone.utc) + timedelta(minutes=1))
+        assert await session.get_session_backend().load('expired') is None
+        assert await session.get_session_backend().load('valid') == {'user_id': 2}
+
+    run_with_backend(backend, tmp_path, test)
@@ -0,0 +1,57 @@
+"""Tests for the configuration snapshots."""
+import os
+import pytest
+
+from unittest import mock
+
+from container_launcher.cli import validate_config
+from container_launcher.server import snapshot
+from container_launcher.server.snapshot import ConfigSnapshot, activate_snapshot
+from container_launcher.utils import config, set_config
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_settings(title: str, port: int, dsn: str) -> dict:
+    """Get a validated configuration."""
+    return validate_config({
+        'app': {'title': title, 'containers': []},
+        'server': {'cookie_secret': 'secret', 'port': port},
+        'database': {'dsn': dsn},
+        'lti': [{'iss': 'http://platform', 'client_id': 'client', 'auth_login_url': 'http://platform/auth',
+                 'auth_token_url': 'http://platform/token', 'key_set_url': 'http://platform/jwks',
+                 'private_key_file': os.path.join(ROOT, 'dev', 'private.pem'),
+                 'public_key_file': os.path.join(ROOT, 'dev', 'public.pem'), 'deployment_ids': ['1']}],
+    })
+
+
+@pytest.fixture
+def current() -> ConfigSnapshot:
+    """Get the current snapshot, restoring the configuration afterwards."""
+    previous_config = config()
+    current = ConfigSnapshot(make_settings('Old', 8080, 'sqlite+aiosqlite:///old.db'))
+    set_config(current.config)
+    with mock.patch.object(snapshot, 'snapshot', current), mock.patch.object(snapshot, 'configure_logging'):
+        yield current
+    set_config(previous_config)
+
+
+def test_reload_keeps_restart_sections(current: ConfigSnapshot) -> None:
+    """Reloading applies the other settings and keeps the previous values of the sections that need a restart."""
+    new = ConfigSnapshot(make_settings('New', 9090, 'sqlite+aiosqlite:///new.db'), current)
+    activate_snapshot(new)
+    assert snapshot.get_snapshot() is new
+    assert config() is new.config
+    assert config()['app']['title'] == 'New'
+    assert config()['server'] == current.config['server']
+    assert config()['database'] == current.config['database']
+    assert config()['jupyterhub'] == current.config['jupyterhub']
+
+
+def test_supervisor_reload_applies_restart_sections(current: ConfigSnapshot) -> None:
+    """The worker supervisor applies all settings, for the workers that it restarts."""
+    new = ConfigSnapshot(make_settings('New', 9090, 'sqlite+aiosqlite:///new.db'), current)
+    activate_snapshot(new, keep_restart_sections=False)
+    assert config()['server']['port'] == 9090
+    assert config()['database']['dsn'] == 'sqlite+aiosqlite:///new.db'
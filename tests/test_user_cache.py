@@ -0,0 +1,54 @@
+"""Tests for the process-local user cache."""
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from time import time
+from unittest import mock
+
+from container_launcher.models import Base, upsert_launch_user
+from container_launcher.server import user_cache
+from container_launcher.server.user_cache import UserCache
+
+
+async def run_launches(dsn: str) -> dict:
+    """Launch a user, cache it in two worker caches and launch it again in one of the workers."""
+    engine = create_async_engine(dsn)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession)
+
+        async def launch(name: str, group: str) -> int:
+            async with session_factory() as dbsession:
+                user_id = await upsert_launch_user(dbsession, 'user', {'name': name}, group, {'label': group})
+                await dbsession.commit()
+            return user_id
+
+        with mock.patch.object(user_cache, 'get_sessionmaker', lambda: session_factory):
+            launching_worker = UserCache(10, 3600)
+            other_worker = UserCache(10, 3600)
+            user_id = await launch('First', 'group-1')
+            version = time()
+            await launching_worker.get(user_id, version)
+            await other_worker.get(user_id, version)
+            user_id = await launch('Second', 'group-2')
+            launching_worker.invalidate(user_id)
+            result = {'unversioned': await other_worker.get(user_id)}
+            version = time()
+            result['launching'] = await launching_worker.get(user_id, version)
+            result['other'] = await other_worker.get(user_id, version)
+            result['cached'] = await other_worker.get(user_id, version)
+        return result
+    finally:
+        await engine.dispose()
+
+
+def test_launch_in_other_worker_reloads_user(tmp_path: str) -> None:
+    """A user cached before a launch in another worker is reloaded once the session carries the new version."""
+    result = asyncio.run(run_launches(f'sqlite+aiosqlite:///{tmp_path}/test.sqlite'))
+    assert result['unversioned'].name == 'First'
+    assert result['launching'].name == 'Second'
+    assert result['other'].name == 'Second'
+    assert result['other'].group_ids == frozenset(['group-1', 'group-2'])
+    assert result['cached'] is result['other']
@@ -0,0 +1,51 @@
+"""Tests for the API WebSocket handler."""
+import pytest
+
+from unittest import mock
+
+from container_launcher.server.handlers import websocket
+from container_launcher.server.handlers.websocket import ApiHandler
+from container_launcher.server.jobs import ContainerJob
+
+
+@pytest.fixture
+def handler() -> ApiHandler:
+    """Get a handler whose client is not reading its messages."""
+    with mock.patch.object(websocket, 'get_connection_registry', return_value=mock.Mock(max_buffer=100)):
+        handler = ApiHandler.__new__(ApiHandler)
+        handler._binary = False
+        handler._buffered = 1000
+        handler.ws_connection = mock.Mock()
+        handler.write_message = mock.Mock()
+        handler.close = mock.Mock()
+        yield handler
+
+
+def job_with_status(status: str) -> ContainerJob:
+    """Get a start job with the given status."""
+    job = ContainerJob('user', {'name': 'container', 'host': 'http://hub/'}, 'start')
+    job.status = status
+    return job
+
+
+def test_full_buffer_drops_push(handler: ApiHandler) -> None:
+    """Status pushes are dropped while the buffer is full, without closing the connection."""
+    handler.send_job_status(job_with_status('running'))
+    handler.write_message.assert_not_called()
+    handler.close.assert_not_called()
+
+
+@pytest.mark.parametrize('status', ['completed', 'failed'])
+def test_full_buffer_sends_final_status(handler: ApiHandler, status: str) -> None:
+    """The final status of a job is sent while the buffer is full, without closing the connection."""
+    handler.send_job_status(job_with_status(status))
+    handler.write_message.assert_called_once()
+    assert f'"status": "{status}"' in handler.write_message.call_args[0][0]
+    handler.close.assert_not_called()
+
+
+def test_full_buffer_closes_on_reply(handler: ApiHandler) -> None:
+    """A reply that cannot be sent because the buffer is full closes the connection."""
+    assert not handler.send_message({'type': 'user'})
+    handler.write_message.assert_not_called()
+    handler.close.assert_called_once()